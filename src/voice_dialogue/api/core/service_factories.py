@@ -44,6 +44,7 @@ class ServiceFactories:
             user_question_queue=transcribed_text_queue,
             generated_answer_queue=text_input_queue,
             websocket_message_queue=websocket_message_queue,
+            audio_output_queue=audio_output_queue,
         )
 
     @staticmethod
@@ -8,6 +8,7 @@ from voice_dialogue.config.llm_config import CHINESE_SYSTEM_PROMPT, ENGLISH_SYST
 from voice_dialogue.config.user_config import (
     get_user_prompts, save_user_prompts, get_raw_prompt, reset_prompts_to_default
 )
+from voice_dialogue.core.constants import response_cache
 
 router = APIRouter()
 
@@ -79,6 +80,9 @@ async def update_user_prompts(request: UpdatePromptsRequest):
         if not save_user_prompts(current_prompts):
             raise HTTPException(status_code=500, detail="保存配置失败")
 
+        # 提示词变化后缓存的回答不再适用
+        response_cache.invalidate()
+
         return {"message": "用户 Prompt 更新成功", "updated_fields": list(update_data.keys())}
 
     except HTTPException:
@@ -94,9 +98,24 @@ async def reset_prompts():
         if not reset_prompts_to_default():
             raise HTTPException(status_code=500, detail="重置失败")
 
+        response_cache.invalidate()
+
         return {"message": "Prompt 已重置为默认值"}
 
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"重置 Prompt 失败: {str(e)}")
+
+
+@router.get("/settings/response-cache", summary="获取回答缓存统计")
+async def get_response_cache_stats():
+    """获取回答缓存的条目数、音频占用和命中率"""
+    return response_cache.get_statistics()
+
+
+@router.delete("/settings/response-cache", summary="清空回答缓存")
+async def clear_response_cache():
+    """清空缓存的回答文本和音频"""
+    response_cache.invalidate()
+    return {"message": "回答缓存已清空"}
@@ -1,9 +1,12 @@
+import asyncio
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Request
 from fastapi.responses import FileResponse
 
-from voice_dialogue.tts import tts_config_registry
+from voice_dialogue.tts import tts_config_registry, tts_manager
+from voice_dialogue.tts.bert_feature_cache import get_all_bert_feature_cache_stats
+from voice_dialogue.tts.shared_models import shared_model_registry
 from voice_dialogue.utils.logger import logger
 from ..core.service_factories import get_tts_audio_generator_service_definition
 from ..schemas.tts_schemas import (
@@ -218,6 +221,39 @@ async def _download_and_load_tts_model(
     )
 
 
+def _replace_tts_service(service_manager, config, progress_start: float, progress_end: float) -> None:
+    """
+    蓝绿切换TTS服务
+
+    服务运行中时，新引擎在后台加载和预热，期间旧引擎继续合成，就绪后在句子之间替换，
+    同一模型的音色直接切换配置；服务未运行时直接启动新服务。
+    进度按 [progress_start, progress_end] 写入 _tts_loading_status
+    """
+
+    def report(progress: float, message: str):
+        _tts_loading_status["progress"] = progress_start + (progress_end - progress_start) * progress
+        _tts_loading_status["message"] = message
+
+    tts_service = service_manager.get_service("tts_audio_generator")
+    if service_manager.is_service_running("tts_audio_generator"):
+        # 与当前引擎共用模型的音色（如 Kokoro 同一模型文件）直接切换，无需加载
+        if tts_service.switch_tts_config(config):
+            report(1.0, "已切换音色")
+            logger.info(f"TTS音色切换成功（未重新加载模型）: {config.character_name}")
+            return
+
+        if not tts_service.hot_swap(config, progress_callback=report):
+            raise RuntimeError("TTS引擎替换超时")
+        logger.info("TTS引擎热切换完成，旧引擎已释放")
+        return
+
+    report(0.0, "正在启动新的TTS服务...")
+    success = service_manager.start_service(get_tts_audio_generator_service_definition(config))
+    if not success:
+        raise RuntimeError("新TTS服务启动失败")
+    report(1.0, "TTS服务已启动")
+
+
 async def _switch_tts_model_background(config, model_id: str, fastapi_request: Request):
     """
     后台切换TTS模型的实际逻辑
@@ -230,24 +266,7 @@ async def _switch_tts_model_background(config, model_id: str, fastapi_request: R
         if not service_manager:
             raise RuntimeError("服务管理器未初始化")
 
-        _tts_loading_status["progress"] = 20.0
-        _tts_loading_status["message"] = "正在停止当前TTS服务..."
-
-        # 停止当前的TTS服务
-        if service_manager.is_service_running("tts_audio_generator"):
-            service_manager._stop_single_service("tts_audio_generator")
-            logger.info("已停止当前TTS服务")
-
-        _tts_loading_status["progress"] = 50.0
-        _tts_loading_status["message"] = "正在启动新的TTS服务..."
-
-        # 使用新配置创建TTS服务定义
-        new_tts_service_def = get_tts_audio_generator_service_definition(config)
-
-        # 启动新的TTS服务
-        success = service_manager.start_service(new_tts_service_def)
-        if not success:
-            raise RuntimeError("新TTS服务启动失败")
+        await asyncio.to_thread(_replace_tts_service, service_manager, config, 20.0, 90.0)
 
         _tts_loading_status["progress"] = 90.0
         _tts_loading_status["message"] = "正在验证服务状态..."
@@ -298,24 +317,7 @@ async def _download_and_load_tts_model_background(config, model_id: str, fastapi
         if not service_manager:
             raise RuntimeError("服务管理器未初始化")
 
-        _tts_loading_status["progress"] = 80.0
-        _tts_loading_status["message"] = "正在停止当前TTS服务..."
-
-        # 停止当前的TTS服务
-        if service_manager.is_service_running("tts_audio_generator"):
-            service_manager._stop_single_service("tts_audio_generator")
-            logger.info("已停止当前TTS服务")
-
-        _tts_loading_status["progress"] = 90.0
-        _tts_loading_status["message"] = "正在启动新的TTS服务..."
-
-        # 使用新配置创建TTS服务定义
-        new_tts_service_def = get_tts_audio_generator_service_definition(config)
-
-        # 启动新的TTS服务
-        success = service_manager.start_service(new_tts_service_def)
-        if not success:
-            raise RuntimeError("新TTS服务启动失败")
+        await asyncio.to_thread(_replace_tts_service, service_manager, config, 80.0, 98.0)
 
         # 更新请求状态中的当前模型信息
         fastapi_request.app.state.current_tts_model_id = model_id
@@ -436,3 +438,31 @@ async def get_tts_model_reference_audio(model_id: str):
     except Exception as e:
         logger.error(f"获取TTS模型参考音频失败: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"获取参考音频失败: {str(e)}")
+
+
+@router.get("/audio-cache", summary="获取TTS音频缓存统计")
+async def get_tts_audio_cache_stats(fastapi_request: Request):
+    """获取当前TTS服务音频缓存的内存/磁盘占用和命中率"""
+    service_manager = getattr(fastapi_request.app.state, "service_manager", None)
+    if not service_manager or not service_manager.is_service_running("tts_audio_generator"):
+        raise HTTPException(status_code=503, detail="TTS服务未运行")
+
+    tts_service = service_manager.get_service("tts_audio_generator")
+    stats = tts_service.get_audio_cache_stats() if tts_service else None
+    if stats is None:
+        raise HTTPException(status_code=404, detail="TTS音频缓存未启用")
+    return stats
+
+
+@router.get("/residency", summary="获取TTS多音色常驻池状态")
+async def get_tts_residency_stats():
+    """获取常驻内存的音色、引用计数、内存预算占用以及共享基础模型"""
+    stats = tts_manager.get_residency_pool().get_statistics()
+    stats['shared_models'] = shared_model_registry.get_statistics()
+    return stats
+
+
+@router.get("/frontend-cache", summary="获取MoYoYo文本前端BERT特征缓存统计")
+async def get_tts_frontend_cache_stats():
+    """获取各 BERT 模型特征缓存的命中率、占用以及每句文本前端耗时"""
+    return get_all_bert_feature_cache_stats()
@@ -8,6 +8,7 @@ ASR Module
 - 运行时接口
 """
 
+from .config import WhisperConfig, WarmupMode, get_asr_warmup_mode
 from .models import (
     ASRInterface,
 )
@@ -30,6 +31,9 @@ __all__ = [
     'register_all_asr',
 
     # 配置模型
+    'WhisperConfig',
+    'WarmupMode',
+    'get_asr_warmup_mode',
 
     # 运行时接口
     'ASRInterface',
@@ -0,0 +1,118 @@
+import math
+import os
+import typing
+from enum import Enum
+
+from pydantic import BaseModel, Field
+
+from voice_dialogue.utils.hardware import get_hardware_profile
+
+# whisper 编码器每秒对应的音频上下文帧数（30秒 = 1500帧）
+WHISPER_AUDIO_CTX_PER_SECOND = 50
+WHISPER_MAX_AUDIO_CTX = 1500
+
+WHISPER_MODEL_NAMES = {
+    'medium': 'medium-q5_0',
+    'large-v3-turbo': 'large-v3-turbo-q5_0',
+}
+
+
+# 预热模式的环境变量，便于容器冷启动时跳过或缩短预热
+ASR_WARMUP_MODE_ENV = 'VOICE_DIALOGUE_ASR_WARMUP'
+
+
+class WarmupMode(Enum):
+    """ASR预热模式"""
+    SKIP = 'skip'  # 不预热
+    MINIMAL = 'minimal'  # 使用1秒音频预热
+    FULL = 'full'  # 使用完整的预热音频
+
+
+def get_asr_warmup_mode(default: WarmupMode = WarmupMode.FULL) -> WarmupMode:
+    """从环境变量读取ASR预热模式，无效值时返回默认值"""
+    value = os.environ.get(ASR_WARMUP_MODE_ENV, '').strip().lower()
+    try:
+        return WarmupMode(value) if value else default
+    except ValueError:
+        return default
+
+
+def _default_whisper_threads() -> int:
+    return max(1, min(4, get_hardware_profile().usable_cpus))
+
+
+class WhisperConfig(BaseModel):
+    """Whisper.cpp 运行时参数"""
+    model: typing.Literal['medium', 'large-v3-turbo'] = Field(default='medium', description="模型名称")
+    n_threads: int = Field(default_factory=_default_whisper_threads, description="推理线程数")
+    sampling_strategy: typing.Literal['greedy', 'beam_search'] = Field(default='greedy', description="解码策略")
+    best_of: int = Field(default=1, description="贪心解码候选数")
+    beam_size: int = Field(default=5, description="束搜索宽度")
+    audio_ctx: int = Field(default=0, description="音频上下文长度，0表示使用完整的1500帧")
+    no_context: bool = Field(default=True, description="是否不使用前一次识别结果作为上下文")
+    single_segment: bool = Field(default=False, description="是否强制输出单个片段")
+    temperature: float = Field(default=0.0, description="初始采样温度")
+    temperature_inc: float = Field(default=0.2, description="解码失败时的温度递增值，0表示关闭温度回退")
+
+    enable_fast_path: bool = Field(default=True, description="是否为短音频启用快速路径")
+    fast_path_max_duration: float = Field(default=8.0, description="快速路径的最大音频时长（秒）")
+    fast_path_audio_ctx_padding: int = Field(default=64, description="快速路径音频上下文的额外余量（帧）")
+    fast_path_min_audio_ctx: int = Field(default=128, description="快速路径音频上下文的最小值（帧）")
+
+    @property
+    def model_name(self) -> str:
+        return WHISPER_MODEL_NAMES[self.model]
+
+    @property
+    def sampling_strategy_id(self) -> int:
+        """pywhispercpp 的采样策略编号：0=贪心，1=束搜索"""
+        return 0 if self.sampling_strategy == 'greedy' else 1
+
+    def is_fast_path(self, duration: float) -> bool:
+        return self.enable_fast_path and duration <= self.fast_path_max_duration
+
+    def get_fast_path_audio_ctx(self, duration: float) -> int:
+        """
+        根据音频时长计算快速路径的音频上下文长度
+
+        Args:
+            duration: 音频时长（秒）
+
+        Returns:
+            int: 按64帧对齐的音频上下文长度
+        """
+        audio_ctx = math.ceil(duration * WHISPER_AUDIO_CTX_PER_SECOND) + self.fast_path_audio_ctx_padding
+        audio_ctx = math.ceil(audio_ctx / 64) * 64
+        return max(self.fast_path_min_audio_ctx, min(WHISPER_MAX_AUDIO_CTX, audio_ctx))
+
+    def get_transcribe_params(self, duration: float) -> dict:
+        """
+        生成单次识别的 whisper 参数
+
+        pywhispercpp 会在多次调用之间保留参数，因此每次都需要传入完整的参数集合
+
+        Args:
+            duration: 音频时长（秒）
+
+        Returns:
+            dict: 传给 Model.transcribe 的参数
+        """
+        params = {
+            'n_threads': self.n_threads,
+            'no_context': self.no_context,
+            'single_segment': self.single_segment,
+            'temperature': self.temperature,
+            'temperature_inc': self.temperature_inc,
+            'audio_ctx': self.audio_ctx,
+            'greedy': {'best_of': self.best_of},
+            'beam_search': {'beam_size': self.beam_size, 'patience': -1.0},
+        }
+
+        if self.is_fast_path(duration):
+            # 短语音：缩小编码器上下文并使用贪心解码，不做温度回退
+            params['audio_ctx'] = self.get_fast_path_audio_ctx(duration)
+            params['temperature_inc'] = 0.0
+            params['greedy'] = {'best_of': 1}
+            params['beam_search'] = {'beam_size': 1, 'patience': -1.0}
+
+        return params
@@ -2,7 +2,7 @@ import importlib.util
 import inspect
 import re
 from dataclasses import dataclass
-from typing import Dict, Type, List, Literal, Optional
+from typing import Any, Dict, Type, List, Literal, Optional
 
 from voice_dialogue.utils.logger import logger
 from .models import ASRInterface
@@ -98,12 +98,13 @@ class ASRManager:
             # 'auto': 'whisper',  # 自动检测默认使用Whisper
         }
 
-    def create_asr(self, language: Literal['auto', 'zh', 'en']) -> ASRInterface:
+    def create_asr(self, language: Literal['auto', 'zh', 'en'], config: Optional[Any] = None) -> ASRInterface:
         """
         根据语言配置创建ASR实例
         
         Args:
             language: 语言类型
+            config: ASR引擎的运行时配置（如 WhisperConfig），为None时使用引擎默认配置
             
         Returns:
             ASRInterface: ASR实例
@@ -119,7 +120,7 @@ class ASRManager:
                 raise ValueError(f"ASR类型 '{asr_type}' 未注册")
 
             asr_class = asr_tables.asr_classes[asr_type]
-            instance = asr_class()
+            instance = asr_class(config=config)
 
             logger.info(f"成功创建ASR实例: {asr_type} for language: {language}")
             return instance
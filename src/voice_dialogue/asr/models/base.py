@@ -1,9 +1,10 @@
 from abc import ABC, abstractmethod
 from enum import Enum
 
-import librosa
 import numpy as np
 
+from voice_dialogue.asr.config import WarmupMode, get_asr_warmup_mode
+from voice_dialogue.asr.utils import load_cached_audio
 from voice_dialogue.config import paths
 
 
@@ -20,18 +21,49 @@ class Language(Enum):
     ENGLISH = 'en'
 
 
+def load_warmup_audiodata(mode: WarmupMode = WarmupMode.FULL, sample_rate: int = 16000) -> np.ndarray:
+    """
+    加载预热音频
+
+    音频会被预解码并缓存到应用数据目录，重复创建ASR实例时不再解码和重采样
+
+    Args:
+        mode: 预热模式，MINIMAL 只取前1秒
+        sample_rate: 采样率
+
+    Returns:
+        np.ndarray: 可写的 float32 音频数据
+    """
+    warmup_audiofile = paths.AUDIO_RESOURCES_PATH / 'jfk.flac'
+    if warmup_audiofile.exists():
+        audiodata = load_cached_audio(warmup_audiofile, sample_rate=sample_rate)
+    else:
+        # 创建测试音频
+        audiodata = np.random.randn(sample_rate).astype(np.float32) * 0.1  # 1秒的噪声
+
+    if mode == WarmupMode.MINIMAL:
+        audiodata = audiodata[:sample_rate]
+
+    # 复制出内存映射，避免引擎对只读数组做原地修改
+    return np.array(audiodata, dtype=np.float32)
+
+
 class ASRInterface(ABC):
     """ASR服务的抽象接口"""
     supported_langs = []
+    warmup_sample_rate = 16000
+
+    def __init__(self, config=None):
+        self.config = config
+        self.warmup_mode: WarmupMode = get_asr_warmup_mode()
+        self._warmup_audiodata = None
 
-    def __init__(self):
-        warmup_audiofile = paths.AUDIO_RESOURCES_PATH / 'jfk.flac'
-        if warmup_audiofile.exists():
-            audiodata, _ = librosa.load(warmup_audiofile, sr=16000, mono=True)
-        else:
-            # 创建测试音频
-            audiodata = np.random.randn(16000).astype(np.float32) * 0.1  # 1秒的噪声
-        self.warmup_audiodata = audiodata
+    @property
+    def warmup_audiodata(self) -> np.ndarray:
+        """预热音频，首次访问时按预热模式加载"""
+        if self._warmup_audiodata is None:
+            self._warmup_audiodata = load_warmup_audiodata(self.warmup_mode, self.warmup_sample_rate)
+        return self._warmup_audiodata
 
     @abstractmethod
     def setup(self, **kwargs) -> None:
@@ -16,8 +16,8 @@ class FunASRClient(ASRInterface):
     """FunASR API客户端"""
     supported_langs = ['zh']
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, config=None):
+        super().__init__(config)
         self.funasr_model: typing.Optional[SeacoParaformer] = None
         self.punc_model: typing.Optional[CT_Transformer] = None
 
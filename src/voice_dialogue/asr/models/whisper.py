@@ -3,6 +3,7 @@ import typing
 import numpy as np
 from pywhispercpp.model import Model
 
+from voice_dialogue.asr.config import WhisperConfig
 from voice_dialogue.asr.manager import asr_tables
 from voice_dialogue.asr.models.base import ASRInterface
 from voice_dialogue.asr.utils import ensure_minimum_audio_duration
@@ -15,20 +16,23 @@ class WhisperCppClient(ASRInterface):
     """Whisper C++ API客户端"""
     supported_langs = ['en', 'zh', ]
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, config: typing.Optional[WhisperConfig] = None):
+        super().__init__(config)
+        self.config: WhisperConfig = config or WhisperConfig()
         self.whisper: typing.Optional[Model] = None
         self.language = "en"
 
     def setup(self, **kwargs) -> None:
-        model = kwargs.get('model', 'medium')
-        if model == "medium":
-            model = "medium-q5_0"
-        else:
-            model = "large-v3-turbo-q5_0"
+        if kwargs:
+            self.config = self.config.model_copy(update=kwargs)
 
         models_dir = paths.ASR_MODELS_PATH / "whisper"
-        self.whisper = Model(model=model, models_dir=models_dir)
+        self.whisper = Model(
+            model=self.config.model_name,
+            models_dir=models_dir,
+            params_sampling_strategy=self.config.sampling_strategy_id,
+            n_threads=self.config.n_threads,
+        )
 
     def warmup(self) -> None:
         logger.info('[INFO] Warming up Whisper model...')
@@ -45,10 +49,11 @@ class WhisperCppClient(ASRInterface):
             prompt = "The following is an English sentence."
 
         audio_array = ensure_minimum_audio_duration(audio_array)
+        params = self.config.get_transcribe_params(audio_array.shape[-1] / 16000)
 
         # print('............... language:', language)
         segments = self.whisper.transcribe(
-            audio_array, language=language, initial_prompt=prompt, print_progress=False
+            audio_array, language=language, initial_prompt=prompt, print_progress=False, **params
         )
         text = []
         for segment in segments:
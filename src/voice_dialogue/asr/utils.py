@@ -3,6 +3,11 @@ ASR模块的工具函数
 包含音频预处理、格式转换等工具函数
 """
 
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional
+
 import numpy as np
 
 
@@ -204,3 +209,74 @@ def create_silence(duration_seconds: float, sample_rate: int = 16000) -> np.ndar
     """
     num_samples = int(duration_seconds * sample_rate)
     return np.zeros(num_samples, dtype=np.float32)
+
+
+# 进程内的预热音频缓存，key 为 (文件路径, 修改时间, 文件大小, 采样率)
+_warmup_audio_cache = {}
+
+
+def _hash_file(file_path: Path, chunk_size: int = 1 << 20) -> str:
+    """计算文件内容的 sha256 摘要"""
+    hasher = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def load_cached_audio(
+        audio_file: Path, sample_rate: int = 16000, cache_dir: Optional[Path] = None
+) -> np.ndarray:
+    """
+    加载预解码的音频数据
+
+    首次调用时解码并重采样音频，结果以 .npy 形式保存在缓存目录中，
+    之后直接以内存映射方式读取，避免重复解码和重采样。
+    缓存文件名包含源文件的内容摘要和采样率，源文件变化后会自动重新生成。
+
+    Args:
+        audio_file: 音频文件路径
+        sample_rate: 目标采样率
+        cache_dir: 缓存目录，默认为 paths.WARMUP_CACHE_PATH
+
+    Returns:
+        只读的单声道 float32 音频数组（内存映射）
+    """
+    audio_file = Path(audio_file)
+    stat = audio_file.stat()
+    memo_key = (str(audio_file), stat.st_mtime_ns, stat.st_size, sample_rate)
+    if memo_key in _warmup_audio_cache:
+        return _warmup_audio_cache[memo_key]
+
+    if cache_dir is None:
+        from voice_dialogue.config import paths
+        cache_dir = paths.WARMUP_CACHE_PATH
+
+    file_hash = _hash_file(audio_file)[:16]
+    cache_file = Path(cache_dir) / f"{audio_file.stem}-{file_hash}-{sample_rate}.npy"
+
+    audio_data = None
+    if cache_file.exists():
+        try:
+            audio_data = np.load(cache_file, mmap_mode='r')
+        except (OSError, ValueError):
+            audio_data = None
+
+    if audio_data is None:
+        import librosa
+
+        decoded, _ = librosa.load(audio_file, sr=sample_rate, mono=True)
+        decoded = decoded.astype(np.float32, copy=False)
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_file, 'wb') as f:
+                np.save(f, decoded)
+            os.replace(tmp_file, cache_file)
+            audio_data = np.load(cache_file, mmap_mode='r')
+        except OSError:
+            # 缓存目录不可写时直接使用解码结果
+            audio_data = decoded
+
+    _warmup_audio_cache[memo_key] = audio_data
+    return audio_data
@@ -1,19 +1,37 @@
 """LLM模型配置管理"""
+import os
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from voice_dialogue.utils.apple_silicon import get_optimal_llama_cpp_config, get_apple_silicon_info
-from .paths import LLM_MODELS_PATH
+from .paths import LLM_MODELS_PATH, LLM_STATE_CACHE_PATH
 
 __all__ = (
     'get_llm_model_params',
+    'get_llm_speculative_params',
+    'get_llm_prompt_cache_params',
+    'get_llm_backend_name',
+    'get_llm_throttle_params',
+    'get_llm_opener_params',
+    'get_llm_batching_params',
+    'get_llm_state_snapshot_params',
+    'get_llm_thread_tuning_params',
+    'LLM_ENABLE_THINKING',
     'get_apple_silicon_summary',
     'CHINESE_SYSTEM_PROMPT',
     'ENGLISH_SYSTEM_PROMPT',
     'BUILTIN_LLM_MODEL_PATH',
+    'DRAFT_LLM_MODEL_PATH',
+    'OPENER_LLM_MODEL_PATH',
+    'CHINESE_OPENER_SYSTEM_PROMPT',
+    'ENGLISH_OPENER_SYSTEM_PROMPT',
 )
 
 BUILTIN_LLM_MODEL_PATH = LLM_MODELS_PATH / 'qwen' / 'Qwen3-8B-Q6_K.gguf'
+# 推测解码使用的草稿模型，需与主模型共享词表
+DRAFT_LLM_MODEL_PATH = LLM_MODELS_PATH / 'qwen' / 'Qwen3-0.6B-Q8_0.gguf'
+# 快速生成回答开场白的小模型
+OPENER_LLM_MODEL_PATH = LLM_MODELS_PATH / 'qwen' / 'Qwen3-1.7B-Q8_0.gguf'
 
 CHINESE_SYSTEM_PROMPT = (
     "你是AI助手。请以自然流畅的中文口语化表达直接回答问题，避免冗余的思考过程。"
@@ -28,11 +46,26 @@ ENGLISH_SYSTEM_PROMPT = (
     "Your responses should be accurate, concise, and well-supported, ideally around 2-3 sentences long to ensure a good conversational flow."
 )
 
+CHINESE_OPENER_SYSTEM_PROMPT = (
+    "你是语音助手的开场白生成器。用一句不超过八个字的自然口语回应用户，例如“好的，我来说说。”或“这个问题很有意思。”"
+    "只输出这一句话，不要回答问题的具体内容。"
+)
+
+ENGLISH_OPENER_SYSTEM_PROMPT = (
+    "You write the opening phrase of a voice assistant's reply. "
+    "Reply with one short natural phrase of at most six words, such as \"Sure, let me explain.\" "
+    "or \"Good question.\" Output only that phrase and do not answer the question itself."
+)
+
 
-def get_llm_model_params() -> Dict[str, Any]:
+def get_llm_model_params(speculative_mode: Optional[str] = None) -> Dict[str, Any]:
     """
     获取LLM模型参数，基于Apple Silicon芯片信息动态配置
     
+    Args:
+        speculative_mode: 推测解码模式，'prompt_lookup' 或 'draft_model'，
+            为 None 时读取环境变量 VOICE_DIALOGUE_LLM_SPECULATIVE，默认不启用
+
     Returns:
         Dict[str, Any]: LLM模型参数配置
     """
@@ -58,9 +91,198 @@ def get_llm_model_params() -> Dict[str, Any]:
     # 应用Apple Silicon优化配置
     model_params.update(optimal_config)
 
+    # 推测解码（可选），由后端据此创建 llama.cpp 的 draft_model
+    model_params['speculative_decoding'] = get_llm_speculative_params(speculative_mode)
+
     return model_params
 
 
+# 推测解码模式的环境变量: prompt_lookup=提示词查找, draft_model=小模型草稿
+LLM_SPECULATIVE_ENV = 'VOICE_DIALOGUE_LLM_SPECULATIVE'
+
+
+def get_llm_speculative_params(mode: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    获取推测解码参数
+
+    Args:
+        mode: 推测解码模式，为 None 时读取环境变量
+
+    Returns:
+        Optional[Dict[str, Any]]: 推测解码参数，未启用时返回 None
+    """
+    if mode is None:
+        mode = os.environ.get(LLM_SPECULATIVE_ENV, '').strip().lower()
+    if not mode or mode in ('off', 'none'):
+        return None
+
+    if mode == 'prompt_lookup':
+        # 口语对话中复述问题和历史回答的情况较多，较短的 n-gram 即可命中
+        return {
+            'mode': mode,
+            'num_pred_tokens': 10,
+            'max_ngram_size': 2,
+        }
+
+    return {
+        'mode': mode,
+        'num_pred_tokens': 8,
+        'draft_model_path': DRAFT_LLM_MODEL_PATH,
+        'n_ctx': 2048,
+        'n_gpu_layers': -1,
+    }
+
+
+# LLM后端选择的环境变量: native=直接调用llama-cpp, langchain=LangChain ChatLlamaCpp
+LLM_BACKEND_ENV = 'VOICE_DIALOGUE_LLM_BACKEND'
+DEFAULT_LLM_BACKEND = 'native'
+
+
+# 是否允许模型输出 <think> 推理块，关闭时在对话模板中禁用推理（模板支持时）
+LLM_ENABLE_THINKING = False
+
+
+def get_llm_backend_name() -> str:
+    """
+    获取LLM后端名称
+
+    Returns:
+        str: 'native' 或 'langchain'
+    """
+    return os.environ.get(LLM_BACKEND_ENV, DEFAULT_LLM_BACKEND).strip().lower() or DEFAULT_LLM_BACKEND
+
+
+def get_llm_prompt_cache_params() -> Dict[str, Any]:
+    """
+    获取 Prompt 前缀缓存（llama.cpp 状态缓存）参数，容量根据内存大小配置
+
+    Returns:
+        Dict[str, Any]: 前缀缓存参数
+    """
+    chip_info = get_apple_silicon_info()
+
+    if chip_info.memory_gb >= 32:
+        capacity_gb = 4
+    elif chip_info.memory_gb >= 16:
+        capacity_gb = 2
+    else:
+        capacity_gb = 1
+
+    return {
+        'enabled': True,
+        'capacity_bytes': capacity_gb << 30,
+    }
+
+
+def get_llm_throttle_params() -> Dict[str, Any]:
+    """
+    获取生成超前限流参数：待播放音频超过 pause_ahead_seconds 秒时暂停生成，
+    回落到 resume_ahead_seconds 秒以下时继续
+
+    Returns:
+        Dict[str, Any]: 限流参数
+    """
+    return {
+        'enabled': True,
+        'pause_ahead_seconds': 8.0,
+        'resume_ahead_seconds': 4.0,
+    }
+
+
+# 开场白小模型的环境变量: 1/true 启用
+LLM_OPENER_ENV = 'VOICE_DIALOGUE_LLM_OPENER'
+
+
+def get_llm_opener_params() -> Dict[str, Any]:
+    """
+    获取开场白小模型参数：小模型先生成简短的开场白送去 TTS，主模型接着开场白继续回答。
+    两个模型常驻内存，总占用不能超过 memory_budget_bytes
+
+    Returns:
+        Dict[str, Any]: 开场白参数
+    """
+    chip_info = get_apple_silicon_info()
+    optimal_config = get_optimal_llama_cpp_config()
+
+    return {
+        'enabled': os.environ.get(LLM_OPENER_ENV, '').strip().lower() in ('1', 'true', 'yes', 'on'),
+        'model_path': OPENER_LLM_MODEL_PATH,
+        'model_params': {
+            'n_gpu_layers': -1,
+            'n_ctx': 1024,
+            'n_batch': 512,
+            'n_threads': optimal_config['n_threads'],
+            'temperature': 0.7,
+            'top_p': 0.8,
+            'top_k': 20,
+            'max_tokens': 24,
+            'verbose': False,
+        },
+        # 两个模型（权重 + KV 缓存）最多使用 60% 的物理内存
+        'memory_budget_bytes': int(chip_info.memory_gb * 0.6 * (1 << 30)),
+    }
+
+
+# 多会话连续批处理的环境变量: 1/true 启用
+LLM_BATCHING_ENV = 'VOICE_DIALOGUE_LLM_BATCHING'
+
+
+def get_llm_batching_params() -> Dict[str, Any]:
+    """
+    获取多会话连续批处理参数
+
+    Returns:
+        Dict[str, Any]: 批处理参数
+    """
+    chip_info = get_apple_silicon_info()
+    optimal_config = get_optimal_llama_cpp_config()
+
+    # 每个会话一个 KV 序列，内存较小时减少并发数；主模型上下文的 KV 缓存另外保留一份（见 BatchedChatBackend）
+    max_sessions = 4 if chip_info.memory_gb >= 32 else 2
+
+    return {
+        'enabled': os.environ.get(LLM_BATCHING_ENV, '').strip().lower() in ('1', 'true', 'yes', 'on'),
+        'max_sessions': max_sessions,
+        'n_ctx_per_session': optimal_config['n_ctx'],
+        # 单个会话每步最多计算的 prompt token 数，限制新会话对其他会话解码的影响
+        'prefill_chunk_size': 128,
+        # 单个会话未被读取的输出文本块上限，超过时暂停该会话的解码（生成限流暂停读取时生效）
+        'max_buffered_chunks': 8,
+    }
+
+
+def get_llm_state_snapshot_params() -> Dict[str, Any]:
+    """
+    获取 llama.cpp 状态快照参数：系统提示词状态持久化到磁盘，会话在空闲或切换时保存检查点
+
+    Returns:
+        Dict[str, Any]: 状态快照参数
+    """
+    return {
+        'enabled': True,
+        'cache_dir': LLM_STATE_CACHE_PATH,
+        'max_session_checkpoints': 32,
+    }
+
+
+# 线程数微基准测试的环境变量: 1/true 启用，结果按机器缓存，只在首次启动时运行
+LLM_THREAD_BENCHMARK_ENV = 'VOICE_DIALOGUE_THREAD_BENCHMARK'
+
+
+def get_llm_thread_tuning_params() -> Dict[str, Any]:
+    """
+    获取线程数微基准测试参数：首次启动时对候选线程数逐一测试解码和 prompt 计算速度，
+    选出最快的 n_threads 和 n_threads_batch 并按机器缓存
+
+    Returns:
+        Dict[str, Any]: 基准测试参数
+    """
+    return {
+        'enabled': os.environ.get(LLM_THREAD_BENCHMARK_ENV, '').strip().lower() in ('1', 'true', 'yes', 'on'),
+        'model_path': BUILTIN_LLM_MODEL_PATH,
+    }
+
+
 def get_apple_silicon_summary() -> Dict[str, Any]:
     """
     获取Apple Silicon芯片信息摘要
@@ -80,8 +302,12 @@ def get_apple_silicon_summary() -> Dict[str, Any]:
         'memory_gb': chip_info.memory_gb,
         'gpu_cores': chip_info.gpu_cores,
         'optimal_n_threads': optimal_config['n_threads'],
+        'optimal_n_threads_batch': optimal_config['n_threads_batch'],
         'optimal_n_ctx': optimal_config['n_ctx'],
-        'config_note': '仅使用性能核心(P-cores)以获得最佳性能' if chip_info.is_apple_silicon else '标准配置'
+        'config_note': (
+            '仅使用性能核心(P-cores)以获得最佳性能' if chip_info.is_apple_silicon
+            else '根据CPU拓扑、cgroup配额和内存限制配置'
+        )
     }
 
 
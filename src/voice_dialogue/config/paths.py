@@ -47,6 +47,12 @@ if not APP_DATA_PATH.exists():
     APP_DATA_PATH.mkdir(parents=True, exist_ok=True)
 USER_PROMPTS_PATH = APP_DATA_PATH / "user_prompts.json"
 
+# 运行时缓存路径（预解码的预热音频等）
+CACHE_PATH = APP_DATA_PATH / "cache"
+WARMUP_CACHE_PATH = CACHE_PATH / "warmup"
+LLM_STATE_CACHE_PATH = CACHE_PATH / "llm_state"
+TTS_AUDIO_CACHE_PATH = CACHE_PATH / "tts_audio"
+
 
 def load_third_party():
     # 添加第三方库到 Python 路径
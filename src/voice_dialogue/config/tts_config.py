@@ -0,0 +1,121 @@
+"""TTS运行时配置管理"""
+import os
+from typing import Dict, Any, List
+
+from .paths import TTS_AUDIO_CACHE_PATH
+
+TTS_RESIDENCY_BUDGET_ENV = 'VOICE_DIALOGUE_TTS_MEMORY_MB'
+
+__all__ = (
+    'get_tts_audio_cache_params',
+    'get_kokoro_onnx_session_params',
+    'get_tts_residency_params',
+    'get_moyoyo_bert_cache_params',
+    'TTS_PREWARM_PHRASES',
+)
+
+# 启动时预先合成的常用短语（问候、确认、错误提示等）
+TTS_PREWARM_PHRASES: Dict[str, List[str]] = {
+    'zh': [
+        '你好！',
+        '你好，有什么可以帮你的吗？',
+        '好的。',
+        '好的，我来说说。',
+        '这个问题很有意思。',
+        '嗯，让我想想。',
+        '抱歉，我没有听清楚。',
+        '抱歉，出了点问题，请再说一遍。',
+        '不客气。',
+        '再见！',
+    ],
+    'en': [
+        'Hello!',
+        'Hi, how can I help you?',
+        'Sure.',
+        'Sure, let me explain.',
+        'Good question.',
+        'Hmm, let me think.',
+        "Sorry, I didn't catch that.",
+        'Sorry, something went wrong. Please say that again.',
+        "You're welcome.",
+        'Goodbye!',
+    ],
+}
+
+
+def get_tts_audio_cache_params() -> Dict[str, Any]:
+    """
+    获取 TTS 音频缓存参数：内存 LRU + 磁盘 FLAC 两级缓存
+
+    Returns:
+        Dict[str, Any]: 缓存参数
+    """
+    return {
+        'enabled': True,
+        'cache_dir': TTS_AUDIO_CACHE_PATH,
+        'max_memory_bytes': 64 << 20,
+        'max_disk_bytes': 512 << 20,
+        # 超过该长度的句子不太可能重复，不缓存
+        'max_text_chars': 80,
+        'prewarm_phrases': TTS_PREWARM_PHRASES,
+    }
+
+
+
+def get_kokoro_onnx_session_params() -> Dict[str, Any]:
+    """
+    获取 Kokoro ONNX Runtime 会话参数
+
+    使用同一模型文件的音色共享一个会话，这些参数对所有音色生效。
+    intra_op_num_threads 为 None 时按硬件自动设置（见 utils.hardware.get_thread_config）
+
+    Returns:
+        Dict[str, Any]: 会话参数
+    """
+    env_provider = os.getenv("ONNX_PROVIDER")
+    return {
+        'intra_op_num_threads': None,
+        'inter_op_num_threads': 1,
+        # disable / basic / extended / all
+        'graph_optimization_level': 'all',
+        # CPU 内存池：复用推理中间张量的内存，关闭后内存占用更低但推理略慢
+        'enable_cpu_mem_arena': True,
+        'enable_mem_pattern': True,
+        'providers': [env_provider] if env_provider else ['CPUExecutionProvider'],
+    }
+
+
+def get_tts_residency_params() -> Dict[str, Any]:
+    """
+    获取多音色常驻池参数
+
+    已加载并预热的音色在内存预算内常驻，超出预算时淘汰最久未使用且未被占用的音色。
+    预算默认取可用内存的 1/4，可通过环境变量 VOICE_DIALOGUE_TTS_MEMORY_MB 覆盖
+
+    Returns:
+        Dict[str, Any]: 常驻池参数
+    """
+    from voice_dialogue.utils.hardware import get_hardware_profile
+
+    budget_mb = os.getenv(TTS_RESIDENCY_BUDGET_ENV)
+    if budget_mb:
+        max_memory_bytes = int(float(budget_mb) * (1 << 20))
+    else:
+        max_memory_bytes = get_hardware_profile().memory_bytes // 4
+    return {
+        'max_memory_bytes': max_memory_bytes,
+    }
+
+
+def get_moyoyo_bert_cache_params() -> Dict[str, Any]:
+    """
+    获取 MoYoYo 文本前端 BERT 特征缓存参数，使用同一 BERT 模型的音色共享缓存
+
+    Returns:
+        Dict[str, Any]: 缓存参数
+    """
+    return {
+        'enabled': True,
+        # 每个分句特征约 1024 x 音素数 x 4 字节，64MB 可缓存数百句
+        'max_bytes': 64 << 20,
+    }
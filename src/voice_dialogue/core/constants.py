@@ -1,9 +1,11 @@
 import asyncio
 import multiprocessing
 import threading
-from collections import OrderedDict
 
 from voice_dialogue.utils.cache import LRUCacheDict
+from .history_store import SessionHistoryStore
+from .pipeline_metrics import PipelineMetrics
+from .response_cache import ResponseCache
 from .session_manager import SessionIdManager
 from .state_manager import VoiceStateManager
 
@@ -59,10 +61,16 @@ websocket_message_queue = asyncio.Queue()
 voice_state_manager = VoiceStateManager()
 
 # 会话缓存
-chat_history_cache: dict[str, OrderedDict] = {}
+chat_history_store = SessionHistoryStore(max_turns=3, token_budget=1024)
 session_manager: SessionIdManager = SessionIdManager()
 dropped_audio_cache = LRUCacheDict(maxsize=50)
 
+# 回答缓存（文本 + 合成音频），重复的寒暄类问题直接播放
+response_cache = ResponseCache(max_entries=128, ttl_seconds=24 * 3600)
+
+# 流水线实时指标（TTS RTF、LLM 速率、待播放音频）
+pipeline_metrics = PipelineMetrics()
+
 # ======================= 线程事件对象 =======================
 
 # 音频播放相关事件
@@ -0,0 +1,234 @@
+import math
+import re
+import threading
+import time
+import typing
+from collections import OrderedDict
+
+_CJK_PATTERN = re.compile(r'[぀-ヿ㐀-䶿一-鿿豈-﫿가-힯]')
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估计文本的 token 数：中日韩字符按1个token计，其余按单词数的1.3倍计"""
+    if not text:
+        return 0
+    cjk_count = len(_CJK_PATTERN.findall(text))
+    other_words = len(_CJK_PATTERN.sub(' ', text).split())
+    return cjk_count + math.ceil(other_words * 1.3)
+
+
+class ChatTurn:
+    """一轮对话（用户问题 + AI 回答的句子列表），缓存其 token 数"""
+
+    __slots__ = ('question', 'answer_sentences', 'token_count', 'char_count', '_dirty')
+
+    def __init__(self, question: str):
+        self.question = question or ''
+        self.answer_sentences: typing.List[str] = []
+        self.token_count = 0
+        self.char_count = len(self.question)
+        self._dirty = True
+
+    def append_sentence(self, sentence: str) -> None:
+        self.answer_sentences.append(sentence)
+        self.char_count += len(sentence)
+        self._dirty = True
+
+    @property
+    def answer(self) -> str:
+        return ' '.join(self.answer_sentences)
+
+    def count_tokens(self, token_counter: typing.Callable[[str], int]) -> int:
+        """仅在内容变化后重新计算 token 数"""
+        if self._dirty:
+            self.token_count = token_counter(self.question) + token_counter(self.answer)
+            self._dirty = False
+        return self.token_count
+
+
+class SessionHistory:
+    """单个会话的滚动对话窗口"""
+
+    def __init__(self):
+        self.turns: typing.OrderedDict[str, ChatTurn] = OrderedDict()
+        self.char_count = 0
+        self.last_access = time.monotonic()
+
+    def add_sentence(self, answer_id: str, question: str, sentence: str) -> int:
+        """追加一句 AI 回答，返回新增的字符数"""
+        turn = self.turns.get(answer_id)
+        added_chars = len(sentence)
+        if turn is None:
+            turn = ChatTurn(question)
+            self.turns[answer_id] = turn
+            added_chars += turn.char_count
+        turn.append_sentence(sentence)
+        self.char_count += added_chars
+        self.last_access = time.monotonic()
+        return added_chars
+
+    def pop_oldest(self) -> int:
+        """移除最早的一轮对话，返回释放的字符数"""
+        _, turn = self.turns.popitem(last=False)
+        self.char_count -= turn.char_count
+        return turn.char_count
+
+    def trim(self, max_turns: int, token_budget: int, token_counter: typing.Callable[[str], int]) -> int:
+        """
+        按轮数和 token 预算裁剪窗口，只需计算新变化的轮次
+
+        Returns:
+            int: 释放的字符数
+        """
+        released_chars = 0
+        while len(self.turns) > max_turns:
+            released_chars += self.pop_oldest()
+
+        # 从最新一轮向前累加，超出预算的更早轮次全部移除
+        total_tokens = 0
+        keep_count = 0
+        for turn in reversed(self.turns.values()):
+            total_tokens += turn.count_tokens(token_counter)
+            if total_tokens > token_budget and keep_count > 0:
+                break
+            keep_count += 1
+
+        while len(self.turns) > keep_count:
+            released_chars += self.pop_oldest()
+        return released_chars
+
+    def to_messages(self) -> typing.List[dict]:
+        messages = []
+        for turn in self.turns.values():
+            messages.append({'role': 'user', 'content': turn.question})
+            messages.append({'role': 'assistant', 'content': turn.answer})
+        return messages
+
+
+class SessionHistoryStore:
+    """
+    会话历史存储
+
+    每个会话只保留最近 max_turns 轮且总 token 数不超过 token_budget 的对话，
+    每轮对话的 token 数只在内容变化时计算一次，因此每轮的开销与对话长度无关。
+    所有会话按最近访问顺序排列，超出全局字符上限或空闲超过 idle_ttl 秒的会话会被淘汰。
+    """
+
+    def __init__(
+            self,
+            max_turns: int = 3,
+            token_budget: int = 1024,
+            max_total_chars: int = 2_000_000,
+            idle_ttl: float = 3600.0,
+            token_counter: typing.Callable[[str], int] = estimate_tokens,
+    ):
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.max_total_chars = max_total_chars
+        self.idle_ttl = idle_ttl
+        self.token_counter = token_counter
+
+        self._sessions: typing.OrderedDict[str, SessionHistory] = OrderedDict()
+        self._total_chars = 0
+        self._evicted_sessions = 0
+        self._lock = threading.Lock()
+
+    def set_token_counter(self, token_counter: typing.Callable[[str], int]) -> None:
+        """设置 token 计数函数（例如模型分词器），已缓存的计数会在下次访问时重新计算"""
+        with self._lock:
+            self.token_counter = token_counter
+            for session in self._sessions.values():
+                for turn in session.turns.values():
+                    turn._dirty = True
+
+    def add_answer_sentence(self, session_id: str, answer_id: str, question: str, sentence: str) -> None:
+        """
+        记录一句 AI 回答
+
+        Args:
+            session_id: 会话ID
+            answer_id: 回答ID，同一轮对话的所有句子共享
+            question: 用户问题
+            sentence: AI 回答的句子
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = SessionHistory()
+                self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+
+            self._total_chars += session.add_sentence(answer_id, question, sentence)
+            # 写入时只做轮数裁剪，token 预算在读取时按需计算
+            while len(session.turns) > self.max_turns:
+                self._total_chars -= session.pop_oldest()
+
+            self._evict()
+
+    def restore_messages(self, session_id: str, messages: typing.List[dict]) -> None:
+        """
+        从 [{'role': 'user'|'assistant', 'content': str}, ...] 恢复会话历史（如重启后从检查点恢复）
+
+        Args:
+            session_id: 会话ID
+            messages: 按问答顺序排列的历史消息
+        """
+        question = None
+        for index, message in enumerate(messages):
+            if message['role'] == 'user':
+                question = message['content']
+            elif message['role'] == 'assistant' and question is not None:
+                self.add_answer_sentence(session_id, f'restored-{index}', question, message['content'])
+                question = None
+
+    def get_messages(self, session_id: str) -> typing.List[dict]:
+        """
+        获取会话在 token 预算内的历史消息
+
+        Returns:
+            list: [{'role': 'user'|'assistant', 'content': str}, ...]
+        """
+        with self._lock:
+            self._evict()
+            session = self._sessions.get(session_id)
+            if session is None:
+                return []
+
+            self._sessions.move_to_end(session_id)
+            session.last_access = time.monotonic()
+            self._total_chars -= session.trim(self.max_turns, self.token_budget, self.token_counter)
+            return session.to_messages()
+
+    def clear_session(self, session_id: str) -> None:
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self._total_chars -= session.char_count
+
+    def _evict(self) -> None:
+        """淘汰空闲超时的会话，以及超出全局字符上限的最久未访问会话"""
+        now = time.monotonic()
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            is_expired = self.idle_ttl and now - session.last_access > self.idle_ttl
+            # 至少保留最近访问的会话
+            is_over_capacity = self._total_chars > self.max_total_chars and len(self._sessions) > 1
+            if not (is_expired or is_over_capacity):
+                break
+            del self._sessions[session_id]
+            self._total_chars -= session.char_count
+            self._evicted_sessions += 1
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._sessions
+
+    def get_statistics(self) -> dict:
+        with self._lock:
+            return {
+                'session_count': len(self._sessions),
+                'total_chars': self._total_chars,
+                'evicted_sessions': self._evicted_sessions,
+                'max_turns': self.max_turns,
+                'token_budget': self.token_budget,
+            }
@@ -0,0 +1,143 @@
+import threading
+import time
+import typing
+
+# 英文平均每个单词（含空格）的字符数，用于 LLM 字符速率与单词速率的换算
+EN_CHARS_PER_WORD = 5.5
+
+
+class ExponentialMovingAverage:
+    """指数滑动平均"""
+
+    def __init__(self, alpha: float = 0.3, initial: typing.Optional[float] = None):
+        self.alpha = alpha
+        self.value = initial
+        self.count = 0
+
+    def update(self, sample: float) -> float:
+        if self.value is None or self.count == 0:
+            self.value = sample
+        else:
+            self.value = self.alpha * sample + (1 - self.alpha) * self.value
+        self.count += 1
+        return self.value
+
+
+def count_text_units(text: str, language: str) -> int:
+    """中文按字符计数，英文按单词计数"""
+    if language == 'zh':
+        return len(text.strip())
+    return len(text.split())
+
+
+class PipelineMetrics:
+    """
+    LLM → TTS → 播放 流水线的实时指标
+
+    - TTS 实时率 (RTF = 合成耗时 / 音频时长) 以及每个文本单位对应的音频时长
+    - LLM 输出速率（字符/秒）
+    - 已合成但尚未播放的音频时长
+    """
+
+    def __init__(
+            self,
+            default_tts_rtf: float = 0.5,
+            default_llm_chars_per_second: float = 20.0,
+            default_audio_seconds_per_unit: typing.Dict[str, float] = None,
+    ):
+        self._lock = threading.Lock()
+        self.tts_rtf = ExponentialMovingAverage(initial=default_tts_rtf)
+        self.llm_chars_per_second = ExponentialMovingAverage(initial=default_llm_chars_per_second)
+        defaults = default_audio_seconds_per_unit or {'zh': 0.25, 'en': 0.35}
+        self.audio_seconds_per_unit = {
+            language: ExponentialMovingAverage(initial=value) for language, value in defaults.items()
+        }
+
+        self._queued_audio_seconds = 0.0
+        self._playing_until = 0.0
+
+        self.playback_gap = ExponentialMovingAverage(initial=0.0)
+        self.max_playback_gap = 0.0
+
+        # 从开始合成到第一个音频片段可以播放的耗时
+        self.tts_first_audio_latency = ExponentialMovingAverage(initial=0.0)
+
+    # ---------------- TTS / LLM 速率 ----------------
+
+    def record_tts_synthesis(self, text: str, language: str, synthesis_seconds: float, audio_seconds: float) -> None:
+        """记录一次 TTS 合成的耗时与生成的音频时长"""
+        if audio_seconds <= 0:
+            return
+        units = count_text_units(text, language)
+        with self._lock:
+            self.tts_rtf.update(synthesis_seconds / audio_seconds)
+            if units > 0:
+                ema = self.audio_seconds_per_unit.setdefault(language, ExponentialMovingAverage())
+                ema.update(audio_seconds / units)
+
+    def record_tts_first_audio(self, latency_seconds: float) -> None:
+        """记录一句话从开始合成到第一个音频片段产出的耗时"""
+        with self._lock:
+            self.tts_first_audio_latency.update(latency_seconds)
+
+    def record_llm_output(self, char_count: int, generation_seconds: float) -> None:
+        """记录一轮 LLM 生成的可见字符数与耗时"""
+        if char_count <= 0 or generation_seconds <= 0:
+            return
+        with self._lock:
+            self.llm_chars_per_second.update(char_count / generation_seconds)
+
+    def get_llm_units_per_second(self, language: str) -> float:
+        chars_per_second = self.llm_chars_per_second.value
+        return chars_per_second if language == 'zh' else chars_per_second / EN_CHARS_PER_WORD
+
+    def get_audio_seconds_per_unit(self, language: str) -> float:
+        ema = self.audio_seconds_per_unit.get(language)
+        return ema.value if ema is not None and ema.value else 0.3
+
+    # ---------------- 待播放音频 ----------------
+
+    def add_buffered_audio(self, audio_seconds: float) -> None:
+        """TTS 合成完成，音频进入播放队列"""
+        with self._lock:
+            self._queued_audio_seconds += audio_seconds
+
+    def start_playback(self, audio_seconds: float) -> None:
+        """音频开始播放，从队列时长转为正在播放的剩余时长"""
+        with self._lock:
+            self._queued_audio_seconds = max(0.0, self._queued_audio_seconds - audio_seconds)
+            self._playing_until = time.monotonic() + audio_seconds
+
+    def finish_playback(self) -> None:
+        with self._lock:
+            self._playing_until = 0.0
+
+    def discard_buffered_audio(self, audio_seconds: float) -> None:
+        """队列中的音频被丢弃（任务中断或失效）"""
+        with self._lock:
+            self._queued_audio_seconds = max(0.0, self._queued_audio_seconds - audio_seconds)
+
+    def record_playback_gap(self, gap_seconds: float) -> None:
+        """记录同一回答中上一句播放结束到下一句开始播放之间的间隔"""
+        with self._lock:
+            self.playback_gap.update(gap_seconds)
+            self.max_playback_gap = max(self.max_playback_gap, gap_seconds)
+
+    def get_buffered_audio_seconds(self) -> float:
+        """已合成但尚未播放完的音频时长（秒）"""
+        with self._lock:
+            playing_remaining = max(0.0, self._playing_until - time.monotonic())
+            return self._queued_audio_seconds + playing_remaining
+
+    def get_statistics(self) -> dict:
+        return {
+            'tts_rtf': round(self.tts_rtf.value, 4),
+            'llm_chars_per_second': round(self.llm_chars_per_second.value, 2),
+            'audio_seconds_per_unit': {
+                language: round(ema.value, 4) for language, ema in self.audio_seconds_per_unit.items() if ema.value
+            },
+            'buffered_audio_seconds': round(self.get_buffered_audio_seconds(), 2),
+            'playback_gap_seconds': round(self.playback_gap.value, 3),
+            'max_playback_gap_seconds': round(self.max_playback_gap, 3),
+            'tts_first_audio_seconds': round(self.tts_first_audio_latency.value, 3),
+        }
@@ -0,0 +1,214 @@
+import hashlib
+import threading
+import time
+import typing
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+def normalize_question(text: str) -> str:
+    """
+    问题文本的归一化形式：全半角统一 (NFKC)、大小写折叠、去掉标点和空白
+
+    “你好！”、“你好。”、“ 你好 ” 以及 “What can you do?”、“what can you do” 归一化后相同
+    """
+    text = unicodedata.normalize('NFKC', text or '').casefold()
+    return ''.join(
+        char for char in text
+        if not char.isspace() and not unicodedata.category(char).startswith(('P', 'S'))
+    )
+
+
+def prompt_version(system_prompt: str) -> str:
+    return hashlib.sha256(system_prompt.encode('utf-8')).hexdigest()[:16]
+
+
+@dataclass
+class CachedSentence:
+    sentence: str
+    # 仅包含标点等未合成音频的句子为 None
+    audio: typing.Optional[typing.Tuple[np.ndarray, int]]
+
+    @property
+    def audio_bytes(self) -> int:
+        return self.audio[0].nbytes if self.audio is not None else 0
+
+
+@dataclass
+class CachedResponse:
+    sentences: typing.List[CachedSentence]
+    created_at: float = field(default_factory=time.monotonic)
+    hits: int = 0
+
+    @property
+    def audio_bytes(self) -> int:
+        return sum(sentence.audio_bytes for sentence in self.sentences)
+
+
+@dataclass
+class _PendingResponse:
+    key: str
+    sentences: typing.Dict[int, CachedSentence] = field(default_factory=dict)
+    sentence_count: typing.Optional[int] = None
+    started_at: float = field(default_factory=time.monotonic)
+
+
+class ResponseCache:
+    """
+    回答缓存（文本 + 合成音频）
+
+    以 (归一化问题, 语言, 提示词版本, 音色) 为 key 保存完整回答的所有句子及其音频，
+    命中时跳过 LLM 和 TTS 直接播放。
+    回答的句子由 TTS 服务逐句写入、LLM 服务在生成结束时告知句子总数，全部到齐后才会写入缓存，
+    被打断或丢弃的回答不会被缓存。按 TTL、条目数和音频总字节数淘汰（LRU）。
+    """
+
+    def __init__(
+            self,
+            max_entries: int = 128,
+            max_audio_bytes: int = 256 << 20,
+            ttl_seconds: float = 24 * 3600,
+            max_question_chars: int = 32,
+            pending_timeout: float = 120.0,
+    ):
+        self.max_entries = max_entries
+        self.max_audio_bytes = max_audio_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_question_chars = max_question_chars
+        self.pending_timeout = pending_timeout
+
+        self.voice = ''
+        self._entries: typing.OrderedDict[str, CachedResponse] = OrderedDict()
+        self._pending: typing.Dict[str, _PendingResponse] = {}
+        self._audio_bytes = 0
+        self._lock = threading.Lock()
+
+        self.lookups = 0
+        self.hits = 0
+        self.stored = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def set_voice(self, voice: str) -> None:
+        """TTS 音色变化时调用，旧音色的缓存自然失效"""
+        self.voice = voice
+
+    def make_key(self, question: str, language: str, system_prompt: str) -> typing.Optional[str]:
+        """
+        生成缓存 key，问题过长（不太可能重复）时返回 None
+
+        Args:
+            question: 用户问题
+            language: 语言
+            system_prompt: 当前系统提示词
+
+        Returns:
+            Optional[str]: 缓存 key
+        """
+        normalized = normalize_question(question)
+        if not normalized or len(normalized) > self.max_question_chars:
+            return None
+        return f"{language}|{prompt_version(system_prompt)}|{self.voice}|{normalized}"
+
+    # ---------------- 查询 ----------------
+
+    def get(self, key: str) -> typing.Optional[CachedResponse]:
+        with self._lock:
+            self.lookups += 1
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry.created_at > self.ttl_seconds:
+                self._remove(key)
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            entry.hits += 1
+            self.hits += 1
+            return entry
+
+    # ---------------- 写入 ----------------
+
+    def record_sentence(
+            self, key: str, answer_id: str, answer_index: int, sentence: str,
+            audio: typing.Optional[typing.Tuple[np.ndarray, int]],
+    ) -> None:
+        """TTS 服务写入一句回答及其音频"""
+        with self._lock:
+            pending = self._pending.get(answer_id)
+            if pending is None:
+                pending = _PendingResponse(key)
+                self._pending[answer_id] = pending
+            pending.sentences[answer_index] = CachedSentence(sentence, audio)
+            self._try_commit(answer_id)
+
+    def finish_answer(self, key: str, answer_id: str, sentence_count: int) -> None:
+        """LLM 服务生成结束时告知回答的句子总数"""
+        with self._lock:
+            if sentence_count <= 0:
+                self._pending.pop(answer_id, None)
+                return
+            pending = self._pending.get(answer_id)
+            if pending is None:
+                pending = _PendingResponse(key)
+                self._pending[answer_id] = pending
+            pending.sentence_count = sentence_count
+            self._try_commit(answer_id)
+            self._expire_pending()
+
+    def _try_commit(self, answer_id: str) -> None:
+        pending = self._pending[answer_id]
+        if pending.sentence_count is None or len(pending.sentences) < pending.sentence_count:
+            return
+        del self._pending[answer_id]
+        if any(index not in pending.sentences for index in range(pending.sentence_count)):
+            return
+
+        entry = CachedResponse([pending.sentences[index] for index in range(pending.sentence_count)])
+        if pending.key in self._entries:
+            self._remove(pending.key)
+        self._entries[pending.key] = entry
+        self._audio_bytes += entry.audio_bytes
+        self.stored += 1
+        self._evict()
+
+    def _expire_pending(self) -> None:
+        """清理长时间未完成（被打断或丢弃）的回答"""
+        now = time.monotonic()
+        for answer_id in [a for a, p in self._pending.items() if now - p.started_at > self.pending_timeout]:
+            del self._pending[answer_id]
+
+    # ---------------- 淘汰 ----------------
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._audio_bytes -= entry.audio_bytes
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self._audio_bytes > self.max_audio_bytes):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self) -> None:
+        """清空缓存（提示词变化时调用）"""
+        with self._lock:
+            self._entries.clear()
+            self._pending.clear()
+            self._audio_bytes = 0
+            self.invalidations += 1
+
+    def get_statistics(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'audio_bytes': self._audio_bytes,
+                'lookups': self.lookups,
+                'hits': self.hits,
+                'hit_rate': round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+                'stored': self.stored,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
@@ -1,11 +1,15 @@
 import threading
 import uuid
 
+from voice_dialogue.utils.cache import LRUCacheDict
+
 
 class SessionIdManager:
     def __init__(self):
         self._current_id: str = f'{uuid.uuid4()}'
         self._lock = threading.Lock()  # 为线程安全添加锁
+        # 已被新会话取代的会话ID
+        self._ended_ids = LRUCacheDict(maxsize=256)
 
     def get_id(self) -> str:
         """获取当前的会话ID (线程安全)。"""
@@ -15,14 +19,26 @@ class SessionIdManager:
     def set_id(self, new_id: str) -> None:
         """设置新的会话ID (线程安全)。"""
         with self._lock:
-            self._current_id = new_id
+            self._switch_to(new_id)
 
     def reset_id(self) -> str:
         """生成一个新的UUID作为会话ID，并更新当前ID，然后返回新的ID (线程安全)。"""
         with self._lock:
-            self._current_id = f'{uuid.uuid4()}'
+            self._switch_to(f'{uuid.uuid4()}')
             return self._current_id
 
+    def _switch_to(self, new_id: str) -> None:
+        if new_id != self._current_id:
+            self._ended_ids[self._current_id] = True
+        if new_id in self._ended_ids:
+            del self._ended_ids[new_id]
+        self._current_id = new_id
+
+    def is_ended(self, session_id: str) -> bool:
+        """会话是否已被新会话取代 (线程安全)。并发处理多个会话时用于判断任务是否仍然有效。"""
+        with self._lock:
+            return session_id in self._ended_ids
+
     @property
     def current_id(self) -> str:
         """通过属性方式获取当前的会话ID (线程安全)。"""
@@ -12,6 +12,8 @@ class VoiceStateManager:
         self._audio_task_states = LRUCacheDict(maxsize=10)
         self.waiting_second_answer_mapping = LRUCacheDict(maxsize=10)
         self._interrupt_task_id = ''
+        # 发起中断的任务所属的会话
+        self._interrupt_session_id = ''
 
     @property
     def task_id(self):
@@ -54,5 +56,15 @@ class VoiceStateManager:
     def interrupt_task_id(self, value):
         self._interrupt_task_id = value
 
+    @property
+    def interrupt_session_id(self):
+        return self._interrupt_session_id
+
+    def interrupt(self, task_id, session_id):
+        """由任务 task_id 中断其所在会话的其他任务"""
+        self._interrupt_session_id = session_id
+        self.interrupt_task_id = task_id
+
     def reset_interrupt_task_id(self):
         self.interrupt_task_id = ''
+        self._interrupt_session_id = ''
@@ -0,0 +1,289 @@
+import pathlib
+import time
+import typing
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+
+from voice_dialogue.utils.logger import logger
+
+if typing.TYPE_CHECKING:
+    from voice_dialogue.llm.speculative import SpeculativeStats
+
+# 传给 llama_cpp.Llama 构造函数的参数，其余参数作为采样参数在生成时传入
+LLAMA_INIT_PARAM_KEYS = {
+    'n_gpu_layers', 'n_batch', 'n_ubatch', 'n_threads', 'n_threads_batch', 'n_ctx',
+    'seed', 'use_mmap', 'use_mlock', 'flash_attn', 'verbose', 'draft_model',
+}
+LLAMA_SAMPLING_PARAM_KEYS = {
+    'temperature', 'top_p', 'top_k', 'min_p', 'max_tokens', 'repeat_penalty',
+    'presence_penalty', 'frequency_penalty', 'stop',
+}
+# 兼容配置中的历史拼写
+LLAMA_PARAM_ALIASES = {
+    'mini_p': 'min_p',
+}
+
+
+@dataclass
+class StreamTiming:
+    """单次流式生成的时间统计"""
+    start_time: float = field(default_factory=time.perf_counter)
+    first_token_time: typing.Optional[float] = None
+    last_token_time: typing.Optional[float] = None
+    chunk_count: int = 0
+
+    def tick(self) -> None:
+        now = time.perf_counter()
+        if self.first_token_time is None:
+            self.first_token_time = now
+        self.last_token_time = now
+        self.chunk_count += 1
+
+    @property
+    def time_to_first_token(self) -> float:
+        """首个 token 的延迟（秒）"""
+        if self.first_token_time is None:
+            return 0.0
+        return self.first_token_time - self.start_time
+
+    @property
+    def mean_token_interval(self) -> float:
+        """首个 token 之后相邻 token 的平均间隔（秒）"""
+        if self.chunk_count < 2:
+            return 0.0
+        return (self.last_token_time - self.first_token_time) / (self.chunk_count - 1)
+
+
+def split_llama_params(model_params: dict) -> typing.Tuple[dict, dict]:
+    """
+    将 get_llm_model_params 的参数拆分为模型初始化参数和采样参数
+
+    Args:
+        model_params: LLM 模型参数
+
+    Returns:
+        (初始化参数, 采样参数)
+    """
+    flat_params = {k: v for k, v in model_params.items() if k not in ('model_kwargs', 'speculative_decoding')}
+    flat_params.update(model_params.get('model_kwargs') or {})
+
+    init_params, sampling_params = {}, {}
+    for key, value in flat_params.items():
+        key = LLAMA_PARAM_ALIASES.get(key, key)
+        if key in LLAMA_INIT_PARAM_KEYS:
+            init_params[key] = value
+        elif key in LLAMA_SAMPLING_PARAM_KEYS:
+            sampling_params[key] = value
+    return init_params, sampling_params
+
+
+class ChatBackend(ABC):
+    """LLM 对话后端接口"""
+
+    # 是否支持以给定的 assistant 前缀续写回答
+    supports_assistant_prefix = False
+
+    @property
+    @abstractmethod
+    def llama(self):
+        """底层的 llama_cpp.Llama 实例"""
+        pass
+
+    @property
+    def speculative_stats(self) -> typing.Optional['SpeculativeStats']:
+        """推测解码的接受率统计，未启用推测解码时为 None"""
+        draft_model = getattr(self.llama, 'draft_model', None)
+        return getattr(draft_model, 'stats', None)
+
+    @abstractmethod
+    def stream(
+            self, system_prompt: str, history: typing.List[dict], user_input: str, assistant_prefix: str = ''
+    ) -> typing.Iterator[str]:
+        """
+        流式生成回答
+
+        Args:
+            system_prompt: 系统提示词
+            history: 历史消息列表，每条为 {'role': 'user'|'assistant', 'content': str}
+            user_input: 用户输入
+            assistant_prefix: 已经输出的回答开头，模型从这里接着生成（不包含在返回内容中）
+
+        Returns:
+            Iterator[str]: 生成的文本片段
+        """
+        pass
+
+    def warmup(self, system_prompt: str) -> None:
+        logger.info("Warmup chat backend...")
+        user_input = 'Hello, this is warming up step, if you understand, output "Ok".'
+        for _ in self.stream(system_prompt, [], user_input):
+            pass
+
+
+class LlamaCppChatBackend(ChatBackend):
+    """直接调用 llama_cpp.Llama.create_chat_completion 的流式后端"""
+
+    def __init__(self, local_model_path: str, model_params: dict, enable_thinking: bool = True):
+        from llama_cpp import Llama
+
+        from voice_dialogue.llm.speculative import create_draft_model
+
+        logger.info(">>>>>>> Initializing LlamaCpp native instance...")
+        init_params, self.sampling_params = split_llama_params(model_params)
+        draft_model = create_draft_model(model_params.get('speculative_decoding'))
+        if draft_model is not None:
+            init_params['draft_model'] = draft_model
+        self.client = Llama(model_path=str(pathlib.Path(local_model_path)), **init_params)
+        self.enable_thinking = enable_thinking
+
+        self._chat_template, supports_thinking_switch = self._load_chat_template()
+        # 关闭推理时需要自行渲染模板
+        self._disable_thinking = not enable_thinking and supports_thinking_switch
+        if not enable_thinking:
+            if self._disable_thinking:
+                logger.info("已在对话模板中关闭推理 (enable_thinking=False)")
+            else:
+                logger.info("对话模板不支持 enable_thinking，使用提示词控制推理")
+
+    @property
+    def llama(self):
+        return self.client
+
+    @property
+    def supports_assistant_prefix(self) -> bool:
+        return self._chat_template is not None
+
+    def _load_chat_template(self):
+        """
+        加载模型自带的对话模板
+
+        llama-cpp-python 的模板渲染不会传入 enable_thinking，也无法续写 assistant 前缀，
+        因此在需要关闭推理（如 Qwen3）或续写时自行渲染模板
+
+        Returns:
+            (模板, 模板是否支持 enable_thinking 开关)
+        """
+        chat_template = self.client.metadata.get('tokenizer.chat_template')
+        if not chat_template:
+            return None, False
+
+        from jinja2.sandbox import ImmutableSandboxedEnvironment
+
+        def raise_exception(message):
+            raise ValueError(message)
+
+        environment = ImmutableSandboxedEnvironment(trim_blocks=True, lstrip_blocks=True)
+        environment.globals['raise_exception'] = raise_exception
+        return environment.from_string(chat_template), 'enable_thinking' in chat_template
+
+    def render_prompt(self, messages: typing.List[dict]) -> str:
+        """用模型自带的对话模板渲染 prompt（以 assistant 开头结束）"""
+
+        def token_text(token: int) -> str:
+            return self.client.detokenize([token], special=True).decode('utf-8', errors='ignore')
+
+        template_params = {'enable_thinking': False} if self._disable_thinking else {}
+        return self._chat_template.render(
+            messages=messages,
+            add_generation_prompt=True,
+            bos_token=token_text(self.client.token_bos()),
+            eos_token=token_text(self.client.token_eos()),
+            **template_params,
+        )
+
+    def stream(
+            self, system_prompt: str, history: typing.List[dict], user_input: str, assistant_prefix: str = ''
+    ) -> typing.Iterator[str]:
+        messages = [{'role': 'system', 'content': system_prompt}]
+        messages.extend(history)
+        messages.append({'role': 'user', 'content': user_input})
+
+        if self._disable_thinking or assistant_prefix:
+            if not self.supports_assistant_prefix:
+                raise ValueError("模型没有对话模板，无法续写回答前缀")
+            prompt = self.render_prompt(messages) + assistant_prefix
+            for chunk in self.client.create_completion(prompt=prompt, stream=True, **self.sampling_params):
+                content = chunk['choices'][0]['text']
+                if content:
+                    yield content
+            return
+
+        for chunk in self.client.create_chat_completion(messages=messages, stream=True, **self.sampling_params):
+            content = chunk['choices'][0]['delta'].get('content')
+            if content:
+                yield content
+
+
+class LangChainChatBackend(ChatBackend):
+    """基于 LangChain ChatLlamaCpp 的流式后端"""
+
+    def __init__(self, local_model_path: str, model_params: dict, enable_thinking: bool = True):
+        from voice_dialogue.llm.processor import create_langchain_chat_llamacpp_instance
+
+        # LangChain 后端通过提示词中的 /no_think 控制推理
+        self.enable_thinking = enable_thinking
+        self.instance = create_langchain_chat_llamacpp_instance(
+            local_model_path=local_model_path, model_params=model_params
+        )
+        self._pipelines = {}
+
+    @property
+    def llama(self):
+        return self.instance.client
+
+    def _get_pipeline(self, system_prompt: str):
+        """按系统提示词复用 pipeline，避免每轮对话重新构建"""
+        from voice_dialogue.llm.processor import create_langchain_prompt_pipeline
+
+        pipeline = self._pipelines.get(system_prompt)
+        if pipeline is None:
+            pipeline = create_langchain_prompt_pipeline(self.instance, system_prompt)
+            self._pipelines[system_prompt] = pipeline
+        return pipeline
+
+    def stream(
+            self, system_prompt: str, history: typing.List[dict], user_input: str, assistant_prefix: str = ''
+    ) -> typing.Iterator[str]:
+        from langchain_core.messages import AIMessage, HumanMessage
+
+        if assistant_prefix:
+            raise NotImplementedError("LangChain 后端不支持续写回答前缀")
+
+        history_messages = [
+            HumanMessage(content=message['content']) if message['role'] == 'user'
+            else AIMessage(content=message['content'])
+            for message in history
+        ]
+        pipeline = self._get_pipeline(system_prompt)
+        for chunk in pipeline.stream(input={'input': user_input, 'history': history_messages}):
+            if chunk.content:
+                yield chunk.content
+
+
+CHAT_BACKENDS: typing.Dict[str, typing.Type[ChatBackend]] = {
+    'native': LlamaCppChatBackend,
+    'langchain': LangChainChatBackend,
+}
+
+
+def create_chat_backend(
+        backend_name: str, local_model_path: str, model_params: dict, enable_thinking: bool = True
+) -> ChatBackend:
+    """
+    创建 LLM 对话后端
+
+    Args:
+        backend_name: 后端名称，'native' 或 'langchain'
+        local_model_path: 模型文件路径
+        model_params: LLM 模型参数
+        enable_thinking: 是否允许模型输出推理块
+
+    Returns:
+        ChatBackend: 对话后端实例
+    """
+    backend_class = CHAT_BACKENDS.get(backend_name)
+    if backend_class is None:
+        raise ValueError(f"未知的LLM后端: {backend_name}")
+
+    logger.info(f"使用LLM后端: {backend_name}")
+    return backend_class(local_model_path, model_params, enable_thinking=enable_thinking)
@@ -0,0 +1,479 @@
+import codecs
+import ctypes
+import queue
+import threading
+import time
+import typing
+from collections import deque
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from voice_dialogue.llm.backends import ChatBackend, LlamaCppChatBackend
+from voice_dialogue.utils.logger import logger
+
+# llama.cpp 在不同版本中重命名了 KV 缓存接口
+_KV_SEQ_RM_NAMES = ('llama_kv_self_seq_rm', 'llama_kv_cache_seq_rm')
+
+
+def _get_kv_seq_rm():
+    import llama_cpp
+
+    for name in _KV_SEQ_RM_NAMES:
+        function = getattr(llama_cpp, name, None)
+        if function is not None:
+            return function
+    raise RuntimeError("当前 llama-cpp-python 不支持删除 KV 缓存序列")
+
+
+def sample_token(
+        logits: np.ndarray,
+        generated_tokens: typing.Set[int],
+        temperature: float = 0.7,
+        top_k: int = 20,
+        top_p: float = 0.8,
+        min_p: float = 0.0,
+        presence_penalty: float = 0.0,
+        rng: np.random.Generator = None,
+) -> int:
+    """按 llama.cpp 默认的采样顺序（penalties → top_k → top_p → min_p → temperature）采样一个 token"""
+    if presence_penalty and generated_tokens:
+        logits = logits.copy()
+        logits[list(generated_tokens)] -= presence_penalty
+
+    if temperature <= 0 or top_k == 1:
+        return int(np.argmax(logits))
+
+    if 0 < top_k < logits.shape[0]:
+        candidates = np.argpartition(-logits, top_k)[:top_k]
+    else:
+        candidates = np.arange(logits.shape[0])
+    candidate_logits = logits[candidates]
+    order = np.argsort(-candidate_logits)
+    candidates, candidate_logits = candidates[order], candidate_logits[order]
+
+    probs = np.exp(candidate_logits - candidate_logits[0])
+    probs /= probs.sum()
+    keep = probs.shape[0]
+    if top_p < 1.0:
+        keep = min(keep, int(np.searchsorted(np.cumsum(probs), top_p)) + 1)
+    if min_p > 0:
+        keep = min(keep, max(1, int(np.count_nonzero(probs >= min_p * probs[0]))))
+    candidates, candidate_logits = candidates[:keep], candidate_logits[:keep]
+
+    probs = np.exp((candidate_logits - candidate_logits[0]) / temperature)
+    probs /= probs.sum()
+    rng = rng or np.random.default_rng()
+    return int(candidates[rng.choice(keep, p=probs)])
+
+
+@dataclass
+class BatchRequest:
+    """一个会话的生成请求，对应 KV 缓存中的一个序列"""
+    prompt_tokens: typing.List[int]
+    sampling_params: dict
+    max_tokens: int
+    # 输出队列中未被读取的文本块上限，达到上限时调度器暂停该会话的解码
+    max_buffered_chunks: int = 8
+    output_queue: queue.Queue = field(default_factory=queue.Queue)
+    submit_time: float = field(default_factory=time.perf_counter)
+    first_token_time: typing.Optional[float] = None
+
+    seq_id: int = -1
+    n_past: int = 0
+    pending_token: typing.Optional[int] = None
+    generated_tokens: typing.List[int] = field(default_factory=list)
+    cancelled: bool = False
+    finished: bool = False
+
+    def __post_init__(self):
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+
+    @property
+    def is_prefilling(self) -> bool:
+        return self.n_past < len(self.prompt_tokens)
+
+    @property
+    def is_backlogged(self) -> bool:
+        """消费者未及时读取输出（如生成限流暂停读取），暂不继续解码"""
+        return self.output_queue.qsize() >= self.max_buffered_chunks
+
+    def emit(self, token_bytes: bytes) -> None:
+        text = self._decoder.decode(token_bytes)
+        if text:
+            self.output_queue.put(text)
+
+
+class BatchedStream:
+    """调度器中一个请求的流式输出，close() 取消生成并释放序列"""
+
+    def __init__(self, scheduler: 'ContinuousBatchScheduler', request: BatchRequest):
+        self.scheduler = scheduler
+        self.request = request
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        item = self.request.output_queue.get()
+        # 读取后输出队列有了空位，唤醒可能因积压而暂停的调度器
+        self.scheduler.notify()
+        if item is None:
+            raise StopIteration
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def close(self) -> None:
+        self.scheduler.cancel(self.request)
+
+
+@dataclass
+class _SequenceSlot:
+    """KV 缓存中的序列槽位，保存已计算的 token 以便同一会话的下一轮复用前缀"""
+    seq_id: int
+    tokens: typing.List[int] = field(default_factory=list)
+    request: typing.Optional[BatchRequest] = None
+    last_used: float = 0.0
+
+
+class ContinuousBatchScheduler:
+    """
+    多会话连续批处理调度器
+
+    在一个拥有 n_seq_max 个序列的 llama.cpp 上下文中交错执行多个会话的生成：
+    每一步中每个正在生成的会话各解码一个 token，剩余的 batch 容量按轮询顺序分给正在计算 prompt 的会话，
+    且每个会话每步最多 prefill_chunk_size 个 token，避免长 prompt 阻塞其他会话的解码。
+    调度器上下文与主模型共享权重，KV 缓存独立。
+    消费者读取输出跟不上时（输出队列积压 max_buffered_chunks 个文本块），该会话暂停解码，
+    直到输出被读取，生成限流对批处理同样生效。
+    """
+
+    def __init__(
+            self,
+            llama,
+            max_sessions: int = 4,
+            n_ctx_per_session: int = 4096,
+            prefill_chunk_size: int = 256,
+            max_buffered_chunks: int = 8,
+            seed: typing.Optional[int] = None,
+    ):
+        import llama_cpp
+        from llama_cpp._internals import LlamaContext
+
+        self.llama = llama
+        self.max_sessions = max_sessions
+        self.n_ctx_per_session = n_ctx_per_session
+        self.n_batch = llama.context_params.n_batch
+        self.prefill_chunk_size = min(prefill_chunk_size, self.n_batch)
+        self.max_buffered_chunks = max_buffered_chunks
+
+        params = llama_cpp.llama_context_params.from_buffer_copy(llama.context_params)
+        params.n_ctx = n_ctx_per_session * max_sessions
+        params.n_seq_max = max_sessions
+        self._context = LlamaContext(model=llama._model, params=params, verbose=llama.verbose)
+        self._batch = llama_cpp.llama_batch_init(self.n_batch, 0, 1)
+        self._kv_seq_rm = _get_kv_seq_rm()
+        self._llama_decode = llama_cpp.llama_decode
+        self._get_logits_ith = llama_cpp.llama_get_logits_ith
+        self._n_vocab = llama.n_vocab()
+        self._eog_tokens = {llama.token_eos()}
+        eot = llama._model.token_eot()
+        if eot >= 0:
+            self._eog_tokens.add(eot)
+        self._rng = np.random.default_rng(seed)
+
+        self._slots = [_SequenceSlot(seq_id) for seq_id in range(max_sessions)]
+        self._waiting: typing.Deque[BatchRequest] = deque()
+        self._active: typing.List[BatchRequest] = []
+        self._prefill_cursor = 0
+        self._condition = threading.Condition()
+        self._closed = False
+
+        self.step_count = 0
+        self.decoded_tokens = 0
+        self.prefill_tokens = 0
+        self.reused_tokens = 0
+        self.busy_seconds = 0.0
+        self._ttft_sum = 0.0
+        self._ttft_count = 0
+        self.max_ttft = 0.0
+
+        self._worker = threading.Thread(target=self._run, name='LLMBatchScheduler', daemon=True)
+        self._worker.start()
+
+    # ---------------- 提交与取消 ----------------
+
+    def submit(self, prompt_tokens: typing.List[int], sampling_params: dict) -> BatchedStream:
+        """
+        提交生成请求
+
+        Args:
+            prompt_tokens: prompt 的 token 序列
+            sampling_params: 采样参数（temperature、top_k、top_p、min_p、presence_penalty、max_tokens）
+
+        Returns:
+            BatchedStream: 流式输出
+        """
+        if len(prompt_tokens) >= self.n_ctx_per_session:
+            raise ValueError(f"prompt 长度 {len(prompt_tokens)} 超过单会话上下文 {self.n_ctx_per_session}")
+
+        sampling_params = dict(sampling_params)
+        max_tokens = sampling_params.pop('max_tokens', None) or self.n_ctx_per_session
+        request = BatchRequest(prompt_tokens=list(prompt_tokens), sampling_params=sampling_params,
+                               max_tokens=max_tokens, max_buffered_chunks=self.max_buffered_chunks)
+        with self._condition:
+            self._waiting.append(request)
+            self._condition.notify()
+        return BatchedStream(self, request)
+
+    def cancel(self, request: BatchRequest) -> None:
+        """取消请求，调度器在下一步释放其序列"""
+        with self._condition:
+            if request.finished:
+                return
+            request.cancelled = True
+            self._condition.notify()
+
+    def notify(self) -> None:
+        """唤醒调度器重新检查可解码的请求"""
+        with self._condition:
+            self._condition.notify()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._worker.join()
+
+    # ---------------- 调度 ----------------
+
+    def _acquire_slot(self, request: BatchRequest) -> typing.Optional[_SequenceSlot]:
+        """选择与 prompt 公共前缀最长的空闲槽位，其次是最久未使用的槽位"""
+        free_slots = [slot for slot in self._slots if slot.request is None]
+        if not free_slots:
+            return None
+
+        def common_prefix(slot: _SequenceSlot) -> int:
+            length = 0
+            for cached, token in zip(slot.tokens, request.prompt_tokens):
+                if cached != token:
+                    break
+                length += 1
+            return length
+
+        slot = max(free_slots, key=lambda s: (common_prefix(s), -s.last_used))
+        # 至少重新计算最后一个 prompt token 以得到 logits
+        n_keep = min(common_prefix(slot), len(request.prompt_tokens) - 1)
+        self._kv_seq_rm(self._context.ctx, slot.seq_id, n_keep, -1)
+        del slot.tokens[n_keep:]
+
+        slot.request = request
+        request.seq_id = slot.seq_id
+        request.n_past = n_keep
+        self.reused_tokens += n_keep
+        return slot
+
+    def _release(self, request: BatchRequest) -> None:
+        slot = self._slots[request.seq_id]
+        slot.request = None
+        slot.last_used = time.monotonic()
+        request.finished = True
+        request.output_queue.put(None)
+
+    def _admit_waiting(self) -> None:
+        while self._waiting:
+            request = self._waiting[0]
+            if request.cancelled:
+                self._waiting.popleft()
+                request.finished = True
+                request.output_queue.put(None)
+                continue
+            if self._acquire_slot(request) is None:
+                break
+            self._waiting.popleft()
+            self._active.append(request)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                for request in [r for r in self._active if r.cancelled]:
+                    self._active.remove(request)
+                    self._release(request)
+                self._admit_waiting()
+                while not self._active and not self._closed:
+                    self._condition.wait()
+                    self._admit_waiting()
+                if self._closed:
+                    break
+                active = list(self._active)
+
+            try:
+                if not self._step(active):
+                    # 所有会话的输出都在积压，等待消费者读取
+                    with self._condition:
+                        self._condition.wait(timeout=0.1)
+            except Exception as e:
+                logger.error(f"批处理解码失败: {e}")
+                with self._condition:
+                    for request in active:
+                        if request not in self._active:
+                            continue
+                        request.output_queue.put(e)
+                        self._active.remove(request)
+                        self._release(request)
+
+        with self._condition:
+            for request in list(self._active) + list(self._waiting):
+                request.finished = True
+                request.output_queue.put(None)
+
+    def _add_token(self, index: int, token: int, pos: int, seq_id: int, logits: bool) -> None:
+        self._batch.token[index] = token
+        self._batch.pos[index] = pos
+        self._batch.n_seq_id[index] = 1
+        self._batch.seq_id[index][0] = seq_id
+        self._batch.logits[index] = logits
+
+    def _step(self, active: typing.List[BatchRequest]) -> bool:
+        """
+        组装一个 batch 并解码：先为每个生成中的会话解码一个 token，再按轮询分配 prompt 计算
+
+        Returns:
+            bool: 是否解码了 token，所有会话都因输出积压而暂停时返回 False
+        """
+        step_start = time.perf_counter()
+        n_tokens = 0
+        # batch 中需要采样的位置
+        sample_indices: typing.List[typing.Tuple[BatchRequest, int]] = []
+        evaluated: typing.List[typing.Tuple[BatchRequest, typing.List[int]]] = []
+
+        for request in active:
+            if request.is_prefilling or request.pending_token is None or request.is_backlogged:
+                continue
+            self._add_token(n_tokens, request.pending_token, request.n_past, request.seq_id, True)
+            sample_indices.append((request, n_tokens))
+            evaluated.append((request, [request.pending_token]))
+            n_tokens += 1
+
+        prefilling = [request for request in active if request.is_prefilling]
+        if prefilling:
+            start = self._prefill_cursor % len(prefilling)
+            for request in prefilling[start:] + prefilling[:start]:
+                budget = min(self.prefill_chunk_size, self.n_batch - n_tokens)
+                if budget <= 0:
+                    break
+                chunk = request.prompt_tokens[request.n_past:request.n_past + budget]
+                for offset, token in enumerate(chunk):
+                    is_last_prompt_token = request.n_past + offset == len(request.prompt_tokens) - 1
+                    self._add_token(n_tokens, token, request.n_past + offset, request.seq_id, is_last_prompt_token)
+                    if is_last_prompt_token:
+                        sample_indices.append((request, n_tokens))
+                    n_tokens += 1
+                evaluated.append((request, chunk))
+                self.prefill_tokens += len(chunk)
+            self._prefill_cursor += 1
+
+        if n_tokens == 0:
+            return False
+
+        self._batch.n_tokens = n_tokens
+        result = self._llama_decode(self._context.ctx, self._batch)
+        if result != 0:
+            raise RuntimeError(f"llama_decode 返回 {result}")
+
+        for request, tokens in evaluated:
+            request.n_past += len(tokens)
+            self._slots[request.seq_id].tokens.extend(tokens)
+
+        for request, index in sample_indices:
+            logits_pointer = self._get_logits_ith(self._context.ctx, index)
+            logits = np.ctypeslib.as_array(
+                ctypes.cast(logits_pointer, ctypes.POINTER(ctypes.c_float)), shape=(self._n_vocab,)
+            )
+            token = sample_token(
+                logits, set(request.generated_tokens), rng=self._rng,
+                **{key: value for key, value in request.sampling_params.items()
+                   if key in ('temperature', 'top_k', 'top_p', 'min_p', 'presence_penalty')}
+            )
+            self._on_token(request, token)
+
+        self.step_count += 1
+        self.busy_seconds += time.perf_counter() - step_start
+        return True
+
+    def _on_token(self, request: BatchRequest, token: int) -> None:
+        if request.first_token_time is None:
+            request.first_token_time = time.perf_counter()
+            ttft = request.first_token_time - request.submit_time
+            self._ttft_sum += ttft
+            self._ttft_count += 1
+            self.max_ttft = max(self.max_ttft, ttft)
+
+        finished = (
+                token in self._eog_tokens
+                or len(request.generated_tokens) + 1 >= request.max_tokens
+                or request.n_past + 1 >= self.n_ctx_per_session
+        )
+        if token not in self._eog_tokens:
+            request.generated_tokens.append(token)
+            request.emit(self.llama.detokenize([token], special=False))
+            self.decoded_tokens += 1
+        request.pending_token = token
+
+        if finished:
+            with self._condition:
+                self._active.remove(request)
+                self._release(request)
+
+    def get_statistics(self) -> dict:
+        return {
+            'max_sessions': self.max_sessions,
+            'active_sessions': len(self._active),
+            'waiting_sessions': len(self._waiting),
+            'steps': self.step_count,
+            'decoded_tokens': self.decoded_tokens,
+            'prefill_tokens': self.prefill_tokens,
+            'reused_prompt_tokens': self.reused_tokens,
+            'tokens_per_second': round(self.decoded_tokens / self.busy_seconds, 2) if self.busy_seconds else 0.0,
+            'mean_ttft_seconds': round(self._ttft_sum / self._ttft_count, 4) if self._ttft_count else 0.0,
+            'max_ttft_seconds': round(self.max_ttft, 4),
+        }
+
+
+class BatchedChatBackend(ChatBackend):
+    """
+    通过连续批处理调度器并发服务多个会话的后端，需要模型带有对话模板
+
+    生成全部在调度器的多序列上下文中进行，不使用推测解码。
+    主模型的 Llama 实例只用于分词和渲染模板，但其 n_ctx 大小的 KV 缓存仍然保留（llama-cpp-python 的
+    Llama 无法在保留模型的同时释放上下文），总 KV 占用约为 (max_sessions + 1) 个会话
+    """
+
+    supports_assistant_prefix = True
+
+    def __init__(self, backend: LlamaCppChatBackend, **scheduler_params):
+        if not backend.supports_assistant_prefix:
+            raise ValueError("模型没有对话模板，无法使用批处理后端")
+        self.backend = backend
+        self.scheduler = ContinuousBatchScheduler(backend.llama, **scheduler_params)
+        logger.info(f"已启用LLM连续批处理: 最多 {self.scheduler.max_sessions} 个会话并发")
+
+    @property
+    def llama(self):
+        return self.backend.llama
+
+    @property
+    def speculative_stats(self) -> None:
+        return None
+
+    def stream(
+            self, system_prompt: str, history: typing.List[dict], user_input: str, assistant_prefix: str = ''
+    ) -> BatchedStream:
+        messages = [{'role': 'system', 'content': system_prompt}]
+        messages.extend(history)
+        messages.append({'role': 'user', 'content': user_input})
+
+        prompt = self.backend.render_prompt(messages) + assistant_prefix
+        prompt_tokens = self.llama.tokenize(prompt.encode('utf-8'), add_bos=False, special=True)
+        return self.scheduler.submit(prompt_tokens, self.backend.sampling_params)
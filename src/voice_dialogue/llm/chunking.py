@@ -0,0 +1,62 @@
+import typing
+
+from voice_dialogue.core.pipeline_metrics import PipelineMetrics
+from voice_dialogue.llm.segmenter import SentenceSegmenter
+
+
+class AdaptiveChunkingController:
+    """
+    根据实时指标调整 LLM → TTS 的分句长度
+
+    第一句使用最短的阈值以尽快开始播放；之后根据已缓冲的待播放音频决定下一句的长度：
+    下一句从开始生成到合成完成所需的时间
+        音频时长 A × (TTS RTF + 1 / (每单位音频时长 × LLM 单位速率))
+    不能超过缓冲音频时长 × safety_factor，在此范围内句子越长，TTS 调用次数越少、韵律越自然。
+    中文以字符为单位，英文以单词为单位。
+    """
+
+    def __init__(
+            self,
+            metrics: PipelineMetrics,
+            min_units: typing.Dict[str, int] = None,
+            max_units: typing.Dict[str, int] = None,
+            first_min_units: typing.Dict[str, int] = None,
+            safety_factor: float = 0.7,
+    ):
+        self.metrics = metrics
+        self.min_units = min_units or {'zh': 4, 'en': 4}
+        self.max_units = max_units or {'zh': 40, 'en': 25}
+        self.first_min_units = first_min_units or {'zh': 2, 'en': 1}
+        self.safety_factor = safety_factor
+
+    def get_target_units(self, language: str) -> int:
+        """计算下一句的最小长度（中文字符数 / 英文单词数）"""
+        min_units = self.min_units[language]
+        buffered_seconds = self.metrics.get_buffered_audio_seconds()
+        if buffered_seconds <= 0:
+            return min_units
+
+        audio_seconds_per_unit = self.metrics.get_audio_seconds_per_unit(language)
+        llm_units_per_second = self.metrics.get_llm_units_per_second(language)
+        if audio_seconds_per_unit <= 0 or llm_units_per_second <= 0:
+            return min_units
+
+        # 生成并合成 1 秒音频所需的时间
+        seconds_per_audio_second = self.metrics.tts_rtf.value + 1 / (audio_seconds_per_unit * llm_units_per_second)
+        target_audio_seconds = buffered_seconds * self.safety_factor / seconds_per_audio_second
+        target_units = int(target_audio_seconds / audio_seconds_per_unit)
+        return max(min_units, min(self.max_units[language], target_units))
+
+    def reset(self, segmenter: SentenceSegmenter) -> None:
+        """新回答开始时使用最短的首句阈值"""
+        segmenter.first_min_chars_zh = self.first_min_units['zh']
+        segmenter.first_min_words_en = self.first_min_units['en']
+        self.update(segmenter)
+
+    def update(self, segmenter: SentenceSegmenter) -> None:
+        """每输出一句后更新分句阈值"""
+        zh_units = self.get_target_units('zh')
+        en_units = self.get_target_units('en')
+        segmenter.min_chars_zh = zh_units
+        segmenter.min_words_en = en_units
+        segmenter.min_words_en_terminal = max(2, en_units // 2)
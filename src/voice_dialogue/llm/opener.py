@@ -0,0 +1,162 @@
+import pathlib
+import threading
+import time
+import typing
+
+from voice_dialogue.llm.backends import ChatBackend, create_chat_backend
+from voice_dialogue.llm.segmenter import SentenceSegmenter
+from voice_dialogue.llm.think_filter import ThinkTagFilter
+from voice_dialogue.utils.logger import logger
+
+# 模型权重之外的运行时开销（计算缓冲区等）按权重大小的比例估算
+MODEL_OVERHEAD_RATIO = 0.1
+
+
+def estimate_kv_cache_bytes(llama) -> int:
+    """根据 GGUF 元数据估算 f16 KV 缓存大小"""
+    metadata = llama.metadata
+    arch = metadata.get('general.architecture', '')
+    n_layer = int(metadata.get(f'{arch}.block_count', 0))
+    n_head = int(metadata.get(f'{arch}.attention.head_count', 0))
+    n_head_kv = int(metadata.get(f'{arch}.attention.head_count_kv', n_head))
+    n_embd = int(metadata.get(f'{arch}.embedding_length', 0))
+    head_dim = int(metadata.get(f'{arch}.attention.key_length', n_embd // n_head if n_head else 0))
+    return 2 * n_layer * n_head_kv * head_dim * llama.n_ctx() * 2
+
+
+def estimate_resident_bytes(model_path: pathlib.Path, llama=None) -> int:
+    """
+    估算模型常驻内存：权重 + 运行时开销 + KV 缓存（已加载时）
+
+    Args:
+        model_path: GGUF 模型文件路径
+        llama: 已加载的 llama_cpp.Llama 实例，用于读取 KV 缓存尺寸
+
+    Returns:
+        int: 估算的字节数
+    """
+    weight_bytes = pathlib.Path(model_path).stat().st_size
+    resident_bytes = int(weight_bytes * (1 + MODEL_OVERHEAD_RATIO))
+    if llama is not None:
+        resident_bytes += estimate_kv_cache_bytes(llama)
+    return resident_bytes
+
+
+class OpenerResponder:
+    """
+    开场白生成器
+
+    小模型只根据用户问题生成一句简短的开场白（如“好的，我来说说。”），
+    立即送去 TTS 播放，主模型以开场白作为回答前缀接着生成，避免首句等待大模型的完整 prompt 计算。
+    """
+
+    def __init__(self, backend: ChatBackend, system_prompts: typing.Dict[str, str]):
+        self.backend = backend
+        self.system_prompts = system_prompts
+        self.segmenter = SentenceSegmenter()
+        self.think_filter = ThinkTagFilter()
+        # 多会话并发时小模型逐个生成
+        self._lock = threading.Lock()
+
+        self.generation_count = 0
+        self.total_seconds = 0.0
+        self.last_seconds = 0.0
+
+    def generate(self, language: str, user_input: str, should_continue: typing.Callable[[], bool]) -> str:
+        """
+        生成开场白
+
+        Args:
+            language: 语言 'zh' 或 'en'
+            user_input: 用户问题
+            should_continue: 返回任务是否仍然有效
+
+        Returns:
+            str: 开场白句子，任务失效或生成失败时返回空字符串
+        """
+        with self._lock:
+            return self._generate(language, user_input, should_continue)
+
+    def _generate(self, language: str, user_input: str, should_continue: typing.Callable[[], bool]) -> str:
+        self.segmenter.reset()
+        self.think_filter.reset()
+
+        start_time = time.perf_counter()
+        system_prompt = self.system_prompts.get(language) or self.system_prompts['en']
+        stream = self.backend.stream(system_prompt, [], user_input)
+        try:
+            for content in stream:
+                if not should_continue():
+                    return ''
+                content = self.think_filter.feed(content)
+                sentence = self.segmenter.feed(content) if content else None
+                if sentence:
+                    return sentence
+            self.segmenter.feed(self.think_filter.flush())
+            return self.segmenter.flush() or ''
+        finally:
+            stream.close()
+            self.last_seconds = time.perf_counter() - start_time
+            self.generation_count += 1
+            self.total_seconds += self.last_seconds
+
+    def warmup(self) -> None:
+        for language in self.system_prompts:
+            self.generate(language, 'Hello', lambda: True)
+
+    def get_statistics(self) -> dict:
+        return {
+            'generation_count': self.generation_count,
+            'mean_seconds': round(self.total_seconds / self.generation_count, 4) if self.generation_count else 0.0,
+        }
+
+
+def create_opener_responder(
+        main_backend: ChatBackend,
+        main_model_path: pathlib.Path,
+        opener_params: dict,
+        system_prompts: typing.Dict[str, str],
+) -> typing.Optional[OpenerResponder]:
+    """
+    在内存预算内创建开场白生成器
+
+    Args:
+        main_backend: 已加载的主模型后端，需要支持续写回答前缀
+        main_model_path: 主模型文件路径
+        opener_params: get_llm_opener_params 返回的参数
+        system_prompts: 各语言的开场白系统提示词
+
+    Returns:
+        Optional[OpenerResponder]: 不满足条件时返回 None
+    """
+    if not opener_params['enabled']:
+        return None
+
+    if not main_backend.supports_assistant_prefix:
+        logger.warning("主模型后端不支持续写回答前缀，不启用开场白小模型")
+        return None
+
+    model_path = pathlib.Path(opener_params['model_path'])
+    if not model_path.exists():
+        logger.warning(f"开场白模型不存在: {model_path}，不启用开场白小模型")
+        return None
+
+    main_bytes = estimate_resident_bytes(main_model_path, main_backend.llama)
+    opener_bytes = estimate_resident_bytes(model_path)
+    budget_bytes = opener_params['memory_budget_bytes']
+    if main_bytes + opener_bytes > budget_bytes:
+        logger.warning(
+            f"主模型 ({main_bytes / (1 << 30):.2f}GB) 与开场白模型 ({opener_bytes / (1 << 30):.2f}GB) "
+            f"超出内存预算 {budget_bytes / (1 << 30):.2f}GB，不启用开场白小模型"
+        )
+        return None
+
+    backend = create_chat_backend(
+        'native', local_model_path=model_path, model_params=opener_params['model_params'], enable_thinking=False
+    )
+    opener_bytes = estimate_resident_bytes(model_path, backend.llama)
+    logger.info(
+        f"已启用开场白小模型: {model_path.name}, "
+        f"常驻内存约 {(main_bytes + opener_bytes) / (1 << 30):.2f}GB / {budget_bytes / (1 << 30):.2f}GB"
+    )
+    return OpenerResponder(backend, system_prompts)
@@ -1,22 +1,30 @@
 import pathlib
 import typing
 
-from langchain_community.chat_models.llamacpp import ChatLlamaCpp
-from langchain_core.messages import SystemMessage
-from langchain_core.prompts import (
-    ChatPromptTemplate, MessagesPlaceholder, HumanMessagePromptTemplate
-)
-from langchain_core.runnables import RunnableWithMessageHistory
-
+from voice_dialogue.llm.segmenter import finalize_sentence
 from voice_dialogue.utils.logger import logger
 
+if typing.TYPE_CHECKING:
+    from langchain_community.chat_models.llamacpp import ChatLlamaCpp
+
+
+# LangChain 相关依赖导入较慢，仅在使用 LangChain 后端时导入
 
 def create_langchain_chat_llamacpp_instance(
         local_model_path: str,
         model_params: dict | None = None
-) -> ChatLlamaCpp:
+) -> 'ChatLlamaCpp':
+    from langchain_community.chat_models.llamacpp import ChatLlamaCpp
+    from voice_dialogue.llm.speculative import create_draft_model
+
     logger.info(">>>>>>> Initializing LlamaCpp Langchain instance...")
 
+    # ChatLlamaCpp 没有 draft_model 字段，通过 model_kwargs 传给 llama_cpp.Llama
+    model_params = dict(model_params or {})
+    draft_model = create_draft_model(model_params.pop('speculative_decoding', None))
+    if draft_model is not None:
+        model_params['model_kwargs'] = {**(model_params.get('model_kwargs') or {}), 'draft_model': draft_model}
+
     model_path = pathlib.Path(local_model_path)
     llamacpp_langchain_instance = ChatLlamaCpp(
         model_path=str(model_path),
@@ -26,13 +34,28 @@ def create_langchain_chat_llamacpp_instance(
     return llamacpp_langchain_instance
 
 
-def create_langchain_pipeline(langchain_instance, system_prompt: str, get_session_history: typing.Callable):
-    prompt = ChatPromptTemplate(messages=[
+def _create_langchain_prompt(system_prompt: str):
+    from langchain_core.messages import SystemMessage
+    from langchain_core.prompts import (
+        ChatPromptTemplate, MessagesPlaceholder, HumanMessagePromptTemplate
+    )
+
+    return ChatPromptTemplate(messages=[
         SystemMessage(content=system_prompt),
         MessagesPlaceholder(variable_name="history"),
         HumanMessagePromptTemplate.from_template("{input}")
     ])
-    langchain_pipeline = prompt | langchain_instance
+
+
+def create_langchain_prompt_pipeline(langchain_instance, system_prompt: str):
+    """创建由调用方传入 history 的 pipeline"""
+    return _create_langchain_prompt(system_prompt) | langchain_instance
+
+
+def create_langchain_pipeline(langchain_instance, system_prompt: str, get_session_history: typing.Callable):
+    from langchain_core.runnables import RunnableWithMessageHistory
+
+    langchain_pipeline = create_langchain_prompt_pipeline(langchain_instance, system_prompt)
     if get_session_history is None:
         raise NotImplementedError
     chain_with_history = RunnableWithMessageHistory(langchain_pipeline, get_session_history,
@@ -50,9 +73,4 @@ def warmup_langchain_pipeline(pipeline):
 
 
 def preprocess_sentence_text(sentences):
-    sentence_text = ''.join(sentences)
-    if sentence_text:
-        sentence_mark = sentence_text[-1]
-        sentence_content = sentence_text[:-1].replace('!', ',').replace('?', ',').replace('.', ',')
-        sentence_text = f'{sentence_content}{sentence_mark}'
-    return sentence_text
+    return finalize_sentence(''.join(sentences))
@@ -0,0 +1,130 @@
+import threading
+import typing
+from dataclasses import dataclass, asdict
+
+from llama_cpp import Llama, LlamaRAMCache
+
+from voice_dialogue.utils.logger import logger
+
+
+@dataclass
+class PromptCacheStats:
+    """Prompt 前缀复用统计"""
+    lookups: int = 0
+    prefix_hits: int = 0
+    prompt_tokens: int = 0
+    reused_tokens: int = 0
+    evaluated_tokens: int = 0
+    last_prompt_tokens: int = 0
+    last_reused_tokens: int = 0
+    last_evaluated_tokens: int = 0
+
+    def record(self, prompt_tokens: int, reused_tokens: int) -> None:
+        evaluated_tokens = prompt_tokens - reused_tokens
+        self.lookups += 1
+        if reused_tokens > 0:
+            self.prefix_hits += 1
+        self.prompt_tokens += prompt_tokens
+        self.reused_tokens += reused_tokens
+        self.evaluated_tokens += evaluated_tokens
+        self.last_prompt_tokens = prompt_tokens
+        self.last_reused_tokens = reused_tokens
+        self.last_evaluated_tokens = evaluated_tokens
+
+    @property
+    def prefix_hit_rate(self) -> float:
+        return self.prefix_hits / self.lookups if self.lookups else 0.0
+
+    @property
+    def token_reuse_rate(self) -> float:
+        return self.reused_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    def to_dict(self) -> dict:
+        stats = asdict(self)
+        stats['prefix_hit_rate'] = round(self.prefix_hit_rate, 4)
+        stats['token_reuse_rate'] = round(self.token_reuse_rate, 4)
+        return stats
+
+
+class SessionPromptCache(LlamaRAMCache):
+    """
+    按 token 前缀保存 llama.cpp 状态的缓存
+
+    llama-cpp-python 在每次生成结束后以 (prompt + completion) 的 token 序列为 key 保存上下文状态，
+    生成前查找最长公共前缀并加载对应状态，因此同一会话的下一轮只需计算新追加的 token，
+    新会话也可以直接复用预先计算好的系统提示词前缀。
+    在此基础上统计每次生成复用和实际计算的 token 数。
+    """
+
+    def __init__(self, llama: Llama, capacity_bytes: int = 2 << 30):
+        super().__init__(capacity_bytes=capacity_bytes)
+        self.llama = llama
+        self.stats = PromptCacheStats()
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key: typing.Sequence[int]):
+        prompt_tokens = list(key)
+        eval_prefix_len = Llama.longest_token_prefix(self.llama._input_ids.tolist(), prompt_tokens)
+
+        try:
+            cache_item = super().__getitem__(key)
+            cache_prefix_len = Llama.longest_token_prefix(cache_item.input_ids.tolist(), prompt_tokens)
+        except KeyError:
+            cache_item = None
+            cache_prefix_len = 0
+
+        # llama.cpp 至少会重新计算最后一个 token 以得到 logits
+        reused_tokens = min(max(eval_prefix_len, cache_prefix_len), max(len(prompt_tokens) - 1, 0))
+        with self._lock:
+            self.stats.record(len(prompt_tokens), reused_tokens)
+
+        if cache_item is None:
+            raise KeyError("Key not found")
+        return cache_item
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = self.stats.to_dict()
+        stats['cache_size_bytes'] = self.cache_size
+        stats['cached_states'] = len(self.cache_state)
+        return stats
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats = PromptCacheStats()
+
+
+def enable_prompt_cache(llama: Llama, capacity_bytes: int = 2 << 30) -> SessionPromptCache:
+    """
+    为 llama.cpp 模型启用前缀状态缓存
+
+    Args:
+        llama: llama_cpp.Llama 实例
+        capacity_bytes: 缓存的最大字节数
+
+    Returns:
+        SessionPromptCache: 缓存实例
+    """
+    prompt_cache = SessionPromptCache(llama, capacity_bytes=capacity_bytes)
+    llama.set_cache(prompt_cache)
+    logger.info(f"已启用 Prompt 前缀缓存，容量: {capacity_bytes / (1 << 30):.1f} GB")
+    return prompt_cache
+
+
+def warmup_system_prompt_prefix(llama: Llama, system_prompts: typing.Iterable[str]) -> None:
+    """
+    预先计算系统提示词前缀并保存到缓存中，新会话的第一轮可以直接复用
+
+    Args:
+        llama: 已启用前缀缓存的 llama_cpp.Llama 实例
+        system_prompts: 需要预计算的系统提示词
+    """
+    for system_prompt in system_prompts:
+        messages = [
+            {'role': 'system', 'content': system_prompt},
+            {'role': 'user', 'content': ''},
+        ]
+        try:
+            llama.create_chat_completion(messages=messages, max_tokens=1)
+        except Exception as e:
+            logger.warning(f"预计算系统提示词前缀失败: {e}")
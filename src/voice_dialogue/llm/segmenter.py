@@ -0,0 +1,159 @@
+import typing
+import unicodedata
+
+ENGLISH_SENTENCE_END_MARKS = frozenset({'!', '?', '.', ',', ':', ';'})
+CHINESE_SENTENCE_END_MARKS = frozenset({'，', '。', '！', '？', '：', '；', '、'})
+SENTENCE_END_MARKS = ENGLISH_SENTENCE_END_MARKS | CHINESE_SENTENCE_END_MARKS
+ENGLISH_TERMINAL_MARKS = frozenset({'.', '?', '!'})
+
+# 句子内部会被替换为逗号的标点
+_INNER_MARK_TRANSLATION = str.maketrans({'!': ',', '?': ',', '.': ','})
+
+# 预先计算常用区间（ASCII/拉丁、通用标点、CJK 标点、全角字符）的标点查找表，其余字符按需缓存
+_PRECOMPUTED_RANGES = ((0x0000, 0x0250), (0x2000, 0x2070), (0x3000, 0x3040), (0xFE30, 0xFE70), (0xFF00, 0xFF70))
+_PUNCTUATION_TABLE: typing.Dict[str, bool] = {
+    chr(code): unicodedata.category(chr(code)).startswith('P')
+    for start, end in _PRECOMPUTED_RANGES
+    for code in range(start, end)
+}
+
+
+def is_punctuation(char: str) -> bool:
+    """判断一个字符是否是标点符号（Unicode 类别 P*）"""
+    result = _PUNCTUATION_TABLE.get(char)
+    if result is None:
+        if len(char) != 1:
+            return False
+        result = unicodedata.category(char).startswith('P')
+        _PUNCTUATION_TABLE[char] = result
+    return result
+
+
+def split_at_last_punctuation(chunk: str) -> typing.Tuple[str, str, str]:
+    """从右到左找到 chunk 中最后一个标点符号，并分割成 (标点前, 标点, 标点后)"""
+    for i in range(len(chunk) - 1, -1, -1):
+        if is_punctuation(chunk[i]):
+            return chunk[:i], chunk[i], chunk[i + 1:]
+    return chunk, '', ''
+
+
+def finalize_sentence(sentence_text: str) -> str:
+    """保留句末标点，将句子内部的 !?. 替换为逗号"""
+    if not sentence_text:
+        return sentence_text
+    return sentence_text[:-1].translate(_INNER_MARK_TRANSLATION) + sentence_text[-1]
+
+
+class SentenceSegmenter:
+    """
+    LLM 流式输出的增量分句器
+
+    以 chunk 为单位输入，缓冲区只追加不重拼，字符数和单词数随输入增量更新，
+    每个 chunk 的处理开销只与 chunk 本身的长度有关。
+    分句规则：
+    - 第一句：中文超过 first_min_chars_zh 个字符，英文超过 first_min_words_en 个单词
+    - 其余句子：中文超过 min_chars_zh 个字符；英文超过 min_words_en 个单词，
+      或以 .?! 结尾且超过 min_words_en_terminal 个单词
+    """
+
+    def __init__(
+            self,
+            first_min_chars_zh: int = 2,
+            first_min_words_en: int = 1,
+            min_chars_zh: int = 4,
+            min_words_en: int = 4,
+            min_words_en_terminal: int = 2,
+    ):
+        self.first_min_chars_zh = first_min_chars_zh
+        self.first_min_words_en = first_min_words_en
+        self.min_chars_zh = min_chars_zh
+        self.min_words_en = min_words_en
+        self.min_words_en_terminal = min_words_en_terminal
+        self.reset()
+
+    def reset(self) -> None:
+        """开始新的回答前重置状态"""
+        self._parts: typing.List[str] = []
+        self._char_count = 0
+        self._word_count = 0
+        self._in_word = False
+        self.sentence_count = 0
+
+    @property
+    def is_first_sentence(self) -> bool:
+        return self.sentence_count == 0
+
+    @property
+    def buffered_chars(self) -> int:
+        return self._char_count
+
+    def _append(self, text: str) -> None:
+        if not text:
+            return
+        self._parts.append(text)
+        self._char_count += len(text)
+        word_count = len(text.split())
+        # 与上一段末尾的单词相连时不算新单词
+        if word_count and self._in_word and not text[0].isspace():
+            word_count -= 1
+        self._word_count += word_count
+        self._in_word = not text[-1].isspace()
+
+    def _take_sentence(self) -> str:
+        sentence = finalize_sentence(''.join(self._parts))
+        self._parts = []
+        self._char_count = 0
+        self._word_count = 0
+        self._in_word = False
+        return sentence
+
+    def should_end_sentence(self, sentence_end_mark: str) -> bool:
+        """根据当前缓冲区和句末标点判断是否应该结束当前句子"""
+        if not self._char_count or sentence_end_mark not in SENTENCE_END_MARKS:
+            return False
+
+        is_chinese_sentence = sentence_end_mark in CHINESE_SENTENCE_END_MARKS
+
+        if self.is_first_sentence:
+            if is_chinese_sentence:
+                return self._char_count > self.first_min_chars_zh
+            return self._word_count > self.first_min_words_en
+
+        if is_chinese_sentence:
+            return self._char_count > self.min_chars_zh
+        return (self._word_count > self.min_words_en
+                or (self._word_count > self.min_words_en_terminal and sentence_end_mark in ENGLISH_TERMINAL_MARKS))
+
+    def feed(self, chunk: str) -> typing.Optional[str]:
+        """
+        输入一个 chunk
+
+        Args:
+            chunk: LLM 输出的文本片段
+
+        Returns:
+            Optional[str]: 满足分句条件时返回完整句子，否则返回 None
+        """
+        if not chunk:
+            return None
+
+        before_punct, sentence_end_mark, remain_content = split_at_last_punctuation(chunk)
+        self._append(before_punct)
+        self._append(sentence_end_mark)
+
+        if self.should_end_sentence(sentence_end_mark):
+            sentence = self._take_sentence()
+            self._append(remain_content)
+            self.sentence_count += 1
+            return sentence
+
+        self._append(remain_content)
+        return None
+
+    def flush(self) -> typing.Optional[str]:
+        """流结束时返回剩余内容组成的句子，仅包含标点时丢弃"""
+        sentence = self._take_sentence()
+        if not sentence or sentence.strip() in SENTENCE_END_MARKS:
+            return None
+        self.sentence_count += 1
+        return sentence
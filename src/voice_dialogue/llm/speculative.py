@@ -0,0 +1,150 @@
+import threading
+import typing
+
+import numpy as np
+import numpy.typing as npt
+from llama_cpp.llama_speculative import LlamaDraftModel, LlamaPromptLookupDecoding
+
+from voice_dialogue.utils.logger import logger
+
+SPECULATIVE_MODES = ('prompt_lookup', 'draft_model')
+
+
+class GGUFDraftModel(LlamaDraftModel):
+    """
+    使用小尺寸 GGUF 模型生成草稿 token 的推测解码模型
+
+    草稿模型必须与主模型共享词表（例如 Qwen3-0.6B 与 Qwen3-8B），
+    通过 Llama.generate 的前缀匹配复用草稿模型自身的 KV 缓存，每次只计算新增的 token。
+    """
+
+    def __init__(self, model_path: str, num_pred_tokens: int = 8, n_ctx: int = 2048, **llama_params):
+        from llama_cpp import Llama
+
+        self.num_pred_tokens = num_pred_tokens
+        self.llama = Llama(model_path=str(model_path), n_ctx=n_ctx, verbose=False, **llama_params)
+
+    def __call__(self, input_ids: npt.NDArray[np.intc], /, **kwargs) -> npt.NDArray[np.intc]:
+        tokens = input_ids.tolist()
+        if len(tokens) + self.num_pred_tokens >= self.llama.n_ctx():
+            return np.array([], dtype=np.intc)
+
+        draft_tokens = []
+        # top_k=1 的贪心解码
+        for token in self.llama.generate(tokens, top_k=1, top_p=1.0, temp=0.0, reset=True):
+            if token == self.llama.token_eos():
+                break
+            draft_tokens.append(token)
+            if len(draft_tokens) >= self.num_pred_tokens:
+                break
+        return np.array(draft_tokens, dtype=np.intc)
+
+
+class SpeculativeStats:
+    """推测解码的草稿接受率统计"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.draft_calls = 0
+        self.proposed_tokens = 0
+        self.accepted_tokens = 0
+
+    def record(self, proposed: int, accepted: int) -> None:
+        with self._lock:
+            self.draft_calls += 1
+            self.proposed_tokens += proposed
+            self.accepted_tokens += accepted
+
+    @property
+    def acceptance_rate(self) -> float:
+        return self.accepted_tokens / self.proposed_tokens if self.proposed_tokens else 0.0
+
+    def reset(self) -> None:
+        with self._lock:
+            self.draft_calls = 0
+            self.proposed_tokens = 0
+            self.accepted_tokens = 0
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                'draft_calls': self.draft_calls,
+                'proposed_tokens': self.proposed_tokens,
+                'accepted_tokens': self.accepted_tokens,
+                'acceptance_rate': round(self.acceptance_rate, 4),
+            }
+
+
+class MeasuredDraftModel(LlamaDraftModel):
+    """
+    统计接受率的草稿模型包装
+
+    llama-cpp-python 不会返回草稿的接受情况。下一次调用时输入中已包含主模型实际生成的 token，
+    将上一次的草稿与这部分 token 逐个比对即可得到被接受的数量。
+    """
+
+    def __init__(self, draft_model: LlamaDraftModel, stats: SpeculativeStats = None):
+        self.draft_model = draft_model
+        self.stats = stats or SpeculativeStats()
+        self._last_input_length = 0
+        self._last_draft: typing.List[int] = []
+
+    def _settle_last_draft(self, tokens: npt.NDArray[np.intc]) -> None:
+        if not self._last_draft:
+            return
+        accepted = 0
+        if len(tokens) > self._last_input_length:
+            following = tokens[self._last_input_length:self._last_input_length + len(self._last_draft)].tolist()
+            for draft_token, actual_token in zip(self._last_draft, following):
+                if draft_token != actual_token:
+                    break
+                accepted += 1
+        self.stats.record(len(self._last_draft), accepted)
+        self._last_draft = []
+
+    def __call__(self, input_ids: npt.NDArray[np.intc], /, **kwargs) -> npt.NDArray[np.intc]:
+        self._settle_last_draft(input_ids)
+        draft = self.draft_model(input_ids, **kwargs)
+        self._last_input_length = len(input_ids)
+        self._last_draft = draft.tolist()
+        return draft
+
+
+def create_draft_model(speculative_params: typing.Optional[dict]) -> typing.Optional[MeasuredDraftModel]:
+    """
+    根据配置创建推测解码的草稿模型
+
+    Args:
+        speculative_params: get_llm_model_params 中的 speculative_decoding 配置，
+            mode 为 'prompt_lookup' 或 'draft_model'，为 None 时不启用
+
+    Returns:
+        Optional[MeasuredDraftModel]: 草稿模型，未启用时返回 None
+    """
+    if not speculative_params or not speculative_params.get('mode'):
+        return None
+
+    mode = speculative_params['mode']
+    num_pred_tokens = speculative_params.get('num_pred_tokens', 10)
+
+    if mode == 'prompt_lookup':
+        draft_model = LlamaPromptLookupDecoding(
+            max_ngram_size=speculative_params.get('max_ngram_size', 2),
+            num_pred_tokens=num_pred_tokens,
+        )
+    elif mode == 'draft_model':
+        draft_model_path = speculative_params.get('draft_model_path')
+        if not draft_model_path or not draft_model_path.exists():
+            logger.warning(f"草稿模型不存在: {draft_model_path}，不启用推测解码")
+            return None
+        draft_model = GGUFDraftModel(
+            draft_model_path,
+            num_pred_tokens=num_pred_tokens,
+            n_ctx=speculative_params.get('n_ctx', 2048),
+            n_gpu_layers=speculative_params.get('n_gpu_layers', -1),
+        )
+    else:
+        raise ValueError(f"未知的推测解码模式: {mode}，可选: {', '.join(SPECULATIVE_MODES)}")
+
+    logger.info(f"已启用推测解码: {mode} (num_pred_tokens={num_pred_tokens})")
+    return MeasuredDraftModel(draft_model)
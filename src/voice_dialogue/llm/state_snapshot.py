@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import pathlib
+import pickle
+import threading
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+from llama_cpp import Llama, LlamaState, __version__ as llama_cpp_version
+
+from voice_dialogue.llm.prompt_cache import warmup_system_prompt_prefix
+from voice_dialogue.utils.logger import logger
+
+# 快照格式版本：2 起 input_ids 保留完整的 n_ctx 长度
+SNAPSHOT_FORMAT_VERSION = 2
+
+
+def _hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def model_fingerprint(model_path: pathlib.Path, cache_dir: pathlib.Path, chunk_size: int = 8 << 20) -> str:
+    """
+    计算模型文件内容的 sha256 摘要
+
+    完整哈希大模型文件需要数秒，结果按 (路径, 大小, 修改时间) 缓存在 model_hashes.json 中
+
+    Args:
+        model_path: 模型文件路径
+        cache_dir: 缓存目录
+
+    Returns:
+        str: sha256 摘要
+    """
+    model_path = pathlib.Path(model_path)
+    stat = model_path.stat()
+    file_key = f"{model_path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    hashes_file = pathlib.Path(cache_dir) / 'model_hashes.json'
+    hashes = {}
+    if hashes_file.exists():
+        try:
+            hashes = json.loads(hashes_file.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            hashes = {}
+    if file_key in hashes:
+        return hashes[file_key]
+
+    logger.info(f"计算模型文件哈希: {model_path.name}")
+    hasher = hashlib.sha256()
+    with open(model_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            hasher.update(chunk)
+    hashes[file_key] = hasher.hexdigest()
+
+    hashes_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = hashes_file.with_suffix('.tmp')
+    tmp_file.write_text(json.dumps(hashes, indent=2), encoding='utf-8')
+    os.replace(tmp_file, hashes_file)
+    return hashes[file_key]
+
+
+def compact_state(state: LlamaState) -> LlamaState:
+    """
+    只保留最后一个位置的 logits
+
+    LlamaState 中保存了每个已计算位置的完整词表 logits（数百 MB），而续写只需要最后一个位置，
+    load_state 会将其广播到所有位置。
+    input_ids 必须保留完整的 n_ctx 长度：load_state 直接用它替换 Llama.input_ids，之后的 eval 按位置写入
+    """
+    scores = state.scores[-1:].copy() if state.n_tokens > 0 else state.scores[:0].copy()
+    return LlamaState(
+        input_ids=state.input_ids.copy(),
+        scores=scores,
+        n_tokens=state.n_tokens,
+        llama_state=state.llama_state,
+        llama_state_size=state.llama_state_size,
+        seed=state.seed,
+    )
+
+
+def _write_snapshot(path: pathlib.Path, key: dict, state: LlamaState, extra: typing.Optional[dict] = None) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(
+            {'version': SNAPSHOT_FORMAT_VERSION, 'key': key, 'state': state, 'extra': extra or {}},
+            f, protocol=pickle.HIGHEST_PROTOCOL,
+        )
+    os.replace(tmp_path, path)
+
+
+def _read_snapshot(path: pathlib.Path, key: dict) -> typing.Optional[dict]:
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except Exception as e:
+        logger.warning(f"读取状态快照失败 {path.name}: {e}")
+        return None
+    if snapshot.get('version') != SNAPSHOT_FORMAT_VERSION or snapshot.get('key') != key:
+        return None
+    return snapshot
+
+
+class LlamaStateStore:
+    """
+    llama.cpp 状态快照的磁盘存储
+
+    - 各语言系统提示词计算后的状态在首次运行时保存，之后启动直接加载到前缀缓存，代替丢弃式的预热生成
+    - 会话的一轮回答结束后，在空闲或切换会话时保存检查点，重启后的第一轮从检查点续接，不需要重新计算历史
+
+    快照以模型文件哈希、上下文参数和 llama-cpp-python 版本为 key，任一变化都会使快照失效；
+    系统提示词快照还包含提示词文本的哈希。
+    """
+
+    def __init__(self, llama: Llama, model_path: pathlib.Path, cache_dir: pathlib.Path,
+                 max_session_checkpoints: int = 32):
+        self.llama = llama
+        self.cache_dir = pathlib.Path(cache_dir)
+        self.sessions_dir = self.cache_dir / 'sessions'
+        self.max_session_checkpoints = max_session_checkpoints
+
+        self.model_key = {
+            'model_sha256': model_fingerprint(model_path, self.cache_dir),
+            'n_ctx': llama.n_ctx(),
+            'type_k': llama.context_params.type_k,
+            'type_v': llama.context_params.type_v,
+            'llama_cpp_version': llama_cpp_version,
+        }
+        self._model_key_hash = _hash_text(json.dumps(self.model_key, sort_keys=True))[:16]
+
+        # 序列化和写盘在后台进行，不阻塞下一轮生成
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='LLMStateWriter')
+        self._write_lock = threading.Lock()
+
+    # ---------------- 系统提示词 ----------------
+
+    def _system_prompt_path(self, language: str, prompt: str) -> pathlib.Path:
+        return self.cache_dir / f"system-{language}-{self._model_key_hash}-{_hash_text(prompt)[:16]}.state"
+
+    def _install_state(self, state: LlamaState) -> None:
+        """将状态放入前缀缓存，没有启用缓存时直接加载到上下文"""
+        if self.llama.cache is not None:
+            self.llama.cache[state.input_ids[:state.n_tokens].tolist()] = state
+        else:
+            self.llama.load_state(state)
+
+    def restore_system_prompts(self, prompts: typing.Dict[str, str]) -> typing.Dict[str, bool]:
+        """
+        加载各语言系统提示词的状态快照，快照不存在或失效时计算并保存
+
+        Args:
+            prompts: {语言: 系统提示词}
+
+        Returns:
+            Dict[str, bool]: 各语言是否从磁盘加载
+        """
+        restored = {}
+        for language, prompt in prompts.items():
+            key = {**self.model_key, 'prompt_sha256': _hash_text(prompt)}
+            path = self._system_prompt_path(language, prompt)
+
+            snapshot = _read_snapshot(path, key)
+            if snapshot is not None:
+                self._install_state(snapshot['state'])
+                restored[language] = True
+                logger.info(f"已加载系统提示词状态快照 ({language}): {snapshot['state'].n_tokens} tokens")
+                continue
+
+            warmup_system_prompt_prefix(self.llama, [prompt])
+            state = compact_state(self.llama.save_state())
+            if self.llama.cache is not None:
+                self._install_state(state)
+            _write_snapshot(path, key, state)
+            restored[language] = False
+            logger.info(f"已保存系统提示词状态快照 ({language}): {state.n_tokens} tokens")
+
+        self._remove_stale_snapshots('system-*.state', keep={
+            self._system_prompt_path(language, prompt).name for language, prompt in prompts.items()
+        })
+        return restored
+
+    # ---------------- 会话检查点 ----------------
+
+    def _session_path(self, session_id: str) -> pathlib.Path:
+        return self.sessions_dir / f"{_hash_text(session_id)[:32]}.state"
+
+    def checkpoint_session(self, session_id: str, messages: typing.List[dict]) -> None:
+        """
+        保存当前上下文状态作为会话检查点，调用时上下文必须仍是该会话最近一轮生成结束时的状态
+
+        Args:
+            session_id: 会话ID
+            messages: 截至本轮（包含本轮问答）的历史消息，回答为模型生成的原始文本
+        """
+        state = compact_state(self.llama.save_state())
+        key = {**self.model_key, 'session_id': session_id}
+        path = self._session_path(session_id)
+
+        def write():
+            with self._write_lock:
+                try:
+                    _write_snapshot(path, key, state, extra={'messages': messages})
+                    self._prune_sessions()
+                except OSError as e:
+                    logger.warning(f"保存会话检查点失败: {e}")
+
+        self._writer.submit(write)
+
+    def restore_session(self, session_id: str) -> typing.Optional[typing.List[dict]]:
+        """
+        加载会话检查点
+
+        Returns:
+            Optional[List[dict]]: 检查点中的历史消息，检查点不存在或失效时返回 None
+        """
+        key = {**self.model_key, 'session_id': session_id}
+        with self._write_lock:
+            snapshot = _read_snapshot(self._session_path(session_id), key)
+        if snapshot is None:
+            return None
+
+        self._install_state(snapshot['state'])
+        logger.info(f"已从检查点恢复会话 {session_id}: {snapshot['state'].n_tokens} tokens")
+        return snapshot['extra'].get('messages', [])
+
+    def _prune_sessions(self) -> None:
+        """只保留最近的 max_session_checkpoints 个会话检查点"""
+        checkpoints = sorted(self.sessions_dir.glob('*.state'), key=lambda p: p.stat().st_mtime, reverse=True)
+        for path in checkpoints[self.max_session_checkpoints:]:
+            path.unlink(missing_ok=True)
+
+    def _remove_stale_snapshots(self, pattern: str, keep: typing.Set[str]) -> None:
+        for path in self.cache_dir.glob(pattern):
+            if path.name not in keep:
+                path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        self._writer.shutdown(wait=True)
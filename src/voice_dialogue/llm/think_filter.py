@@ -0,0 +1,89 @@
+class ThinkTagFilter:
+    """
+    流式推理内容过滤器
+
+    逐个 chunk 过滤 <think>...</think> 推理块，标签可以被拆分在多个 chunk 中，
+    推理块内的内容和推理块之后的前导空白都不会输出，避免被送入分句和 TTS。
+    """
+
+    def __init__(self, open_tag: str = '<think>', close_tag: str = '</think>'):
+        self.open_tag = open_tag
+        self.close_tag = close_tag
+        self.suppressed_tokens = 0
+        self.suppressed_chars = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """开始新的回答前重置状态（不清空累计统计）"""
+        self._pending = ''
+        self._in_think = False
+        self._strip_leading = True
+        self.turn_suppressed_tokens = 0
+
+    @staticmethod
+    def _partial_tag_length(text: str, tag: str) -> int:
+        """text 末尾与 tag 开头重合的最大长度"""
+        for length in range(min(len(text), len(tag) - 1), 0, -1):
+            if tag.startswith(text[-length:]):
+                return length
+        return 0
+
+    def _emit(self, text: str) -> str:
+        if self._strip_leading:
+            text = text.lstrip()
+            if text:
+                self._strip_leading = False
+        return text
+
+    def feed(self, chunk: str) -> str:
+        """
+        输入一个 chunk，返回可见内容
+
+        Args:
+            chunk: 模型输出的文本片段
+
+        Returns:
+            str: 过滤推理块之后的内容，可能为空字符串
+        """
+        text = self._pending + chunk
+        self._pending = ''
+        visible = []
+        suppressed = 0
+
+        while text:
+            if self._in_think:
+                index = text.find(self.close_tag)
+                if index < 0:
+                    keep = self._partial_tag_length(text, self.close_tag)
+                    suppressed += len(text) - keep
+                    self._pending = text[len(text) - keep:]
+                    break
+                suppressed += index + len(self.close_tag)
+                text = text[index + len(self.close_tag):]
+                self._in_think = False
+                self._strip_leading = True
+            else:
+                index = text.find(self.open_tag)
+                if index < 0:
+                    keep = self._partial_tag_length(text, self.open_tag)
+                    visible.append(self._emit(text[:len(text) - keep]))
+                    self._pending = text[len(text) - keep:]
+                    break
+                visible.append(self._emit(text[:index]))
+                suppressed += len(self.open_tag)
+                text = text[index + len(self.open_tag):]
+                self._in_think = True
+
+        if suppressed or (self._in_think and chunk):
+            self.suppressed_chars += suppressed
+            self.suppressed_tokens += 1
+            self.turn_suppressed_tokens += 1
+
+        return ''.join(visible)
+
+    def flush(self) -> str:
+        """流结束时输出残留内容，未闭合的推理块直接丢弃"""
+        pending, self._pending = self._pending, ''
+        if self._in_think:
+            return ''
+        return self._emit(pending)
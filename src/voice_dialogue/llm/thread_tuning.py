@@ -0,0 +1,114 @@
+import pathlib
+import time
+import typing
+
+import llama_cpp
+from llama_cpp import Llama
+
+from voice_dialogue.utils.hardware import (
+    get_hardware_profile, get_thread_config, load_tuned_thread_config, save_tuned_thread_config
+)
+from voice_dialogue.utils.logger import logger
+
+BENCHMARK_PROMPT = (
+    "You are an AI assistant. Please answer directly and naturally. "
+    "你是AI助手。请以自然流畅的中文口语化表达直接回答问题。"
+)
+
+
+def get_thread_candidates() -> typing.List[int]:
+    """候选线程数：启发式配置附近以及物理核心、可用核心等拓扑边界"""
+    profile = get_hardware_profile()
+    usable = profile.usable_cpus
+    heuristic = get_thread_config(profile)
+
+    candidates = {
+        heuristic['n_threads'], heuristic['n_threads_batch'],
+        profile.performance_cores, profile.physical_cores, usable,
+        max(1, heuristic['n_threads'] - 2), max(1, usable // 2),
+    }
+    return sorted(n for n in candidates if 1 <= n <= usable)
+
+
+def _measure(llama: Llama, prompt_tokens: typing.List[int], decode_tokens: int) -> typing.Tuple[float, float]:
+    """返回 (prompt 计算速度, 逐 token 解码速度)，单位 tokens/s"""
+    llama.reset()
+    start = time.perf_counter()
+    llama.eval(prompt_tokens)
+    prefill_tps = len(prompt_tokens) / (time.perf_counter() - start)
+
+    token = prompt_tokens[-1]
+    start = time.perf_counter()
+    for _ in range(decode_tokens):
+        llama.eval([token])
+    decode_tps = decode_tokens / (time.perf_counter() - start)
+    return prefill_tps, decode_tps
+
+
+def benchmark_llama_threads(
+        model_path: pathlib.Path,
+        candidates: typing.Optional[typing.List[int]] = None,
+        n_gpu_layers: int = -1,
+        prompt_tokens: int = 128,
+        decode_tokens: int = 16,
+) -> typing.Dict[str, typing.Any]:
+    """
+    对各候选线程数做一次微基准测试，分别选出解码最快的 n_threads 和 prompt 计算最快的 n_threads_batch
+
+    Args:
+        model_path: 模型路径
+        candidates: 候选线程数，为 None 时根据 CPU 拓扑生成
+        n_gpu_layers: 卸载到 GPU 的层数
+        prompt_tokens: prompt 计算测试的 token 数
+        decode_tokens: 解码测试的 token 数
+
+    Returns:
+        Dict[str, Any]: n_threads、n_threads_batch 以及各候选的测试结果
+    """
+    candidates = candidates or get_thread_candidates()
+    llama = Llama(
+        model_path=str(model_path), n_ctx=prompt_tokens + decode_tokens + 16, n_batch=prompt_tokens,
+        n_gpu_layers=n_gpu_layers, n_threads=candidates[0], verbose=False,
+    )
+    tokens = llama.tokenize(BENCHMARK_PROMPT.encode('utf-8'), add_bos=True)
+    tokens = (tokens * (prompt_tokens // len(tokens) + 1))[:prompt_tokens]
+
+    # 第一次运行包含权重页加载，不计入结果
+    _measure(llama, tokens, 2)
+
+    results = []
+    for n in candidates:
+        llama_cpp.llama_set_n_threads(llama.ctx, n, n)
+        prefill_tps, decode_tps = _measure(llama, tokens, decode_tokens)
+        results.append({'threads': n, 'prefill_tps': round(prefill_tps, 1), 'decode_tps': round(decode_tps, 1)})
+        logger.info(f"线程数 {n}: prompt {prefill_tps:.1f} tokens/s, 解码 {decode_tps:.1f} tokens/s")
+
+    del llama
+
+    return {
+        'n_threads': max(results, key=lambda r: r['decode_tps'])['threads'],
+        'n_threads_batch': max(results, key=lambda r: r['prefill_tps'])['threads'],
+        'model': pathlib.Path(model_path).name,
+        'results': results,
+    }
+
+
+def ensure_tuned_threads(model_path: pathlib.Path, n_gpu_layers: int = -1) -> typing.Dict[str, typing.Any]:
+    """
+    本机没有基准测试结果时运行一次并缓存，之后 get_optimal_llama_cpp_config 直接使用缓存结果
+
+    Returns:
+        Dict[str, Any]: 基准测试结果
+    """
+    tuned_config = load_tuned_thread_config()
+    if tuned_config is not None:
+        return tuned_config
+
+    logger.info("开始线程数基准测试...")
+    tuned_config = benchmark_llama_threads(model_path, n_gpu_layers=n_gpu_layers)
+    save_tuned_thread_config(tuned_config)
+    logger.info(
+        f"线程数基准测试完成: n_threads={tuned_config['n_threads']}, "
+        f"n_threads_batch={tuned_config['n_threads_batch']}"
+    )
+    return tuned_config
@@ -0,0 +1,78 @@
+import threading
+import time
+import typing
+
+from voice_dialogue.core.pipeline_metrics import PipelineMetrics
+
+
+class GenerationThrottle:
+    """
+    生成超前限流
+
+    流式生成是按需拉取的，暂停读取 token 即暂停 llama.cpp 计算。
+    当已合成但未播放的音频超过 pause_ahead_seconds 时暂停生成，把 CPU 让给 TTS 和 ASR，
+    待缓冲下降到 resume_ahead_seconds 以下再继续（迟滞区间避免频繁切换）。
+    并发处理多个会话时各线程共用一个实例，单轮的暂停时长按线程分别记录。
+    """
+
+    def __init__(
+            self,
+            metrics: PipelineMetrics,
+            pause_ahead_seconds: float = 8.0,
+            resume_ahead_seconds: float = 4.0,
+            poll_interval: float = 0.05,
+    ):
+        assert resume_ahead_seconds <= pause_ahead_seconds
+        self.metrics = metrics
+        self.pause_ahead_seconds = pause_ahead_seconds
+        self.resume_ahead_seconds = resume_ahead_seconds
+        self.poll_interval = poll_interval
+
+        self.pause_count = 0
+        self.paused_seconds = 0.0
+        self._lock = threading.Lock()
+        self._turn_state = threading.local()
+
+    @property
+    def turn_paused_seconds(self) -> float:
+        """当前线程本轮生成的暂停时长"""
+        return getattr(self._turn_state, 'paused_seconds', 0.0)
+
+    def reset(self) -> None:
+        self._turn_state.paused_seconds = 0.0
+
+    def wait(self, should_continue: typing.Callable[[], bool]) -> bool:
+        """
+        缓冲音频过多时阻塞，直到缓冲回落或任务失效
+
+        Args:
+            should_continue: 返回任务是否仍然有效
+
+        Returns:
+            bool: True 表示可以继续生成，False 表示任务已失效需要终止生成
+        """
+        if self.metrics.get_buffered_audio_seconds() < self.pause_ahead_seconds:
+            return True
+
+        with self._lock:
+            self.pause_count += 1
+        pause_start = time.perf_counter()
+        try:
+            while self.metrics.get_buffered_audio_seconds() > self.resume_ahead_seconds:
+                if not should_continue():
+                    return False
+                time.sleep(self.poll_interval)
+            return should_continue()
+        finally:
+            paused = time.perf_counter() - pause_start
+            with self._lock:
+                self.paused_seconds += paused
+            self._turn_state.paused_seconds = self.turn_paused_seconds + paused
+
+    def get_statistics(self) -> dict:
+        return {
+            'pause_count': self.pause_count,
+            'paused_seconds': round(self.paused_seconds, 2),
+            'pause_ahead_seconds': self.pause_ahead_seconds,
+            'resume_ahead_seconds': self.resume_ahead_seconds,
+        }
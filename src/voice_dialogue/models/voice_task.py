@@ -29,6 +29,10 @@ class VoiceTask(BaseModel):
     answer_index: int = Field(default=0)
     answer_sentence: str = Field(default="")
     tts_generated_sentence_audio: tuple = Field(default=())
+    # 流式合成时同一句话的音频片段序号，播放服务只在第一个片段时显示回答和更新历史
+    audio_fragment_index: int = Field(default=0)
+    # 回答缓存的 key，非空时 TTS 服务将合成的音频写入回答缓存
+    response_cache_key: str = Field(default="")
 
     class Config:
         arbitrary_types_allowed = True
@@ -9,26 +9,33 @@ from voice_dialogue.core.constants import user_still_speaking_event, voice_state
 from voice_dialogue.models.voice_task import VoiceTask
 from voice_dialogue.services.mixins import PerformanceLogMixin
 from voice_dialogue.utils.cache import LRUCacheDict
-from voice_dialogue.asr import asr_manager
+from voice_dialogue.asr import asr_manager, WarmupMode
 
 
 class ASRService(BaseThread, PerformanceLogMixin):
     def __init__(self, group=None, target=None, name=None, args=(), kwargs=None, *, daemon=None,
                  user_voice_queue: Queue,
                  transcribed_text_queue: Queue,
-                 language: typing.Literal["auto", "zh", "en"]):
+                 language: typing.Literal["auto", "zh", "en"],
+                 asr_config: typing.Any = None,
+                 warmup_mode: typing.Optional[WarmupMode] = None):
         super().__init__(group, target, name, args, kwargs, daemon=daemon)
 
         self.language = language
+        self.asr_config = asr_config
+        self.warmup_mode = warmup_mode
         self.user_voice_queue = user_voice_queue
         self.transcribed_text_queue = transcribed_text_queue
 
         self.cached_user_questions = LRUCacheDict(maxsize=10)
 
     def run(self):
-        self.client = asr_manager.create_asr(self.language)
+        self.client = asr_manager.create_asr(self.language, config=self.asr_config)
+        if self.warmup_mode is not None:
+            self.client.warmup_mode = self.warmup_mode
         self.client.setup()
-        self.client.warmup()
+        if self.client.warmup_mode != WarmupMode.SKIP:
+            self.client.warmup()
 
         self.is_ready = True
 
@@ -5,7 +5,7 @@ from typing import Optional
 
 from voice_dialogue.audio.player import play_audio
 from voice_dialogue.core.base import BaseThread
-from voice_dialogue.core.constants import voice_state_manager, silence_over_threshold_event
+from voice_dialogue.core.constants import voice_state_manager, silence_over_threshold_event, pipeline_metrics
 from voice_dialogue.models.voice_task import VoiceTask, AnswerDisplayMessage
 from voice_dialogue.services.mixins import TaskStatusMixin, HistoryMixin, PerformanceLogMixin
 from voice_dialogue.utils.logger import logger
@@ -23,20 +23,35 @@ class AudioPlayerService(BaseThread, TaskStatusMixin, HistoryMixin, PerformanceL
         self.audio_playing_queue: Queue = audio_playing_queue
         self.websocket_message_queue: Queue = websocket_message_queue
 
+        # 用于统计同一回答中相邻两句之间的播放间隔
+        self._last_answer_id = None
+        self._last_playback_end_time = 0.0
+
     def _get_task_from_queue(self) -> Optional[VoiceTask]:
         """从音频播放队列中获取任务。"""
         # 使用阻塞式获取，当队列为空时，run循环中的Empty异常会处理它
         return self.audio_playing_queue.get(block=True, timeout=1)
 
+    @staticmethod
+    def _get_audio_seconds(voice_task: VoiceTask) -> float:
+        if not voice_task.tts_generated_sentence_audio:
+            return 0.0
+        audio_data, sample_rate = voice_task.tts_generated_sentence_audio
+        return len(audio_data) / sample_rate if sample_rate else 0.0
+
     def _process_task(self, voice_task: VoiceTask):
         """处理单个音频播放任务。"""
+        audio_seconds = self._get_audio_seconds(voice_task)
+
         # 这个内部循环用于等待一个外部事件（用户静音），同时检查任务是否被中断
         while not self.is_exited:
             if self.handle_user_speaking_interruption(voice_task):
+                pipeline_metrics.discard_buffered_audio(audio_seconds)
                 return  # 任务被中断，结束处理
 
             if not self.is_task_valid(voice_task):
                 logger.info(f"音频播放: 任务<{voice_task.id}> 无效")
+                pipeline_metrics.discard_buffered_audio(audio_seconds)
                 return  # 任务无效，结束处理
 
             # 等待用户彻底静音的信号
@@ -45,26 +60,42 @@ class AudioPlayerService(BaseThread, TaskStatusMixin, HistoryMixin, PerformanceL
                 continue
 
             # --- 开始播放逻辑 ---
-            if self.websocket_message_queue:
-                self.websocket_message_queue.put_nowait(
-                    AnswerDisplayMessage(
-                        session_id=voice_task.session_id,
-                        task_id=voice_task.id,
-                        answer_index=voice_task.answer_index,
-                        answer=voice_task.answer_sentence,
+            # 流式合成时一句话分为多个音频片段，只在第一个片段时显示回答和更新历史
+            if voice_task.audio_fragment_index == 0:
+                if self.websocket_message_queue:
+                    self.websocket_message_queue.put_nowait(
+                        AnswerDisplayMessage(
+                            session_id=voice_task.session_id,
+                            task_id=voice_task.id,
+                            answer_index=voice_task.answer_index,
+                            answer=voice_task.answer_sentence,
+                        )
                     )
-                )
 
-            self.log_task_performance(voice_task, "音频播放")
+                self.log_task_performance(voice_task, "音频播放")
 
-            self.update_chat_history(voice_task)
+                self.update_chat_history(voice_task)
 
             voice_state_manager.set_audio_playing(voice_task.id)
             voice_state_manager.reset_task_id()
 
             if not self.is_stopped:
                 audio_data, sample_rate = voice_task.tts_generated_sentence_audio
-                play_audio(audio_data, sample_rate)
+                is_continuation = voice_task.answer_index > 0 or voice_task.audio_fragment_index > 0
+                if voice_task.answer_id == self._last_answer_id and is_continuation:
+                    gap_seconds = time.time() - self._last_playback_end_time
+                    pipeline_metrics.record_playback_gap(gap_seconds)
+                    logger.debug(f"播放间隔: {gap_seconds * 1000:.0f}ms")
+
+                pipeline_metrics.start_playback(audio_seconds)
+                try:
+                    play_audio(audio_data, sample_rate)
+                finally:
+                    pipeline_metrics.finish_playback()
+                    self._last_answer_id = voice_task.answer_id
+                    self._last_playback_end_time = time.time()
+            else:
+                pipeline_metrics.discard_buffered_audio(audio_seconds)
 
             # 任务处理完毕，跳出内部循环
             break
@@ -1,19 +1,30 @@
 import copy
+import threading
 import time
-import unicodedata
+import typing
+from concurrent.futures import ThreadPoolExecutor
 from queue import Queue, Empty
 
-from langchain.memory import ConversationBufferWindowMemory
-from langchain_core.chat_history import InMemoryChatMessageHistory
-
-from voice_dialogue.config.llm_config import get_llm_model_params, get_apple_silicon_summary, BUILTIN_LLM_MODEL_PATH
+from voice_dialogue.config.llm_config import (
+    get_llm_model_params, get_apple_silicon_summary, get_llm_prompt_cache_params, get_llm_backend_name,
+    get_llm_throttle_params, get_llm_opener_params, get_llm_batching_params, BUILTIN_LLM_MODEL_PATH, LLM_ENABLE_THINKING,
+    CHINESE_OPENER_SYSTEM_PROMPT, ENGLISH_OPENER_SYSTEM_PROMPT, get_llm_state_snapshot_params,
+    get_llm_thread_tuning_params
+)
 from voice_dialogue.config.user_config import get_prompt
 from voice_dialogue.core.base import BaseThread
-from voice_dialogue.core.constants import chat_history_cache
-from voice_dialogue.llm.processor import (
-    preprocess_sentence_text, create_langchain_chat_llamacpp_instance,
-    create_langchain_pipeline, warmup_langchain_pipeline
-)
+from voice_dialogue.core.constants import chat_history_store, pipeline_metrics, response_cache
+from voice_dialogue.core.response_cache import CachedResponse
+from voice_dialogue.llm.chunking import AdaptiveChunkingController
+from voice_dialogue.llm.backends import ChatBackend, LlamaCppChatBackend, StreamTiming, create_chat_backend
+from voice_dialogue.llm.batching import BatchedChatBackend
+from voice_dialogue.llm.opener import OpenerResponder, create_opener_responder
+from voice_dialogue.llm.segmenter import SentenceSegmenter
+from voice_dialogue.llm.state_snapshot import LlamaStateStore
+from voice_dialogue.llm.think_filter import ThinkTagFilter
+from voice_dialogue.llm.thread_tuning import ensure_tuned_threads
+from voice_dialogue.llm.throttle import GenerationThrottle
+from voice_dialogue.llm.prompt_cache import enable_prompt_cache, warmup_system_prompt_prefix
 from voice_dialogue.models.voice_task import VoiceTask, QuestionDisplayMessage
 from voice_dialogue.services.mixins import TaskStatusMixin
 from voice_dialogue.utils.logger import logger
@@ -26,67 +37,96 @@ class LLMService(BaseThread, TaskStatusMixin):
             self, group=None, target=None, name=None, args=(), kwargs={}, *, daemon=None,
             user_question_queue: Queue,
             generated_answer_queue: Queue,
-            websocket_message_queue: Queue = None
+            websocket_message_queue: Queue = None,
+            audio_output_queue: Queue = None,
+            llm_backend: str = None,
+            enable_thinking: bool = LLM_ENABLE_THINKING
     ):
         super().__init__(group, target, name, args, kwargs, daemon=daemon)
 
         self.user_question_queue = user_question_queue
         self.generated_answer_queue = generated_answer_queue
         self.websocket_message_queue = websocket_message_queue
-
-        self.english_sentence_end_marks = {'!', '?', '.', ',', ':', ';'}
-        self.chinese_sentence_end_marks = {'，', '。', '！', '？', '：', '；', '、'}
-        self.sentence_end_marks = self.english_sentence_end_marks | self.chinese_sentence_end_marks
+        # 回答缓存命中时跳过 TTS 直接送去播放
+        self.audio_output_queue = audio_output_queue
+
+        # 分句器和推理块过滤器保存单轮回答的状态，并发处理多个会话时每个线程各自持有
+        self._turn_state = threading.local()
+        self.chunking_controller = AdaptiveChunkingController(pipeline_metrics)
+
+        throttle_params = get_llm_throttle_params()
+        self.throttle = GenerationThrottle(
+            pipeline_metrics,
+            pause_ahead_seconds=throttle_params['pause_ahead_seconds'],
+            resume_ahead_seconds=throttle_params['resume_ahead_seconds'],
+        ) if throttle_params['enabled'] else None
+
+        self.llm_backend = llm_backend or get_llm_backend_name()
+        self.enable_thinking = enable_thinking
+        self.backend: ChatBackend = None
+        self.prompt_cache = None
+        self.opener: OpenerResponder = None
+        self.state_store: LlamaStateStore = None
+        # 最近一轮结束后尚未保存的会话检查点 (session_id, messages)，在空闲或切换会话时保存
+        self._pending_checkpoint: typing.Optional[typing.Tuple[str, list]] = None
+
+    @property
+    def segmenter(self) -> SentenceSegmenter:
+        if not hasattr(self._turn_state, 'segmenter'):
+            self._turn_state.segmenter = SentenceSegmenter()
+        return self._turn_state.segmenter
+
+    @property
+    def think_filter(self) -> ThinkTagFilter:
+        if not hasattr(self._turn_state, 'think_filter'):
+            self._turn_state.think_filter = ThinkTagFilter()
+        return self._turn_state.think_filter
 
     def _get_prompt_by_language(self, language: str) -> str:
         """根据语言获取对应的 prompt"""
         return get_prompt(language)
 
-    def get_session_history(self, session_id: str) -> InMemoryChatMessageHistory:
-        message_history = InMemoryChatMessageHistory()
-        if session_id not in chat_history_cache:
-            return message_history
-
-        for k, message in chat_history_cache.get(session_id).items():
-            identity = k.rsplit(':')[-1]
-            if identity == 'human':
-                message_history.add_user_message(message)
-            elif identity == 'ai':
-                message_history.add_ai_message(' '.join(message))
-
-        memory = ConversationBufferWindowMemory(
-            chat_memory=message_history,
-            k=3,
-            return_messages=True,
-        )
-        assert len(memory.memory_variables) == 1
-        key = memory.memory_variables[0]
-        messages = memory.load_memory_variables({})[key]
-        return InMemoryChatMessageHistory(messages=messages)
-
-    def _should_end_sentence(self, sentence: str, sentence_end_mark: str, is_first_sentence: bool) -> bool:
-        """判断是否应该结束当前句子"""
-        if not sentence or sentence_end_mark not in self.sentence_end_marks:
-            return False
-
-        is_chinese_sentence = False
-        if sentence_end_mark in self.chinese_sentence_end_marks:
-            is_chinese_sentence = True
-
-        # 第一个句子的特殊处理逻辑
-        if is_first_sentence:
-            if is_chinese_sentence:
-                return (len(sentence) > 2 and sentence_end_mark in self.chinese_sentence_end_marks)
-            else:
-                return (len(sentence.split()) > 1 and sentence_end_mark in self.english_sentence_end_marks)
-
-        # 普通句子的判断逻辑
-        if is_chinese_sentence:
-            sentence_words = len(sentence)
-            return sentence_words > 4
-        else:
-            sentence_words = len(sentence.split())
-            return sentence_words > 4 or (sentence_words > 2 and sentence_end_mark in {'.', '?', '!', })
+    def get_prompt_cache_stats(self) -> dict:
+        """获取 Prompt 前缀复用统计"""
+        if self.prompt_cache is None:
+            return {}
+        return self.prompt_cache.get_stats()
+
+    def get_batching_stats(self) -> dict:
+        """获取连续批处理调度统计"""
+        if not isinstance(self.backend, BatchedChatBackend):
+            return {}
+        return self.backend.scheduler.get_statistics()
+
+    def get_speculative_stats(self) -> dict:
+        """获取推测解码的草稿接受率统计"""
+        stats = self.backend.speculative_stats if self.backend is not None else None
+        if stats is None:
+            return {}
+        return stats.to_dict()
+
+    def get_session_messages(self, session_id: str) -> list:
+        """
+        获取会话在 token 预算内的最近历史消息
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            list: [{'role': 'user'|'assistant', 'content': str}, ...]
+        """
+        return chat_history_store.get_messages(session_id)
+
+    def _save_pending_checkpoint(self) -> None:
+        """保存最近一轮的会话检查点，调用时上下文必须仍是该轮结束时的状态"""
+        if self._pending_checkpoint is None:
+            return
+        session_id, messages = self._pending_checkpoint
+        self._pending_checkpoint = None
+        try:
+            self.state_store.checkpoint_session(session_id, messages)
+        except Exception as e:
+            logger.warning(f"保存会话检查点失败: {e}")
 
     def _send_sentence_to_queue(self, voice_task: VoiceTask, sentence: str, answer_index: int) -> None:
         """将句子发送到队列"""
@@ -96,41 +136,34 @@ class LLMService(BaseThread, TaskStatusMixin):
         self.generated_answer_queue.put(copy.deepcopy(voice_task))
         voice_task.llm_start_time = time.time()
 
-    def _reset_chunks(self, remain_content: str) -> list:
-        """重置 chunks 列表"""
-        return [remain_content] if remain_content else []
-
-    def _is_punctuation(self, char: str) -> bool:
-        """判断一个字符是否是标点符号"""
-        if not char or len(char) != 1:
-            return False
-        # 检查字符的 Unicode 类别是否为标点符号 (Punctuation)
-        return unicodedata.category(char).startswith('P')
-
-    def _process_chunk_content(self, chunk_content: str) -> tuple:
-        """处理 chunk 内容，从右到左找标点符号并分割成三部分"""
-        if not chunk_content:
-            return '', '', ''
-
-        # 从右到左迭代，找到第一个标点符号
-        for i in range(len(chunk_content) - 1, -1, -1):
-            char = chunk_content[i]
-            if self._is_punctuation(char):
-                # 找到标点符号，分割成三部分
-                before_punct = chunk_content[:i]  # 标点之前的部分
-                punct = char  # 标点符号本身
-                after_punct = chunk_content[i + 1:]  # 标点之后的部分
-                return before_punct, punct, after_punct
-
-        # 如果没有找到标点符号，返回整个内容作为第一部分
-        return chunk_content, '', ''
+    def _play_cached_response(self, voice_task: VoiceTask, cached_response: CachedResponse) -> None:
+        """回答缓存命中，将缓存的句子和音频直接送去播放"""
+        voice_task.llm_end_time = voice_task.tts_start_time = voice_task.tts_end_time = time.time()
+        for answer_index, cached_sentence in enumerate(cached_response.sentences):
+            if cached_sentence.audio is None:
+                continue
+            audio_data, sample_rate = cached_sentence.audio
+            pipeline_metrics.add_buffered_audio(len(audio_data) / sample_rate if sample_rate else 0.0)
+            self.audio_output_queue.put(voice_task.model_copy(update={
+                'answer_index': answer_index,
+                'answer_sentence': cached_sentence.sentence,
+                'tts_generated_sentence_audio': cached_sentence.audio,
+            }))
 
     def _process_voice_task(self, voice_task: VoiceTask) -> None:
         """处理单个语音任务"""
 
-        chunks = []
         answer_index = 0
-        is_first_sentence = True
+        answer_sentences = []
+        # 模型实际生成的原始文本，检查点中的历史需要与上下文中的 token 一致
+        raw_answer_chunks = []
+
+        # 上一轮的检查点只在切换到其他会话前保存；同一会话的新一轮会延续上下文，保存推迟到这一轮结束后
+        if self._pending_checkpoint is not None:
+            if self._pending_checkpoint[0] != voice_task.session_id:
+                self._save_pending_checkpoint()
+            else:
+                self._pending_checkpoint = None
 
         user_question = voice_task.transcribed_text
         logger.info(f'用户问题: {user_question}')
@@ -146,89 +179,276 @@ class LLMService(BaseThread, TaskStatusMixin):
         voice_task.llm_start_time = time.time()
 
         system_prompt = self._get_prompt_by_language(voice_task.language)
-        pipeline = create_langchain_pipeline(self.model_instance, system_prompt, self.get_session_history)
-
-        config = {"configurable": {"session_id": voice_task.session_id}}
-
+        # 重启后会话的第一轮从检查点恢复历史和上下文状态
+        if self.state_store is not None and voice_task.session_id not in chat_history_store:
+            restored_messages = self.state_store.restore_session(voice_task.session_id)
+            if restored_messages:
+                chat_history_store.restore_messages(voice_task.session_id, restored_messages)
+
+        history = self.get_session_messages(voice_task.session_id)
+
+        # 回答缓存只用于会话的第一轮：有历史时同样的问题可能依赖上下文
+        cache_key = None
+        if self.audio_output_queue is not None and not history:
+            cache_key = response_cache.make_key(user_question, voice_task.language, system_prompt)
+            cached_response = response_cache.get(cache_key) if cache_key else None
+            if cached_response is not None:
+                logger.info(f'回答缓存命中: {user_question} ({len(cached_response.sentences)} 句)')
+                self._play_cached_response(voice_task, cached_response)
+                return
+        voice_task.response_cache_key = cache_key or ''
+
+        timing = StreamTiming()
+        self.think_filter.reset()
+        self.segmenter.reset()
+        self.chunking_controller.reset(self.segmenter)
+        visible_chars = 0
+        if self.throttle is not None:
+            self.throttle.reset()
+
+        # 小模型先生成开场白送去 TTS，主模型接着开场白继续回答
+        assistant_prefix = ''
+        if self.opener is not None:
+            assistant_prefix = self.opener.generate(
+                voice_task.language, user_question, lambda: self.is_task_valid(voice_task)
+            )
+            if not self.is_task_valid(voice_task):
+                return
+            if assistant_prefix:
+                logger.info(f'开场白: {assistant_prefix} ({self.opener.last_seconds * 1000:.1f}ms)')
+                self._send_sentence_to_queue(voice_task, assistant_prefix, answer_index)
+                answer_sentences.append(assistant_prefix.strip())
+                answer_index += 1
+                # 开场白已作为首句，主模型的输出按后续句子的阈值分句
+                self.segmenter.sentence_count = 1
+
+        stream = self.backend.stream(system_prompt, history, user_question, assistant_prefix=assistant_prefix)
         try:
-            for chunk in pipeline.stream(input={'input': user_question}, config=config):
+            for content in stream:
+                timing.tick()
+                raw_answer_chunks.append(content)
 
                 if not self.is_task_valid(voice_task):
                     return
 
-                if not chunk.content:
-                    continue
-                elif chunk.content in {'<think>', '\n\n', '</think>'}:
-                    continue
-
-                chunk_content = f'{chunk.content}'
-
-                before_punct, sentence_end_mark, remain_content = self._process_chunk_content(chunk_content)
-                if before_punct:
-                    chunks.append(before_punct)
-                if sentence_end_mark:
-                    chunks.append(sentence_end_mark)
+                # 待播放音频过多时暂停拉取 token，让出 CPU 给 TTS 和 ASR
+                if self.throttle is not None and not self.throttle.wait(lambda: self.is_task_valid(voice_task)):
+                    return
 
-                sentence = preprocess_sentence_text(chunks)
-                if not sentence:
-                    chunks.append(remain_content)
+                # 推理块内的内容不进入分句和 TTS
+                content = self.think_filter.feed(content)
+                if not content:
+                    continue
+                elif content == '\n\n':
                     continue
 
-                # 检查是否应该结束当前句子
-                if self._should_end_sentence(sentence, sentence_end_mark, is_first_sentence):
+                visible_chars += len(content)
+                sentence = self.segmenter.feed(content)
+                if sentence:
                     self._send_sentence_to_queue(voice_task, sentence, answer_index)
-                    chunks = self._reset_chunks(remain_content)
+                    answer_sentences.append(sentence.strip())
                     answer_index += 1
-                    is_first_sentence = False
-                else:
-                    if remain_content:
-                        chunks.append(remain_content)
+                    # 根据已缓冲的待播放音频调整下一句的长度
+                    self.chunking_controller.update(self.segmenter)
+
+            # 处理最后剩余的内容
+            sentence = self.segmenter.feed(self.think_filter.flush())
+            if sentence:
+                self._send_sentence_to_queue(voice_task, sentence, answer_index)
+                answer_sentences.append(sentence.strip())
+                answer_index += 1
+            sentence = self.segmenter.flush()
+            if sentence:
+                self._send_sentence_to_queue(voice_task, sentence, answer_index)
+                answer_sentences.append(sentence.strip())
+
+            if cache_key and self.is_task_valid(voice_task):
+                response_cache.finish_answer(cache_key, voice_task.answer_id, len(answer_sentences))
+
+            # 上下文中正是本会话刚结束的一轮，检查点在空闲时保存，不阻塞下一个问题
+            if self.state_store is not None and self.is_task_valid(voice_task):
+                self._pending_checkpoint = (voice_task.session_id, history + [
+                    {'role': 'user', 'content': user_question},
+                    {'role': 'assistant', 'content': assistant_prefix + ''.join(raw_answer_chunks)},
+                ])
+
+            paused_seconds = self.throttle.turn_paused_seconds if self.throttle is not None else 0.0
+            if timing.first_token_time is not None:
+                pipeline_metrics.record_llm_output(
+                    visible_chars, timing.last_token_time - timing.first_token_time - paused_seconds
+                )
+            if paused_seconds:
+                logger.info(f'生成限流暂停: {paused_seconds:.2f}s')
 
-            # 处理最后剩余的 chunks
-            self._handle_remaining_chunks(voice_task, chunks, answer_index)
+            if self.think_filter.turn_suppressed_tokens:
+                logger.info(
+                    f'已过滤推理内容: {self.think_filter.turn_suppressed_tokens} tokens '
+                    f'(累计 {self.think_filter.suppressed_tokens} tokens)'
+                )
 
-        except Exception as e:
-            logger.error(f'处理语音任务时发生错误: {e}')
+            logger.info(
+                f'LLM首token延迟: {timing.time_to_first_token * 1000:.1f}ms, '
+                f'平均token间隔: {timing.mean_token_interval * 1000:.1f}ms, chunks: {timing.chunk_count}'
+            )
 
-    def _handle_remaining_chunks(self, voice_task: VoiceTask, chunks: list, answer_index: int) -> None:
-        """处理剩余的 chunks"""
-        if not chunks:
-            return
+            if self.prompt_cache is not None:
+                stats = self.prompt_cache.stats
+                logger.info(
+                    f'Prompt前缀复用: {stats.last_reused_tokens}/{stats.last_prompt_tokens} tokens, '
+                    f'实际计算: {stats.last_evaluated_tokens} tokens'
+                )
 
-        sentence = preprocess_sentence_text(chunks)
-        if not sentence or sentence.strip() in self.sentence_end_marks:
-            return
+            speculative_stats = self.backend.speculative_stats
+            if speculative_stats is not None:
+                logger.info(
+                    f'推测解码接受率: {speculative_stats.acceptance_rate:.1%} '
+                    f'({speculative_stats.accepted_tokens}/{speculative_stats.proposed_tokens} tokens)'
+                )
 
-        self._send_sentence_to_queue(voice_task, sentence, answer_index)
+        except Exception as e:
+            logger.error(f'处理语音任务时发生错误: {e}')
+        finally:
+            # 任务失效时立即终止生成
+            stream.close()
 
     def run(self):
 
+        # 线程数微基准测试（可选），结果缓存后由 get_llm_model_params 使用
+        thread_tuning_params = get_llm_thread_tuning_params()
+        if thread_tuning_params['enabled']:
+            try:
+                ensure_tuned_threads(thread_tuning_params['model_path'])
+            except Exception as e:
+                logger.warning(f"线程数基准测试失败，使用默认配置: {e}")
+
         model_params = get_llm_model_params()
 
         # 打印芯片信息和优化配置
         chip_summary = get_apple_silicon_summary()
         logger.info(f"检测到芯片: {chip_summary['chip_name']}")
         logger.info(f"性能核心数: {chip_summary['performance_cores']}")
-        logger.info(f"使用线程数: {chip_summary['optimal_n_threads']} (仅使用性能核心)")
+        logger.info(
+            f"使用线程数: {chip_summary['optimal_n_threads']} (prompt计算: {chip_summary['optimal_n_threads_batch']})"
+        )
         logger.info(f"上下文窗口: {chip_summary['optimal_n_ctx']}")
         logger.info(f"配置说明: {chip_summary['config_note']}")
 
-        self.model_instance = create_langchain_chat_llamacpp_instance(
-            local_model_path=BUILTIN_LLM_MODEL_PATH, model_params=model_params
+        self.backend = create_chat_backend(
+            self.llm_backend, local_model_path=BUILTIN_LLM_MODEL_PATH, model_params=model_params,
+            enable_thinking=self.enable_thinking
+        )
+
+        # 连续批处理：多个会话在独立的多序列上下文中交错解码
+        batching_params = get_llm_batching_params()
+        max_concurrent_tasks = 1
+        if batching_params['enabled']:
+            if isinstance(self.backend, LlamaCppChatBackend) and self.backend.supports_assistant_prefix:
+                # 调度器在自己的上下文中采样，没有推测解码路径，草稿模型不再使用，释放它
+                if getattr(self.backend.llama, 'draft_model', None) is not None:
+                    logger.warning("连续批处理不支持推测解码，已卸载草稿模型")
+                    self.backend.llama.draft_model = None
+                self.backend = BatchedChatBackend(
+                    self.backend,
+                    max_sessions=batching_params['max_sessions'],
+                    n_ctx_per_session=batching_params['n_ctx_per_session'],
+                    prefill_chunk_size=batching_params['prefill_chunk_size'],
+                    max_buffered_chunks=batching_params['max_buffered_chunks'],
+                )
+                max_concurrent_tasks = batching_params['max_sessions']
+                # 多个会话同时生成，任务是否有效只看其所属会话的中断和结束状态
+                self.per_session_validity = True
+            else:
+                logger.warning("连续批处理需要 native 后端和模型自带的对话模板，已忽略")
+
+        # 批处理时生成不经过主上下文，前缀缓存由调度器按会话槽位复用
+        prompt_cache_params = get_llm_prompt_cache_params()
+        if prompt_cache_params['enabled'] and max_concurrent_tasks == 1:
+            self.prompt_cache = enable_prompt_cache(
+                self.backend.llama, capacity_bytes=prompt_cache_params['capacity_bytes']
+            )
+
+        # 加载系统提示词的状态快照代替丢弃式的预热生成；批处理时生成不经过主上下文
+        snapshot_params = get_llm_state_snapshot_params()
+        if snapshot_params['enabled'] and max_concurrent_tasks == 1:
+            try:
+                self.state_store = LlamaStateStore(
+                    self.backend.llama, BUILTIN_LLM_MODEL_PATH, snapshot_params['cache_dir'],
+                    max_session_checkpoints=snapshot_params['max_session_checkpoints'],
+                )
+                self.state_store.restore_system_prompts({'zh': get_prompt("zh"), 'en': get_prompt("en")})
+            except Exception as e:
+                logger.warning(f"状态快照不可用，使用预热生成: {e}")
+                self.state_store = None
+
+        if self.state_store is None:
+            # 使用默认中文 prompt 进行 warmup
+            self.backend.warmup(get_prompt("zh"))
+
+        # 使用模型分词器统计历史 token 数（每轮只计算一次）
+        llama = self.backend.llama
+        chat_history_store.set_token_counter(
+            lambda text: len(llama.tokenize(text.encode('utf-8'), add_bos=False, special=False)) if text else 0
         )
-        # 使用默认中文 prompt 进行 warmup
-        prompt = get_prompt("zh")
-        pipeline = create_langchain_pipeline(self.model_instance, prompt, self.get_session_history)
-        warmup_langchain_pipeline(pipeline)
+
+        if self.prompt_cache is not None:
+            if self.state_store is None:
+                # 预计算中英文系统提示词前缀，新会话的第一轮直接复用
+                warmup_system_prompt_prefix(self.backend.llama, [get_prompt("zh"), get_prompt("en")])
+            self.prompt_cache.reset_stats()
+
+        if self.backend.speculative_stats is not None:
+            self.backend.speculative_stats.reset()
+
+        self.opener = create_opener_responder(
+            self.backend,
+            BUILTIN_LLM_MODEL_PATH,
+            get_llm_opener_params(),
+            {'zh': CHINESE_OPENER_SYSTEM_PROMPT, 'en': ENGLISH_OPENER_SYSTEM_PROMPT},
+        )
+        if self.opener is not None:
+            self.opener.warmup()
 
         self.is_ready = True
 
         """主运行循环"""
+        if max_concurrent_tasks > 1:
+            self._run_concurrent(max_concurrent_tasks)
+            return
+
         while not self.is_exited:
             try:
                 voice_task: VoiceTask = self.user_question_queue.get(block=True, timeout=1)
                 self._process_voice_task(voice_task)
             except Empty:
+                # 空闲时保存上一轮的会话检查点
+                self._save_pending_checkpoint()
                 continue
             except Exception as e:
                 logger.error(f'AnswerGeneratorWorker 运行时发生错误: {e}')
+
+        if self.state_store is not None:
+            self._save_pending_checkpoint()
+            self.state_store.close()
+
+    def _run_concurrent(self, max_workers: int) -> None:
+        """并发处理多个会话的问题，由批处理调度器交错解码"""
+        semaphore = threading.Semaphore(max_workers)
+
+        def process(task: VoiceTask) -> None:
+            try:
+                self._process_voice_task(task)
+            except Exception as e:
+                logger.error(f'AnswerGeneratorWorker 运行时发生错误: {e}')
+            finally:
+                semaphore.release()
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='LLMSession') as executor:
+            while not self.is_exited:
+                if not semaphore.acquire(timeout=1):
+                    continue
+                try:
+                    voice_task: VoiceTask = self.user_question_queue.get(block=True, timeout=1)
+                except Empty:
+                    semaphore.release()
+                    continue
+                executor.submit(process, voice_task)
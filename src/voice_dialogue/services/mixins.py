@@ -1,8 +1,6 @@
-from collections import OrderedDict
-
 from voice_dialogue.core.constants import (
     voice_state_manager, session_manager, dropped_audio_cache,
-    user_still_speaking_event, chat_history_cache, is_debug_mode
+    user_still_speaking_event, chat_history_store, is_debug_mode
 )
 from voice_dialogue.models.voice_task import VoiceTask
 from voice_dialogue.utils.logger import logger
@@ -11,10 +9,16 @@ from voice_dialogue.utils.logger import logger
 class TaskStatusMixin:
     """提供语音任务状态检查和中断处理的通用功能"""
 
+    # 为 True 时按任务所属会话判断：只有同一会话的新任务能中断它，会话被新会话取代后失效。
+    # 多个会话并发处理时使用；默认只有当前会话的任务有效
+    per_session_validity = False
+
     def is_task_interrupted(self, voice_task: VoiceTask) -> bool:
         """检查语音任务是否被其他任务中断"""
         if not voice_state_manager.interrupt_task_id:
             return False
+        if self.per_session_validity and voice_state_manager.interrupt_session_id != voice_task.session_id:
+            return False
 
         if voice_task.id != voice_state_manager.interrupt_task_id:
             logger.info(f"任务<{voice_task.id}> 被任务<{voice_state_manager.interrupt_task_id}> 中断")
@@ -26,7 +30,11 @@ class TaskStatusMixin:
         """检查语音任务是否有效（会话匹配、未被丢弃等）"""
         if self.is_task_interrupted(voice_task):
             return False
-        if voice_task.session_id != session_manager.current_id:
+        if self.per_session_validity:
+            if session_manager.is_ended(voice_task.session_id):
+                logger.info(f"任务<{voice_task.id}> 所属会话已结束: {voice_task.session_id}")
+                return False
+        elif voice_task.session_id != session_manager.current_id:
             logger.info(f"任务<{voice_task.id}> 会话不匹配: {voice_task.session_id} != {session_manager.current_id}")
             return False
         if voice_task.answer_id in dropped_audio_cache:
@@ -50,19 +58,12 @@ class HistoryMixin:
 
     def update_chat_history(self, voice_task: VoiceTask) -> None:
         """更新会话的聊天历史"""
-        chat_history = chat_history_cache.get(voice_task.session_id, OrderedDict())
-        task_answer_id = voice_task.answer_id
-
-        user_question_key = f'{task_answer_id}:human'
-        if user_question_key not in chat_history:
-            chat_history[user_question_key] = voice_task.transcribed_text
-
-        ai_answer_key = f'{task_answer_id}:ai'
-        cached_ai_answer = chat_history.get(ai_answer_key, [])
-        cached_ai_answer.append(voice_task.answer_sentence)
-        chat_history[ai_answer_key] = cached_ai_answer
-
-        chat_history_cache[voice_task.session_id] = chat_history
+        chat_history_store.add_answer_sentence(
+            session_id=voice_task.session_id,
+            answer_id=voice_task.answer_id,
+            question=voice_task.transcribed_text,
+            sentence=voice_task.answer_sentence,
+        )
 
 
 class PerformanceLogMixin:
@@ -155,7 +155,7 @@ class SpeechStateMonitor(BaseThread):
 
         # 检查是否需要中断当前任务
         if self.active_audio_frame_duration > self.config.ACTIVE_FRAME_THRESHOLD:
-            voice_state_manager.interrupt_task_id = self.task_id
+            voice_state_manager.interrupt(self.task_id, session_manager.current_id)
 
         return True
 
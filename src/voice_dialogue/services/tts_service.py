@@ -1,13 +1,19 @@
+import threading
 import time
+import typing
+from collections import deque
 from multiprocessing import Queue
 from queue import Empty
 
+import numpy as np
+
+from voice_dialogue.config.tts_config import get_tts_audio_cache_params
 from voice_dialogue.core.base import BaseThread
-from voice_dialogue.core.constants import voice_state_manager
+from voice_dialogue.core.constants import voice_state_manager, pipeline_metrics, response_cache
 from voice_dialogue.models.voice_task import VoiceTask
 from voice_dialogue.services.mixins import TaskStatusMixin
 from voice_dialogue.services.utils import has_no_words
-from voice_dialogue.tts import tts_manager, BaseTTSConfig
+from voice_dialogue.tts import tts_manager, BaseTTSConfig, CachedTTS, TTSInterface
 from voice_dialogue.utils.logger import logger
 
 
@@ -20,6 +26,8 @@ class TTSAudioGenerator(BaseThread, TaskStatusMixin):
     2. 使用TTS引擎将文本转换为音频
     3. 处理用户打断和音频缓存逻辑
     4. 将生成的音频任务放入音频队列中
+
+    启用流式合成时，每个音频片段合成后立即放入音频队列，不必等待整句合成完成
     """
 
     def __init__(
@@ -27,6 +35,7 @@ class TTSAudioGenerator(BaseThread, TaskStatusMixin):
             text_input_queue: Queue,
             audio_output_queue: Queue,
             tts_config: BaseTTSConfig,
+            enable_streaming: bool = True,
     ):
         """
         初始化TTS音频生成器
@@ -35,14 +44,63 @@ class TTSAudioGenerator(BaseThread, TaskStatusMixin):
             text_input_queue: 文本输入队列，包含待转换的文本任务
             audio_output_queue: 音频输出队列，用于输出转换后的音频
             tts_config: TTS配置对象，包含语音合成的相关设置
+            enable_streaming: 是否按片段流式输出音频
         """
 
         super().__init__(group, target, name, args, kwargs, daemon=daemon)
 
         self.text_input_queue: Queue = text_input_queue
         self.audio_output_queue: Queue = audio_output_queue
+        # 从输入队列取出、等待合成的任务，用于提前预处理（如 G2P）
+        self._pending_tasks: typing.Deque[VoiceTask] = deque()
+
+        self.tts_config = tts_config
+        self.enable_streaming = enable_streaming
+        # 相同音色和文本的合成结果可以复用（内存 + 磁盘两级缓存）
+        self.audio_cache_params = get_tts_audio_cache_params()
+        self.tts_instance = self._create_tts_instance(tts_config)
+
+        # 热切换：新引擎在后台加载预热完成后放在这里，由主循环在句子之间替换
+        self._swap_lock = threading.Lock()
+        self._pending_swap: typing.Optional[typing.Tuple[BaseTTSConfig, TTSInterface]] = None
+        self._swap_done = threading.Event()
+
+    def _create_tts_instance(self, tts_config: BaseTTSConfig) -> TTSInterface:
+        # 引擎由多音色常驻池管理，切换回最近使用过的音色时无需重新加载
+        tts_instance = tts_manager.create_resident_tts(tts_config)
+        if self.audio_cache_params['enabled']:
+            tts_instance = CachedTTS(
+                tts_instance,
+                cache_dir=self.audio_cache_params['cache_dir'],
+                max_memory_bytes=self.audio_cache_params['max_memory_bytes'],
+                max_disk_bytes=self.audio_cache_params['max_disk_bytes'],
+                max_text_chars=self.audio_cache_params['max_text_chars'],
+            )
+        return tts_instance
+
+    def _initialize_tts_instance(
+            self,
+            tts_instance: TTSInterface,
+            tts_config: BaseTTSConfig,
+            progress_callback: typing.Optional[typing.Callable[[float, str], None]] = None,
+    ) -> None:
+        """加载、预热TTS引擎并预先合成常用短语"""
 
-        self.tts_instance = tts_manager.create_tts(tts_config)
+        def report(progress: float, message: str):
+            if progress_callback:
+                progress_callback(progress, message)
+
+        report(0.0, "正在加载TTS模型...")
+        tts_instance.setup(streaming=self.enable_streaming)
+        report(0.5, "正在预热TTS引擎...")
+        tts_instance.warmup()
+
+        if isinstance(tts_instance, CachedTTS):
+            report(0.8, "正在预热TTS音频缓存...")
+            language = 'zh' if tts_config.is_chinese_voice else 'en'
+            synthesized = tts_instance.prewarm(self.audio_cache_params['prewarm_phrases'].get(language, []))
+            logger.info(f"TTS音频缓存预热完成，新合成 {synthesized} 条短语")
+        report(1.0, "TTS引擎已就绪")
 
     def run(self):
         """
@@ -55,18 +113,24 @@ class TTSAudioGenerator(BaseThread, TaskStatusMixin):
         4. 生成音频并放入输出队列
         """
 
-        self.tts_instance.setup()
-        self.tts_instance.warmup()
+        self._initialize_tts_instance(self.tts_instance, self.tts_config)
+
+        # 回答缓存按音色区分
+        response_cache.set_voice(f"{self.tts_config.tts_type.value}:{self.tts_config.character_name}")
 
         self.is_ready = True
 
         while not self.is_exited:
             try:
-                voice_task: VoiceTask = self.text_input_queue.get(block=True, timeout=1)
+                # 在句子之间替换引擎，不会打断正在合成的句子
+                self._apply_pending_swap()
+
+                voice_task: VoiceTask = self._next_task()
                 if not voice_task:
                     continue
 
                 self._process_task(voice_task)
+                self._prepare_pending_tasks()
 
             except Empty:
                 continue
@@ -74,6 +138,118 @@ class TTSAudioGenerator(BaseThread, TaskStatusMixin):
                 logger.error(f"TTSAudioGenerator 主循环错误: {e}")
                 time.sleep(0.1)
 
+        self.tts_instance.release()
+        with self._swap_lock:
+            if self._pending_swap is not None:
+                self._pending_swap[1].release()
+                self._pending_swap = None
+
+    def hot_swap(
+            self,
+            tts_config: BaseTTSConfig,
+            progress_callback: typing.Optional[typing.Callable[[float, str], None]] = None,
+            timeout: float = 30.0,
+    ) -> bool:
+        """
+        蓝绿切换TTS引擎：在调用线程中加载并预热新引擎，期间旧引擎继续合成，
+        就绪后由主循环在句子之间原子替换，并释放旧引擎
+
+        Args:
+            tts_config: 新的TTS配置
+            progress_callback: 进度回调 (进度 0~1, 描述)
+            timeout: 等待主循环完成替换的超时时间（秒）
+
+        Returns:
+            bool: 是否切换成功
+        """
+        new_instance = self._create_tts_instance(tts_config)
+        try:
+            self._initialize_tts_instance(new_instance, tts_config, progress_callback)
+        except Exception:
+            new_instance.release()
+            raise
+
+        with self._swap_lock:
+            if self._pending_swap is not None:
+                # 上一次尚未生效的切换被新的切换取代
+                self._pending_swap[1].release()
+            self._pending_swap = (tts_config, new_instance)
+            self._swap_done.clear()
+
+        if self._swap_done.wait(timeout):
+            return True
+
+        with self._swap_lock:
+            # 超时后主循环可能恰好已经取走新引擎，此时切换仍然生效
+            if self._pending_swap is None or self._pending_swap[1] is not new_instance:
+                return self.tts_instance is new_instance
+            self._pending_swap = None
+        new_instance.release()
+        logger.warning(f"等待TTS引擎替换超时: {tts_config.character_name}")
+        return False
+
+    def _apply_pending_swap(self) -> None:
+        with self._swap_lock:
+            if self._pending_swap is None:
+                return
+            tts_config, new_instance = self._pending_swap
+            self._pending_swap = None
+
+        old_instance = self.tts_instance
+        self.tts_config, self.tts_instance = tts_config, new_instance
+        response_cache.set_voice(f"{tts_config.tts_type.value}:{tts_config.character_name}")
+        self._swap_done.set()
+        logger.info(f"TTS引擎已切换: {tts_config.character_name}")
+
+        old_instance.release()
+
+    def switch_tts_config(self, tts_config: BaseTTSConfig) -> bool:
+        """
+        不重启服务切换音色，仅当新配置与当前引擎共用模型时可行（如 Kokoro 同一模型文件的音色）
+
+        Args:
+            tts_config: 新的TTS配置
+
+        Returns:
+            bool: 是否切换成功，失败时需要重启服务
+        """
+        if not self.is_ready or not self.tts_instance.switch_config(tts_config):
+            return False
+
+        self.tts_config = tts_config
+        response_cache.set_voice(f"{tts_config.tts_type.value}:{tts_config.character_name}")
+        logger.info(f"TTS音色已切换: {tts_config.character_name}")
+        return True
+
+    def _next_task(self) -> typing.Optional[VoiceTask]:
+        if self._pending_tasks:
+            return self._pending_tasks.popleft()
+        return self.text_input_queue.get(block=True, timeout=1)
+
+    def _prepare_pending_tasks(self, max_pending: int = 8) -> None:
+        """
+        取出队列中已到达的后续句子交给 TTS 引擎提前预处理，
+        预处理在后台进行，与下一句的模型推理重叠
+        """
+        new_texts = []
+        while len(self._pending_tasks) < max_pending:
+            try:
+                task = self.text_input_queue.get_nowait()
+            except Empty:
+                break
+            self._pending_tasks.append(task)
+            if task and task.answer_sentence and not has_no_words(task.answer_sentence):
+                new_texts.append(task.answer_sentence)
+
+        if new_texts:
+            self.tts_instance.prepare_batch(new_texts)
+
+    def get_audio_cache_stats(self) -> typing.Optional[dict]:
+        """获取TTS音频缓存统计，未启用缓存时返回 None"""
+        if isinstance(self.tts_instance, CachedTTS):
+            return self.tts_instance.get_statistics()
+        return None
+
     def _process_task(self, voice_task: VoiceTask):
         """处理单个文本到语音任务"""
         if not voice_task.answer_sentence:
@@ -88,19 +264,84 @@ class TTSAudioGenerator(BaseThread, TaskStatusMixin):
 
         if has_no_words(voice_task.answer_sentence):
             logger.info(f"跳过仅包含标点的文本: '{voice_task.answer_sentence}'")
+            if voice_task.response_cache_key:
+                response_cache.record_sentence(
+                    voice_task.response_cache_key, voice_task.answer_id, voice_task.answer_index,
+                    voice_task.answer_sentence, None
+                )
             return
 
         logger.info(f"TTS 音频生成: {voice_task.answer_sentence}")
 
         voice_task.tts_start_time = time.time()
+        if self.enable_streaming:
+            sentence_audio = self._synthesize_streaming(voice_task)
+        else:
+            sentence_audio = self._synthesize_sentence(voice_task)
+        if sentence_audio is None:
+            return
+
+        audio_data, sample_rate = sentence_audio
+        audio_seconds = len(audio_data) / sample_rate if sample_rate else 0.0
+        pipeline_metrics.record_tts_synthesis(
+            voice_task.answer_sentence, voice_task.language,
+            time.time() - voice_task.tts_start_time, audio_seconds
+        )
+
+        if voice_task.response_cache_key:
+            response_cache.record_sentence(
+                voice_task.response_cache_key, voice_task.answer_id, voice_task.answer_index,
+                voice_task.answer_sentence, sentence_audio
+            )
+
+    def _put_audio(self, voice_task: VoiceTask, audio: tuple, fragment_index: int = 0) -> None:
+        audio_data, sample_rate = audio
+        pipeline_metrics.add_buffered_audio(len(audio_data) / sample_rate if sample_rate else 0.0)
+        self.audio_output_queue.put(voice_task.model_copy(update={
+            'tts_generated_sentence_audio': audio,
+            'tts_end_time': time.time(),
+            'audio_fragment_index': fragment_index,
+        }))
+
+    def _synthesize_sentence(self, voice_task: VoiceTask) -> typing.Optional[tuple]:
+        """整句合成后放入音频队列"""
         try:
-            tts_generated_sentence_audio = self.tts_instance.synthesize(voice_task.answer_sentence)
+            sentence_audio = self.tts_instance.synthesize(voice_task.answer_sentence)
         except Exception as e:
             logger.error(f"TTS 音频生成失败: {e}")
             voice_state_manager.reset_task_id()
-            return
+            return None
+
+        pipeline_metrics.record_tts_first_audio(time.time() - voice_task.tts_start_time)
+        self._put_audio(voice_task, sentence_audio)
+        return sentence_audio
+
+    def _synthesize_streaming(self, voice_task: VoiceTask) -> typing.Optional[tuple]:
+        """
+        按片段合成，每个片段产出后立即放入音频队列
+
+        Returns:
+            Optional[tuple]: 拼接后的整句音频，合成失败或任务中途失效时返回 None
+        """
+        fragments = []
+        try:
+            for fragment in self.tts_instance.synthesize_stream(voice_task.answer_sentence):
+                if not fragments:
+                    pipeline_metrics.record_tts_first_audio(time.time() - voice_task.tts_start_time)
+                self._put_audio(voice_task, fragment, fragment_index=len(fragments))
+                fragments.append(fragment)
 
-        voice_task.tts_generated_sentence_audio = tts_generated_sentence_audio
-        voice_task.tts_end_time = time.time()
+                # 片段之间检查任务是否失效，失效后不再继续合成
+                if not self.is_task_valid(voice_task):
+                    logger.info(f"TTS 音频生成: 任务<{voice_task.id}> 在合成过程中失效")
+                    return None
+        except Exception as e:
+            logger.error(f"TTS 音频生成失败: {e}")
+            voice_state_manager.reset_task_id()
+            return None
 
-        self.audio_output_queue.put(voice_task.model_copy())
+        if not fragments:
+            return None
+        if len(fragments) == 1:
+            return fragments[0]
+        return np.concatenate([audio_data for audio_data, _ in fragments]), fragments[0][1]
@@ -18,6 +18,8 @@ from .runtime import (
     TTSInterface,
     TTSFactory
 )
+from .audio_cache import CachedTTS
+from .residency import TTSResidencyPool, ResidentTTS
 from .manager import (
     TTSManager,
     TTSRegistryTables,
@@ -45,6 +47,13 @@ __all__ = [
     # 运行时接口
     'TTSInterface',
     'TTSFactory',
+
+    # 音频缓存
+    'CachedTTS',
+
+    # 多音色常驻池
+    'TTSResidencyPool',
+    'ResidentTTS',
 ]
 
 # 模块初始化时自动注册所有TTS实现
@@ -0,0 +1,290 @@
+import hashlib
+import json
+import os
+import threading
+import typing
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterator, Tuple
+
+import numpy as np
+import soundfile as sf
+
+from voice_dialogue.utils.logger import logger
+from .models.base import BaseTTSConfig
+from .runtime.interface import TTSInterface
+
+
+def normalize_tts_text(text: str) -> str:
+    """
+    合成文本的归一化形式：全半角统一 (NFKC)、合并空白
+
+    标点会影响停顿和语调，因此保留
+    """
+    return ' '.join(unicodedata.normalize('NFKC', text or '').split())
+
+
+def make_tts_cache_key(config: BaseTTSConfig, text: str) -> str:
+    """
+    以 (TTS类型, 音色, 推理参数, 归一化文本) 的哈希作为缓存 key
+
+    Args:
+        config: TTS配置
+        text: 合成文本
+
+    Returns:
+        str: sha256 摘要
+    """
+    inference_parameters = getattr(config, 'inference_parameters', None)
+    key = {
+        'tts_type': config.tts_type.value,
+        'character_name': config.character_name,
+        'inference_parameters': inference_parameters.model_dump() if inference_parameters is not None else {},
+        'text': normalize_tts_text(text),
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class CachedTTS(TTSInterface):
+    """
+    带两级缓存的 TTS 包装器
+
+    - 内存：LRU，按音频字节数淘汰
+    - 磁盘：FLAC (PCM_16) 文件，按修改时间淘汰，重启后仍可命中
+
+    Kokoro 推理是确定性的，MoYoYo 使用固定的随机种子，相同文本和参数的合成结果相同，可以安全复用。
+    缓存未命中时的流式合成仍按片段返回，合成完成后写入缓存。
+    """
+
+    def __init__(
+            self,
+            tts: TTSInterface,
+            cache_dir: Path,
+            max_memory_bytes: int = 64 << 20,
+            max_disk_bytes: int = 512 << 20,
+            max_text_chars: int = 80,
+    ):
+        super().__init__(tts.config)
+        self.tts = tts
+        self.cache_dir = Path(cache_dir)
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.max_text_chars = max_text_chars
+
+        self._memory: typing.OrderedDict[str, Tuple[np.ndarray, int]] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: typing.Optional[int] = None
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    # ---------------- TTSInterface ----------------
+
+    def setup(self, **kwargs) -> None:
+        self.tts.setup(**kwargs)
+
+    def warmup(self, warmup_steps: int = 1) -> None:
+        self.tts.warmup(warmup_steps)
+
+    @property
+    def is_ready(self) -> bool:
+        return self.tts.is_ready
+
+    @is_ready.setter
+    def is_ready(self, value: bool):
+        self.tts.is_ready = value
+
+    def synthesize(self, text: str, **kwargs) -> Tuple[np.ndarray, int]:
+        key = self._make_key(text)
+        if key is not None:
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+
+        audio = self.tts.synthesize(text, **kwargs)
+        if key is not None:
+            self.put(key, audio)
+        return audio
+
+    def synthesize_stream(self, text: str, **kwargs) -> Iterator[Tuple[np.ndarray, int]]:
+        key = self._make_key(text)
+        if key is not None:
+            cached = self.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        fragments = []
+        for fragment in self.tts.synthesize_stream(text, **kwargs):
+            fragments.append(fragment)
+            yield fragment
+
+        # 被中途打断（生成器提前关闭）时不会执行到这里，不完整的音频不会写入缓存
+        if key is not None and fragments:
+            audio_data = np.concatenate([audio for audio, _ in fragments])
+            self.put(key, (audio_data, fragments[0][1]))
+
+    def prepare_batch(self, texts: typing.List[str]) -> None:
+        # 已缓存音频的句子不需要预处理
+        self.tts.prepare_batch([text for text in texts if not self._is_cached(text)])
+
+    def switch_config(self, config: BaseTTSConfig) -> bool:
+        # 缓存 key 包含音色，切换后自动区分
+        if not self.tts.switch_config(config):
+            return False
+        self.config = config
+        return True
+
+    def release(self) -> None:
+        self.tts.release()
+
+    # ---------------- 缓存 ----------------
+
+    def _is_cached(self, text: str) -> bool:
+        key = self._make_key(text)
+        if key is None:
+            return False
+        with self._lock:
+            if key in self._memory:
+                return True
+        return self._disk_path(key).exists()
+
+    def _make_key(self, text: str) -> typing.Optional[str]:
+        """过长的文本不太可能重复，不缓存"""
+        if len(normalize_tts_text(text)) > self.max_text_chars:
+            return None
+        return make_tts_cache_key(self.config, text)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.flac"
+
+    def get(self, key: str) -> typing.Optional[Tuple[np.ndarray, int]]:
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return audio
+
+        path = self._disk_path(key)
+        if path.exists():
+            try:
+                audio_data, sample_rate = sf.read(path.as_posix(), dtype='float32')
+            except Exception as e:
+                logger.warning(f"读取TTS音频缓存失败 {path.name}: {e}")
+                path.unlink(missing_ok=True)
+            else:
+                os.utime(path)
+                audio = (audio_data, sample_rate)
+                with self._lock:
+                    self.disk_hits += 1
+                    self._put_memory(key, audio)
+                return audio
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, audio: Tuple[np.ndarray, int]) -> None:
+        audio_data, sample_rate = audio
+        audio = (np.asarray(audio_data, dtype=np.float32).reshape(-1), int(sample_rate))
+        with self._lock:
+            self._put_memory(key, audio)
+        self._put_disk(key, audio)
+
+    def _put_memory(self, key: str, audio: Tuple[np.ndarray, int]) -> None:
+        if key in self._memory:
+            self._memory_bytes -= self._memory.pop(key)[0].nbytes
+        self._memory[key] = audio
+        self._memory_bytes += audio[0].nbytes
+        while self._memory and self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted[0].nbytes
+
+    def _put_disk(self, key: str, audio: Tuple[np.ndarray, int]) -> None:
+        path = self._disk_path(key)
+        if path.exists():
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            sf.write(tmp_path.as_posix(), audio[0], samplerate=audio[1], format='FLAC', subtype='PCM_16')
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"写入TTS音频缓存失败: {e}")
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(p.stat().st_size for p in self.cache_dir.glob('*/*.flac'))
+            else:
+                self._disk_bytes += path.stat().st_size
+            if self._disk_bytes > self.max_disk_bytes:
+                self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """删除最久未使用的文件，直到占用降到上限的 80%"""
+        files = sorted(self.cache_dir.glob('*/*.flac'), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in files)
+        for path in files:
+            if total <= self.max_disk_bytes * 0.8:
+                break
+            total -= path.stat().st_size
+            path.unlink(missing_ok=True)
+        self._disk_bytes = total
+
+    def prewarm(self, texts: typing.Iterable[str]) -> int:
+        """
+        预先合成常用短语（问候、确认、错误提示等），磁盘中已有的只加载到内存
+
+        Args:
+            texts: 短语列表
+
+        Returns:
+            int: 新合成的短语数量
+        """
+        synthesized = 0
+        for text in texts:
+            key = self._make_key(text)
+            if key is None or self.get(key) is not None:
+                continue
+            try:
+                self.put(key, self.tts.synthesize(text))
+                synthesized += 1
+            except Exception as e:
+                logger.warning(f"预热TTS缓存失败 '{text}': {e}")
+
+        # 预热不计入命中率
+        self.reset_stats()
+        return synthesized
+
+    def clear(self) -> None:
+        """清空内存缓存和磁盘缓存"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            for path in self.cache_dir.glob('*/*.flac'):
+                path.unlink(missing_ok=True)
+            self._disk_bytes = 0
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.memory_hits = 0
+            self.disk_hits = 0
+            self.misses = 0
+
+    def get_statistics(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'disk_bytes': self._disk_bytes,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,170 @@
+import threading
+import time
+import typing
+import unicodedata
+from collections import OrderedDict
+
+import torch
+
+from voice_dialogue.utils.logger import logger
+
+
+class BertFeatureCache:
+    """
+    MoYoYo 文本前端的 BERT 特征缓存
+
+    中文文本在前端按分句运行 chinese-roberta-wwm-ext-large 得到音素级 BERT 特征，是 CPU 上每句最耗时的步骤之一。
+    对话回答中的分句经常重复（确认语、过渡语等），以归一化的分句文本为 key 缓存特征，命中时完全跳过 RoBERTa 推理。
+    BERT 特征依赖整个分句的上下文，因此以前端处理的分句为单位缓存，不再细分。
+    按特征张量字节数做 LRU 淘汰。
+    """
+
+    def __init__(self, max_bytes: int = 64 << 20):
+        self.max_bytes = max_bytes
+
+        self._features: typing.OrderedDict[tuple, torch.Tensor] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.bert_seconds = 0.0
+        self.frontend_sentences = 0
+        self.frontend_seconds = 0.0
+        self.last_frontend_seconds = 0.0
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return ' '.join(unicodedata.normalize('NFKC', text).split())
+
+    def get(self, text: str, word2ph: typing.Sequence[int], compute: typing.Callable[[], torch.Tensor]) -> torch.Tensor:
+        """
+        获取分句的 BERT 特征，未缓存时调用 compute 计算
+
+        Args:
+            text: 归一化后的分句文本
+            word2ph: 每个字对应的音素数，与文本一起决定特征形状
+            compute: 运行 BERT 计算特征的函数
+
+        Returns:
+            torch.Tensor: 音素级 BERT 特征
+        """
+        key = (self._normalize(text), tuple(word2ph))
+        with self._lock:
+            feature = self._features.get(key)
+            if feature is not None:
+                self._features.move_to_end(key)
+                self.hits += 1
+                return feature
+            self.misses += 1
+
+        start = time.perf_counter()
+        feature = compute().detach()
+        elapsed = time.perf_counter() - start
+
+        nbytes = feature.element_size() * feature.nelement()
+        with self._lock:
+            self.bert_seconds += elapsed
+            if nbytes <= self.max_bytes and key not in self._features:
+                self._features[key] = feature
+                self._bytes += nbytes
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._features.popitem(last=False)
+                    self._bytes -= evicted.element_size() * evicted.nelement()
+        return feature
+
+    def record_frontend(self, seconds: float) -> None:
+        """记录一句文本的前端处理耗时"""
+        with self._lock:
+            self.frontend_sentences += 1
+            self.frontend_seconds += seconds
+            self.last_frontend_seconds = seconds
+
+    def attach(self, text_preprocessor) -> bool:
+        """
+        为 TextPreprocessor 实例启用缓存：替换其 get_bert_feature，并统计 preprocess 的耗时
+
+        Returns:
+            bool: 是否成功启用
+        """
+        get_bert_feature = getattr(text_preprocessor, 'get_bert_feature', None)
+        preprocess = getattr(text_preprocessor, 'preprocess', None)
+        if get_bert_feature is None:
+            logger.warning("TextPreprocessor 不支持 get_bert_feature，BERT 特征缓存未启用")
+            return False
+
+        def cached_get_bert_feature(text, word2ph):
+            return self.get(text, word2ph, lambda: get_bert_feature(text, word2ph))
+
+        text_preprocessor.get_bert_feature = cached_get_bert_feature
+
+        if preprocess is not None:
+            def timed_preprocess(*args, **kwargs):
+                start = time.perf_counter()
+                result = preprocess(*args, **kwargs)
+                elapsed = time.perf_counter() - start
+                self.record_frontend(elapsed)
+                logger.debug(f"MoYoYo 文本前端耗时: {elapsed * 1000:.1f}ms")
+                return result
+
+            text_preprocessor.preprocess = timed_preprocess
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._features.clear()
+            self._bytes = 0
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.bert_seconds = 0.0
+            self.frontend_sentences = 0
+            self.frontend_seconds = 0.0
+            self.last_frontend_seconds = 0.0
+
+    def get_statistics(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._features),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'bert_seconds': round(self.bert_seconds, 3),
+                'frontend_sentences': self.frontend_sentences,
+                'avg_frontend_ms': round(self.frontend_seconds / self.frontend_sentences * 1000, 1)
+                if self.frontend_sentences else 0.0,
+                'last_frontend_ms': round(self.last_frontend_seconds * 1000, 1),
+            }
+
+
+_shared_caches: typing.Dict[str, BertFeatureCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_shared_bert_feature_cache(bert_model_path: str, max_bytes: int) -> BertFeatureCache:
+    """
+    获取使用同一 BERT 模型的音色共享的特征缓存
+
+    Args:
+        bert_model_path: BERT 模型路径
+        max_bytes: 缓存上限（字节）
+
+    Returns:
+        BertFeatureCache: 共享实例
+    """
+    with _shared_caches_lock:
+        if bert_model_path not in _shared_caches:
+            _shared_caches[bert_model_path] = BertFeatureCache(max_bytes)
+        return _shared_caches[bert_model_path]
+
+
+def get_all_bert_feature_cache_stats() -> typing.Dict[str, dict]:
+    """各 BERT 模型对应缓存的统计"""
+    with _shared_caches_lock:
+        caches = dict(_shared_caches)
+    return {path: cache.get_statistics() for path, cache in caches.items()}
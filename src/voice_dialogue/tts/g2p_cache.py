@@ -0,0 +1,173 @@
+import re
+import threading
+import time
+import typing
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from voice_dialogue.utils.logger import logger
+
+# 分句切分位置（保留标点），中英文标点都会被 misaki 映射为西文标点加空格
+PHRASE_PATTERN = re.compile(r'(?<=[，。！？；：、,.!?;:])\s*')
+
+
+def split_phrases(text: str) -> typing.List[str]:
+    """在标点处将句子切分为短语"""
+    return [phrase for phrase in PHRASE_PATTERN.split(text.strip()) if phrase.strip()]
+
+
+class CachedG2P:
+    """
+    带缓存的 G2P（文字转音素）
+
+    以短语为单位缓存 misaki G2P 的结果：句子按标点切分为短语，只对未缓存的短语调用 G2P，
+    问候语、确认语以及回答中反复出现的短语不再重复分词和注音。
+    不按单词缓存：misaki 的英文注音依赖 spaCy 词性、中文依赖分词和变调，单独注音会改变读音。
+
+    同一语言的所有 Kokoro 音色共享一个实例（见 get_shared_g2p）。
+    prefetch 在后台线程为排队中的句子提前注音，与当前句子的 ONNX 推理并行。
+    """
+
+    def __init__(self, g2p: typing.Callable, max_entries: int = 8192):
+        self.g2p = g2p
+        self.max_entries = max_entries
+
+        self._phrases: typing.OrderedDict[str, str] = OrderedDict()
+        self._inflight: typing.Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        # misaki G2P 不是线程安全的
+        self._g2p_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='G2PPrefetch')
+
+        self.hits = 0
+        self.misses = 0
+        self.g2p_seconds = 0.0
+
+    def __call__(self, text: str) -> typing.Tuple[str, None]:
+        """与 misaki G2P 相同的调用方式"""
+        return self.phonemize(text), None
+
+    @staticmethod
+    def _normalize(phrase: str) -> str:
+        return ' '.join(unicodedata.normalize('NFKC', phrase).split())
+
+    def _run_g2p(self, phrase: str) -> str:
+        with self._g2p_lock:
+            start = time.perf_counter()
+            phonemes, _ = self.g2p(phrase)
+            elapsed = time.perf_counter() - start
+        with self._lock:
+            self.g2p_seconds += elapsed
+        return phonemes
+
+    def _get_or_submit(self, phrase: str, background: bool) -> typing.Union[str, Future]:
+        """返回缓存的音素，或者正在计算的 Future；都没有时发起计算"""
+        key = self._normalize(phrase)
+        with self._lock:
+            if key in self._phrases:
+                self._phrases.move_to_end(key)
+                self.hits += 1
+                return self._phrases[key]
+            future = self._inflight.get(key)
+            if future is not None:
+                self.hits += 1
+                return future
+            self.misses += 1
+            future = Future()
+            self._inflight[key] = future
+
+        def compute():
+            try:
+                phonemes = self._run_g2p(phrase)
+            except Exception as e:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                future.set_exception(e)
+                return
+            with self._lock:
+                self._inflight.pop(key, None)
+                self._phrases[key] = phonemes
+                while len(self._phrases) > self.max_entries:
+                    self._phrases.popitem(last=False)
+            future.set_result(phonemes)
+
+        if background:
+            self._executor.submit(compute)
+        else:
+            compute()
+        return future
+
+    def phonemize(self, text: str) -> str:
+        """
+        将句子转换为音素
+
+        Args:
+            text: 句子
+
+        Returns:
+            str: 音素串
+        """
+        results = [self._get_or_submit(phrase, background=False) for phrase in split_phrases(text)]
+        return ' '.join(result.result() if isinstance(result, Future) else result for result in results)
+
+    def phonemize_batch(self, texts: typing.List[str]) -> typing.List[str]:
+        """
+        批量转换多个句子，不同句子中重复的短语只注音一次
+
+        Args:
+            texts: 句子列表
+
+        Returns:
+            List[str]: 各句子的音素串
+        """
+        return [self.phonemize(text) for text in texts]
+
+    def prefetch(self, texts: typing.Iterable[str]) -> None:
+        """在后台为即将合成的句子注音"""
+        for text in texts:
+            for phrase in split_phrases(text):
+                try:
+                    self._get_or_submit(phrase, background=True)
+                except RuntimeError as e:
+                    # 解释器退出时线程池已关闭
+                    logger.debug(f"G2P 预取失败: {e}")
+                    return
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.g2p_seconds = 0.0
+
+    def get_statistics(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._phrases),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'g2p_seconds': round(self.g2p_seconds, 3),
+            }
+
+
+_shared_g2p: typing.Dict[str, CachedG2P] = {}
+_shared_g2p_lock = threading.Lock()
+
+
+def get_shared_g2p(language: str, factory: typing.Callable[[], typing.Callable]) -> CachedG2P:
+    """
+    获取指定语言共享的带缓存 G2P，首次调用时使用 factory 创建 misaki G2P
+
+    Args:
+        language: 语言，如 'zh'、'en'
+        factory: 创建 misaki G2P 的函数
+
+    Returns:
+        CachedG2P: 共享实例
+    """
+    with _shared_g2p_lock:
+        if language not in _shared_g2p:
+            _shared_g2p[language] = CachedG2P(factory())
+        return _shared_g2p[language]
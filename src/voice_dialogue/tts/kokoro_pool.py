@@ -0,0 +1,140 @@
+import threading
+import typing
+from dataclasses import dataclass
+from pathlib import Path
+
+import onnxruntime as rt
+from kokoro_onnx import Kokoro
+
+from voice_dialogue.config.tts_config import get_kokoro_onnx_session_params
+from voice_dialogue.utils.hardware import get_thread_config
+from voice_dialogue.utils.logger import logger
+
+GRAPH_OPTIMIZATION_LEVELS = {
+    'disable': rt.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    'basic': rt.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    'extended': rt.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    'all': rt.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+
+def create_session_options(session_params: dict) -> rt.SessionOptions:
+    """根据会话参数创建 ONNX Runtime SessionOptions"""
+    sess_options = rt.SessionOptions()
+    intra_op_num_threads = session_params.get('intra_op_num_threads')
+    if intra_op_num_threads is None:
+        # 限制线程数避免与 LLM 解码抢占 CPU
+        intra_op_num_threads = get_thread_config()['onnx_intra_op_threads']
+    sess_options.intra_op_num_threads = intra_op_num_threads
+    sess_options.inter_op_num_threads = session_params.get('inter_op_num_threads', 1)
+    sess_options.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS[
+        session_params.get('graph_optimization_level', 'all')
+    ]
+    sess_options.enable_cpu_mem_arena = session_params.get('enable_cpu_mem_arena', True)
+    sess_options.enable_mem_pattern = session_params.get('enable_mem_pattern', True)
+    return sess_options
+
+
+@dataclass
+class _PooledModel:
+    model: Kokoro
+    refcount: int = 0
+    warmed_up: bool = False
+
+
+class KokoroSessionPool:
+    """
+    Kokoro 模型会话池
+
+    同一模型文件（onnx + voices + vocab）的所有音色共享一个 Kokoro 实例和 ONNX 会话，
+    音色在每次合成时通过 voice 参数指定，切换音色不需要重新加载模型。
+    按引用计数管理，最后一个使用者释放后卸载会话。
+    """
+
+    def __init__(self):
+        self._models: typing.Dict[tuple, _PooledModel] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(
+            model_path: Path, voices_path: Path, vocab_config_path: typing.Optional[Path], session_params: dict
+    ) -> tuple:
+        return (
+            str(model_path),
+            str(voices_path),
+            str(vocab_config_path) if vocab_config_path else None,
+            tuple(sorted((name, str(value)) for name, value in session_params.items())),
+        )
+
+    def acquire(
+            self,
+            model_path: Path,
+            voices_path: Path,
+            vocab_config_path: typing.Optional[Path] = None,
+            session_params: typing.Optional[dict] = None,
+    ) -> typing.Tuple[tuple, Kokoro]:
+        """
+        获取共享的 Kokoro 实例，不存在时创建
+
+        Returns:
+            Tuple[tuple, Kokoro]: (池 key, Kokoro 实例)，key 用于 release
+        """
+        if session_params is None:
+            session_params = get_kokoro_onnx_session_params()
+        key = self.make_key(model_path, voices_path, vocab_config_path, session_params)
+
+        with self._lock:
+            pooled = self._models.get(key)
+            if pooled is None:
+                logger.info(f"创建 Kokoro ONNX 会话: {Path(model_path).name}")
+                session = rt.InferenceSession(
+                    str(model_path),
+                    sess_options=create_session_options(session_params),
+                    providers=session_params.get('providers') or ['CPUExecutionProvider'],
+                )
+                model = Kokoro.from_session(
+                    session,
+                    voices_path=str(voices_path),
+                    vocab_config=str(vocab_config_path) if vocab_config_path else None,
+                )
+                pooled = self._models[key] = _PooledModel(model)
+            else:
+                logger.info(f"复用 Kokoro ONNX 会话: {Path(model_path).name}")
+            pooled.refcount += 1
+            return key, pooled.model
+
+    def release(self, key: tuple) -> None:
+        """释放引用，引用计数归零时卸载会话"""
+        with self._lock:
+            pooled = self._models.get(key)
+            if pooled is None:
+                return
+            pooled.refcount -= 1
+            if pooled.refcount <= 0:
+                del self._models[key]
+                logger.info(f"卸载 Kokoro ONNX 会话: {Path(key[0]).name}")
+
+    def mark_warmed_up(self, key: tuple) -> bool:
+        """
+        标记会话已预热
+
+        Returns:
+            bool: 此前是否已经预热过
+        """
+        with self._lock:
+            pooled = self._models.get(key)
+            if pooled is None:
+                return False
+            warmed_up, pooled.warmed_up = pooled.warmed_up, True
+            return warmed_up
+
+    def get_statistics(self) -> typing.List[dict]:
+        with self._lock:
+            return [
+                {'model': Path(key[0]).name, 'voices': Path(key[1]).name, 'refcount': pooled.refcount}
+                for key, pooled in self._models.items()
+            ]
+
+
+# 全局会话池
+kokoro_session_pool = KokoroSessionPool()
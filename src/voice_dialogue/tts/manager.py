@@ -1,12 +1,15 @@
 import importlib.util
 import inspect
 import re
+import threading
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Type
+from typing import Dict, Optional, Type
 
+from voice_dialogue.config.tts_config import get_tts_residency_params
 from voice_dialogue.utils.logger import logger
 from .models.base import BaseTTSConfig
+from .residency import TTSResidencyPool, ResidentTTS
 from .runtime.interface import TTSInterface
 
 
@@ -84,7 +87,8 @@ class TTSManager:
     """TTS管理器，负责管理和创建TTS实例"""
 
     def __init__(self):
-        self._tts_instances: Dict[str, TTSInterface] = {}
+        self._residency_pool: Optional[TTSResidencyPool] = None
+        self._residency_lock = threading.Lock()
 
     def create_tts(self, config: BaseTTSConfig) -> TTSInterface:
         """
@@ -107,22 +111,25 @@ class TTSManager:
         tts_class = tts_tables.tts_classes[tts_type]
         return tts_class(config)
 
-    def get_or_create_tts(self, config: BaseTTSConfig) -> TTSInterface:
+    def get_residency_pool(self) -> TTSResidencyPool:
+        """获取多音色常驻池（首次调用时按配置的内存预算创建）"""
+        with self._residency_lock:
+            if self._residency_pool is None:
+                params = get_tts_residency_params()
+                self._residency_pool = TTSResidencyPool(self.create_tts, params['max_memory_bytes'])
+            return self._residency_pool
+
+    def create_resident_tts(self, config: BaseTTSConfig) -> ResidentTTS:
         """
-        获取或创建TTS实例（单例模式）
-        
+        创建常驻池中TTS实例的句柄，setup 时加载或复用已常驻的实例
+
         Args:
             config: TTS配置对象
-            
+
         Returns:
-            TTSInterface: TTS实例
+            ResidentTTS: TTS实例句柄
         """
-        instance_key = f"{config.tts_type.value}:{config.character_name}"
-
-        if instance_key not in self._tts_instances:
-            self._tts_instances[instance_key] = self.create_tts(config)
-
-        return self._tts_instances[instance_key]
+        return ResidentTTS(config, self.get_residency_pool())
 
     def list_registered_tts(self) -> Dict[str, Type[TTSInterface]]:
         """列出所有已注册的TTS类"""
@@ -51,6 +51,17 @@ class BaseTTSConfig(BaseModel, ABC):
         """删除模型"""
         pass
 
+    def get_resident_components(self) -> typing.List[Path]:
+        """
+        加载后常驻内存的模型文件（或目录），用于估算音色的内存占用
+
+        不同音色返回相同路径的组件（如共享的 HuBERT、BERT）只计算一次
+
+        Returns:
+            List[Path]: 模型文件路径
+        """
+        return []
+
 
 class TTSConfigRegistry:
     """TTS注册表，管理所有TTS引擎和配置"""
@@ -46,6 +46,10 @@ class KokoroTTSConfig(BaseTTSConfig):
     def download_model(self, progress_callback: typing.Callable = None):
         pass
 
+    def get_resident_components(self) -> typing.List[Path]:
+        # 同一模型文件的音色共享 ONNX 会话和音色表
+        return [self.model_path, self.voices_path]
+
     def delete_model(self):
         pass
 
@@ -6,6 +6,7 @@ from pydantic import BaseModel, Field
 
 from voice_dialogue.config.paths import TTS_MODELS_PATH
 from voice_dialogue.utils.download_utils import download_file_from_huggingface
+from voice_dialogue.utils.logger import logger
 from .base import BaseTTSConfig, TTSConfigType, VoiceModelStatus
 
 
@@ -71,6 +72,7 @@ class MoYoYoTTSConfig(BaseTTSConfig):
 
         try:
             self._download_model_files(progress_callback)
+            self.convert_weights_to_safetensors()
             self.download_status = VoiceModelStatus.DOWNLOADED
         except Exception:
             self.download_status = VoiceModelStatus.FAILED
@@ -103,6 +105,40 @@ class MoYoYoTTSConfig(BaseTTSConfig):
                 file_path.rmdir()
         self.download_status = VoiceModelStatus.NOT_DOWNLOADED
 
+    def get_pickle_weight_paths(self) -> typing.List[Path]:
+        """以 pickle 格式保存、加载时需要完整读取和复制的权重文件"""
+        return [
+            self.gpt_weights_path,
+            self.sovits_weights_path,
+            self.hubert_model_path / 'pytorch_model.bin',
+            self.bert_model_path / 'pytorch_model.bin',
+        ]
+
+    def has_safetensors_weights(self) -> bool:
+        """所有权重是否都已转换过（已有 safetensors 版本，或已确认无法转换）"""
+        from voice_dialogue.tts.safetensors_weights import get_safetensors_variant, is_marked_unconvertible
+
+        return all(
+            get_safetensors_variant(path).exists() or is_marked_unconvertible(path)
+            for path in self.get_pickle_weight_paths() if path.is_file()
+        )
+
+    def convert_weights_to_safetensors(self) -> None:
+        """
+        将权重一次性转换为可内存映射的 safetensors 文件，加载时优先使用，避免 pickle 反序列化和张量复制
+
+        在下载模型时调用，已转换或已确认无法转换的文件直接跳过；转换失败不影响使用，仍加载原始权重
+        """
+        from voice_dialogue.tts.safetensors_weights import convert_to_safetensors
+
+        if self.has_safetensors_weights():
+            return
+        for path in self.get_pickle_weight_paths():
+            try:
+                convert_to_safetensors(path)
+            except Exception as e:
+                logger.warning(f"转换 safetensors 失败 {path.name}: {e}")
+
     # 模型文件路径属性
     @property
     def gpt_weights_path(self) -> Path:
@@ -129,6 +165,14 @@ class MoYoYoTTSConfig(BaseTTSConfig):
         """参考音频文件路径"""
         return self.get_model_storage_path() / self.model_files.get('reference_audio', '')
 
+    @property
+    def prompt_feature_cache_path(self) -> Path:
+        """参考音频提示特征缓存目录"""
+        return self.get_model_storage_path() / 'prompt_cache'
+
+    def get_resident_components(self) -> typing.List[Path]:
+        return [self.gpt_weights_path, self.sovits_weights_path, self.hubert_model_path, self.bert_model_path]
+
     def get_runtime_config(self) -> typing.Dict[str, typing.Any]:
         """获取Moyoyo运行时配置"""
         return {
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import typing
+from pathlib import Path
+
+import torch
+
+from voice_dialogue.utils.logger import logger
+
+# 缓存格式版本，缓存内容或计算方式变化时递增
+PROMPT_FEATURE_CACHE_VERSION = 1
+
+# 需要持久化的参考音频/提示文本特征（TTSModule.prompt_cache 中的字段）
+PROMPT_FEATURE_KEYS = (
+    'prompt_semantic',
+    'refer_spec',
+    'prompt_text',
+    'prompt_lang',
+    'phones',
+    'bert_features',
+    'norm_text',
+)
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    """文件内容的 sha256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def model_fingerprint(path: Path) -> typing.List[tuple]:
+    """
+    模型文件（或目录）的版本指纹：文件名、大小和修改时间
+
+    权重文件有数百 MB 到 GB，每次启动计算内容哈希的开销与重新计算特征相当，因此只比较元数据
+    """
+    path = Path(path)
+    if path.is_file():
+        files = [path]
+    elif path.is_dir():
+        files = sorted(p for p in path.rglob('*') if p.is_file())
+    else:
+        return []
+    return [(p.name, p.stat().st_size, p.stat().st_mtime_ns) for p in files]
+
+
+class PromptFeatureCache:
+    """
+    参考音频提示特征的磁盘缓存
+
+    MoYoYo 音色的参考音频 HuBERT 语义 token、参考频谱以及提示文本的 BERT 特征在各次启动之间不变，
+    首次计算后保存到模型目录中，之后启动时以内存映射方式加载，不再解码参考音频和运行 HuBERT/BERT。
+    缓存 key 包含参考音频的内容哈希、提示文本和各模型文件的版本指纹，任何一项变化都会重新计算。
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+
+    @staticmethod
+    def make_key(
+            reference_audio_path: Path,
+            prompt_text: str,
+            prompt_lang: str,
+            model_paths: typing.Iterable[Path],
+            **extra,
+    ) -> str:
+        """
+        Args:
+            reference_audio_path: 参考音频
+            prompt_text: 参考音频对应的文本
+            prompt_lang: 提示文本语言
+            model_paths: 参与计算特征的模型文件或目录
+            **extra: 其他影响特征的参数（如设备、精度）
+
+        Returns:
+            str: sha256 摘要
+        """
+        key = {
+            'version': PROMPT_FEATURE_CACHE_VERSION,
+            'reference_audio': file_sha256(reference_audio_path),
+            'prompt_text': prompt_text,
+            'prompt_lang': prompt_lang,
+            'models': [model_fingerprint(path) for path in model_paths],
+            'extra': {name: str(value) for name, value in extra.items()},
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pt"
+
+    def load(self, key: str) -> typing.Optional[dict]:
+        """加载缓存的特征（张量以内存映射方式加载），不存在或损坏时返回 None"""
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            return torch.load(path.as_posix(), mmap=True, weights_only=True)
+        except Exception as e:
+            logger.warning(f"读取参考音频特征缓存失败 {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def save(self, key: str, prompt_cache: dict) -> bool:
+        """
+        保存 prompt_cache 中的提示特征
+
+        Returns:
+            bool: 是否保存成功
+        """
+        features = {name: prompt_cache[name] for name in PROMPT_FEATURE_KEYS if prompt_cache.get(name) is not None}
+        if 'prompt_semantic' not in features:
+            return False
+
+        path = self._path(key)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            torch.save(features, tmp_path.as_posix())
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"保存参考音频特征缓存失败: {e}")
+            return False
+        return True
@@ -0,0 +1,277 @@
+import threading
+import typing
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from voice_dialogue.utils.logger import logger
+from .models.base import BaseTTSConfig
+from .runtime.interface import TTSInterface
+
+
+def get_path_size(path: Path) -> int:
+    """文件大小，目录时为其中所有文件大小之和"""
+    path = Path(path)
+    if path.is_file():
+        return path.stat().st_size
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.rglob('*') if p.is_file())
+    return 0
+
+
+@dataclass
+class _ResidentEntry:
+    tts: TTSInterface
+    config: BaseTTSConfig
+    components: typing.Dict[str, int]
+    refcount: int = 0
+
+
+class TTSResidencyPool:
+    """
+    多音色常驻池
+
+    已加载并预热的TTS实例按音色常驻内存，多个会话可以同时使用不同的音色而无需重新加载。
+    内存占用按各音色的常驻组件（见 BaseTTSConfig.get_resident_components）估算，
+    多个音色共享的组件只计算一次。超出预算时淘汰最久未使用、且引用计数为 0 的音色；
+    所有音色都在使用中时允许暂时超出预算。
+    最后一个使用者归还实例后（所有音色的引用计数都为 0，如 TTS 服务停止），卸载全部音色。
+    """
+
+    def __init__(self, factory: typing.Callable[[BaseTTSConfig], TTSInterface], max_memory_bytes: int):
+        self.factory = factory
+        self.max_memory_bytes = max_memory_bytes
+
+        self._entries: typing.OrderedDict[tuple, _ResidentEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        # 同一时间只加载一个音色，避免并发加载时重复创建和内存峰值叠加
+        self._load_lock = threading.Lock()
+
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(config: BaseTTSConfig, setup_kwargs: dict) -> tuple:
+        return config.tts_type.value, config.character_name, tuple(sorted(setup_kwargs.items()))
+
+    @staticmethod
+    def _estimate_components(config: BaseTTSConfig) -> typing.Dict[str, int]:
+        return {str(path): get_path_size(path) for path in config.get_resident_components()}
+
+    def _memory_bytes(self, extra: typing.Optional[typing.Dict[str, int]] = None) -> int:
+        """常驻组件去重后的总大小"""
+        components = {}
+        for entry in self._entries.values():
+            components.update(entry.components)
+        if extra:
+            components.update(extra)
+        return sum(components.values())
+
+    def _evict(self, reserve: typing.Optional[typing.Dict[str, int]] = None) -> typing.List[_ResidentEntry]:
+        """移除最久未使用的空闲音色，直到加上 reserve 后不超过预算，返回被移除的条目"""
+        evicted = []
+        for key in list(self._entries.keys()):
+            if self._memory_bytes(reserve) <= self.max_memory_bytes:
+                break
+            entry = self._entries[key]
+            if entry.refcount > 0:
+                continue
+            # 组件全部与即将加载的音色共享，移除后不会释放内存
+            if reserve and set(entry.components) <= set(reserve):
+                continue
+            del self._entries[key]
+            self.evictions += 1
+            evicted.append(entry)
+        return evicted
+
+    @staticmethod
+    def _release_entries(entries: typing.List[_ResidentEntry]) -> None:
+        for entry in entries:
+            logger.info(f"TTS常驻池淘汰音色: {entry.config.character_name}")
+            try:
+                entry.tts.release()
+            except Exception as e:
+                logger.warning(f"释放TTS实例失败 {entry.config.character_name}: {e}")
+
+    def _acquire_resident(self, key: tuple) -> typing.Optional[TTSInterface]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry.refcount += 1
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.tts
+
+    def acquire(self, config: BaseTTSConfig, **setup_kwargs) -> TTSInterface:
+        """
+        获取已加载并预热的TTS实例，不在池中时加载，用完后需调用 release
+
+        Args:
+            config: TTS配置
+            **setup_kwargs: 传给 TTSInterface.setup 的参数，参数不同的实例分别常驻
+
+        Returns:
+            TTSInterface: TTS实例
+        """
+        key = self.make_key(config, setup_kwargs)
+        tts = self._acquire_resident(key)
+        if tts is not None:
+            return tts
+
+        with self._load_lock:
+            # 等待加载锁期间可能已被其他会话加载
+            tts = self._acquire_resident(key)
+            if tts is not None:
+                return tts
+
+            components = self._estimate_components(config)
+            with self._lock:
+                evicted = self._evict(reserve=components)
+            self._release_entries(evicted)
+
+            logger.info(f"TTS常驻池加载音色: {config.character_name}")
+            tts = self.factory(config)
+            tts.setup(**setup_kwargs)
+            tts.warmup()
+
+            with self._lock:
+                self._entries[key] = _ResidentEntry(tts, config, components, refcount=1)
+                self.loads += 1
+                memory_bytes = self._memory_bytes()
+            if memory_bytes > self.max_memory_bytes:
+                logger.warning(
+                    f"TTS常驻池超出内存预算: {memory_bytes / (1 << 20):.0f}MB > "
+                    f"{self.max_memory_bytes / (1 << 20):.0f}MB（所有音色都在使用中）"
+                )
+            return tts
+
+    def _find_key(self, tts: TTSInterface) -> typing.Optional[tuple]:
+        for key, entry in self._entries.items():
+            if entry.tts is tts:
+                return key
+        return None
+
+    def release(self, tts: TTSInterface) -> None:
+        """
+        归还 acquire 获取的实例
+
+        还有其他实例在使用时（如热切换到新音色），归还的实例继续常驻，直到因超出预算被淘汰；
+        没有任何实例在使用时卸载所有音色
+        """
+        with self._lock:
+            key = self._find_key(tts)
+            if key is not None:
+                entry = self._entries[key]
+                entry.refcount = max(0, entry.refcount - 1)
+            if all(entry.refcount == 0 for entry in self._entries.values()):
+                evicted = list(self._entries.values())
+                self._entries.clear()
+                self.evictions += len(evicted)
+            else:
+                evicted = self._evict()
+        self._release_entries(evicted)
+
+    def switch_config(self, tts: TTSInterface, config: BaseTTSConfig) -> bool:
+        """
+        在不重新加载模型的情况下切换实例的配置（见 TTSInterface.switch_config），
+        只有实例仅被一个使用者持有、且新音色没有单独常驻时可行
+
+        Returns:
+            bool: 是否切换成功
+        """
+        with self._lock:
+            key = self._find_key(tts)
+            if key is None or self._entries[key].refcount != 1:
+                return False
+            new_key = (config.tts_type.value, config.character_name, key[2])
+            if new_key in self._entries:
+                return False
+            entry = self._entries[key]
+            if not entry.tts.switch_config(config):
+                return False
+            del self._entries[key]
+            entry.config = config
+            self._entries[new_key] = entry
+            return True
+
+    def clear(self) -> None:
+        """卸载所有空闲音色"""
+        with self._lock:
+            evicted = [entry for entry in self._entries.values() if entry.refcount == 0]
+            self._entries = OrderedDict(
+                (key, entry) for key, entry in self._entries.items() if entry.refcount > 0
+            )
+        self._release_entries(evicted)
+
+    def get_statistics(self) -> dict:
+        with self._lock:
+            return {
+                'max_memory_bytes': self.max_memory_bytes,
+                'memory_bytes': self._memory_bytes(),
+                'hits': self.hits,
+                'loads': self.loads,
+                'evictions': self.evictions,
+                'voices': [
+                    {
+                        'tts_type': entry.config.tts_type.value,
+                        'character_name': entry.config.character_name,
+                        'refcount': entry.refcount,
+                    }
+                    for entry in self._entries.values()
+                ],
+            }
+
+
+class ResidentTTS(TTSInterface):
+    """
+    常驻池中TTS实例的句柄
+
+    setup 时从常驻池获取（必要时加载并预热）实例，release 时归还，实例本身由常驻池管理。
+    实例可能被多个会话共享，只有独占时才支持 switch_config，否则切换音色时应获取新的句柄
+    """
+
+    def __init__(self, config: BaseTTSConfig, pool: TTSResidencyPool):
+        super().__init__(config)
+        self.pool = pool
+        self.tts: typing.Optional[TTSInterface] = None
+
+    def setup(self, **kwargs) -> None:
+        if self.tts is None:
+            self.tts = self.pool.acquire(self.config, **kwargs)
+
+    def warmup(self, warmup_steps: int = 1) -> None:
+        # 常驻池加载时已预热
+        pass
+
+    @property
+    def is_ready(self) -> bool:
+        return self.tts is not None
+
+    @is_ready.setter
+    def is_ready(self, value: bool):
+        pass
+
+    def synthesize(self, text: str, **kwargs) -> Tuple[np.ndarray, int]:
+        return self.tts.synthesize(text, **kwargs)
+
+    def synthesize_stream(self, text: str, **kwargs) -> Iterator[Tuple[np.ndarray, int]]:
+        return self.tts.synthesize_stream(text, **kwargs)
+
+    def prepare_batch(self, texts: typing.List[str]) -> None:
+        self.tts.prepare_batch(texts)
+
+    def switch_config(self, config: BaseTTSConfig) -> bool:
+        if self.tts is None or not self.pool.switch_config(self.tts, config):
+            return False
+        self.config = config
+        return True
+
+    def release(self) -> None:
+        if self.tts is not None:
+            self.pool.release(self.tts)
+            self.tts = None
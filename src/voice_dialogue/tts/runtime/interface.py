@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Tuple
+from typing import Iterator, List, Tuple
 
 import numpy as np
 
@@ -47,6 +47,48 @@ class TTSInterface(ABC):
         """
         pass
 
+    def synthesize_stream(self, text: str, **kwargs) -> Iterator[Tuple[np.ndarray, int]]:
+        """
+        将文本转换为语音，按片段逐个返回，首个片段合成后即可开始播放
+
+        默认实现将整句合成结果作为单个片段返回，支持分段合成的引擎应覆盖此方法
+
+        Args:
+            text: 要转换的文本
+            **kwargs: 额外的合成参数
+
+        Yields:
+            Tuple[np.ndarray, int]: (音频片段, 采样率)
+        """
+        yield self.synthesize(text, **kwargs)
+
+    def prepare_batch(self, texts: List[str]) -> None:
+        """
+        预处理即将合成的多个句子（如提前转换音素），默认不做处理
+
+        Args:
+            texts: 排队中的句子
+        """
+        pass
+
+    def switch_config(self, config: BaseTTSConfig) -> bool:
+        """
+        在不重新加载模型的情况下切换到另一个配置（如同一模型的另一个音色）
+
+        默认不支持，返回 False 时调用方需要重新创建TTS实例
+
+        Args:
+            config: 新的TTS配置
+
+        Returns:
+            bool: 是否切换成功
+        """
+        return False
+
+    def release(self) -> None:
+        """释放TTS引擎占用的资源，默认不做处理"""
+        pass
+
     @property
     def is_ready(self) -> bool:
         """
@@ -1,41 +1,92 @@
-from typing import Tuple, Optional
+import re
+from typing import Iterator, List, Tuple, Optional
 
 import numpy as np
 from kokoro_onnx import Kokoro
 
 from voice_dialogue.tts.configs.kokoro import KokoroTTSConfig
+from voice_dialogue.tts.g2p_cache import CachedG2P, get_shared_g2p
+from voice_dialogue.tts.kokoro_pool import kokoro_session_pool
 from voice_dialogue.tts.manager import tts_tables
 from voice_dialogue.tts.runtime.interface import TTSInterface
 from voice_dialogue.utils.logger import logger
 
+# 音素串中可以切分的位置（保留标点）
+PHONEME_CLAUSE_PATTERN = re.compile(r'(?<=[.,!?;:，。！？；：…—])\s*')
+
+
+def split_phoneme_chunks(phonemes: str, min_chunk_chars: int = 16) -> List[str]:
+    """
+    在标点处将音素串切分为分句片段，过短的片段与下一个合并，避免韵律断裂和推理开销
+
+    Args:
+        phonemes: 音素串
+        min_chunk_chars: 片段最少音素字符数
+
+    Returns:
+        List[str]: 音素片段
+    """
+    chunks = []
+    current = ''
+    for part in PHONEME_CLAUSE_PATTERN.split(phonemes):
+        if not part.strip():
+            continue
+        current = f"{current} {part}".strip() if current else part.strip()
+        if len(current) >= min_chunk_chars:
+            chunks.append(current)
+            current = ''
+    if current:
+        if chunks and len(current) < min_chunk_chars:
+            chunks[-1] = f"{chunks[-1]} {current}"
+        else:
+            chunks.append(current)
+    return chunks
+
 
 @tts_tables.register("tts_classes", "kokoro")
 class KokoroTTS(TTSInterface):
+    """
+    Kokoro TTS
+
+    使用同一模型文件的音色共享一个 Kokoro 实例（见 KokoroSessionPool），
+    音色作为合成参数传入，切换音色只需替换配置
+    """
+
     def __init__(self, config: KokoroTTSConfig):
         super().__init__(config)
         self.tts_model: Optional[Kokoro] = None
-        self.espeak_ng = None
+        self.espeak_ng: Optional[CachedG2P] = None
+        self._pool_key: Optional[tuple] = None
+
+    @staticmethod
+    def _model_files_key(config: KokoroTTSConfig) -> tuple:
+        vocab_config_path = config.vocab_config_path if config.model_files.vocab_config else None
+        return config.model_path, config.voices_path, vocab_config_path
 
     def setup(self, **kwargs) -> None:
+        model_path, voices_path, vocab_config_path = self._model_files_key(self.config)
+        self._pool_key, self.tts_model = kokoro_session_pool.acquire(model_path, voices_path, vocab_config_path)
+
         if self.config.is_chinese_voice:
-            self.tts_model = Kokoro(
-                model_path=self.config.model_path,
-                voices_path=self.config.voices_path,
-                vocab_config=self.config.vocab_config_path,
-            )
-            from misaki import zh
-            self.espeak_ng = zh.ZHG2P(version="1.1")
+            def create_g2p():
+                from misaki import zh
+                return zh.ZHG2P(version="1.1")
+
+            # 同一语言的音色共享 G2P 及其音素缓存
+            self.espeak_ng = get_shared_g2p('zh', create_g2p)
         else:
-            self.tts_model = Kokoro(
-                model_path=self.config.model_path,
-                voices_path=self.config.voices_path
-            )
+            def create_g2p():
+                from misaki import en, espeak
+                fallback = espeak.EspeakFallback(british=False)
+                return en.G2P(trf=False, british=False, fallback=fallback)
 
-            from misaki import en, espeak
-            fallback = espeak.EspeakFallback(british=False)
-            self.espeak_ng = en.G2P(trf=False, british=False, fallback=fallback)
+            self.espeak_ng = get_shared_g2p('en', create_g2p)
 
     def warmup(self, warmup_steps: int = 1) -> None:
+        if kokoro_session_pool.mark_warmed_up(self._pool_key):
+            logger.info('[INFO:] Kokoro TTS session already warmed up, skip.')
+            return
+
         logger.info('[INFO:] Warming up Kokoro TTS engine...')
         warmup_texts = ['Warming up TTS engine.', '预热文字转音频引擎。']
         for _ in range(warmup_steps):
@@ -43,7 +94,43 @@ class KokoroTTS(TTSInterface):
                 self.synthesize(warmup_text)
         logger.info('[INFO:] Warm up Kokoro TTS engine finished.')
 
+    def switch_config(self, config: KokoroTTSConfig) -> bool:
+        """同一模型文件的音色之间切换只替换配置，不重新加载模型"""
+        if not isinstance(config, KokoroTTSConfig) or self.tts_model is None:
+            return False
+        if config.is_chinese_voice != self.config.is_chinese_voice:
+            return False
+        if self._model_files_key(config) != self._model_files_key(self.config):
+            return False
+        self.config = config
+        return True
+
+    def release(self) -> None:
+        if self._pool_key is not None:
+            kokoro_session_pool.release(self._pool_key)
+        self._pool_key = None
+        self.tts_model = None
+
+    def _inference_parameters(self, **kwargs) -> dict:
+        """配置中的推理参数，允许按请求覆盖音色和语速"""
+        inference_parameters = self.config.inference_parameters.model_dump()
+        for name in ('voice', 'speed'):
+            if kwargs.get(name) is not None:
+                inference_parameters[name] = kwargs[name]
+        return inference_parameters
+
     def synthesize(self, text: str, **kwargs) -> Tuple[np.ndarray, int]:
         phonemes, _ = self.espeak_ng(text)
-        samples, sample_rate = self.tts_model.create(phonemes, **self.config.inference_parameters.model_dump())
+        samples, sample_rate = self.tts_model.create(phonemes, **self._inference_parameters(**kwargs))
         return samples, sample_rate
+
+    def prepare_batch(self, texts: List[str]) -> None:
+        """后台为排队中的句子提前注音"""
+        self.espeak_ng.prefetch(texts)
+
+    def synthesize_stream(self, text: str, **kwargs) -> Iterator[Tuple[np.ndarray, int]]:
+        """按分句音素片段逐个合成"""
+        phonemes, _ = self.espeak_ng(text)
+        inference_parameters = self._inference_parameters(**kwargs)
+        for chunk in split_phoneme_chunks(phonemes):
+            yield self.tts_model.create(chunk, **inference_parameters)
@@ -1,14 +1,22 @@
+import gc
 import re
 import sys
 import typing
-from typing import Tuple
+from typing import Iterator, Tuple
 
 import numpy as np
+import torch
 
 from voice_dialogue.config.paths import load_third_party
+from voice_dialogue.config.tts_config import get_moyoyo_bert_cache_params
+from voice_dialogue.tts.bert_feature_cache import BertFeatureCache, get_shared_bert_feature_cache
 from voice_dialogue.tts.manager import tts_tables
 from voice_dialogue.tts.models.moyoyo import MoYoYoTTSConfig
+from voice_dialogue.tts.prompt_features import PromptFeatureCache
 from voice_dialogue.tts.runtime.interface import TTSInterface
+from voice_dialogue.tts.safetensors_weights import prefer_safetensors
+from voice_dialogue.tts.shared_models import shared_model_registry
+from voice_dialogue.utils.hardware import get_thread_config
 from voice_dialogue.utils.logger import logger
 
 load_third_party()
@@ -23,6 +31,121 @@ if "utils" not in sys.modules:
 
     sys.modules['utils'] = GPTSoVITSFixedUtilsModule
 
+# 分句切分位置（保留标点）
+CLAUSE_PATTERN = re.compile(r'(?<=[，。！？；：,.!?;:…])')
+
+
+def split_text_clauses(text: str, min_clause_chars: int = 6) -> typing.List[str]:
+    """
+    在标点处将句子切分为分句，过短的分句与下一个合并
+
+    Args:
+        text: 句子
+        min_clause_chars: 分句最少字符数
+
+    Returns:
+        List[str]: 分句
+    """
+    clauses = []
+    current = ''
+    for part in CLAUSE_PATTERN.split(text):
+        current += part
+        if len(current.strip()) >= min_clause_chars:
+            clauses.append(current)
+            current = ''
+    if current.strip():
+        if clauses and len(current.strip()) < min_clause_chars:
+            clauses[-1] += current
+        else:
+            clauses.append(current)
+    return clauses
+
+
+class SharedBaseTTSModule(TTSModule):
+    """
+    从进程内共享注册表获取基础模型的 TTSModule
+
+    所有角色使用相同的 chinese-hubert-base 和 chinese-roberta-wwm-ext-large，
+    这两个模型每个进程只加载一次，各角色只单独加载自己的 GPT/SoVITS 权重。
+    参考音频提示特征可从 PromptFeatureCache 加载，跳过参考音频解码和 HuBERT/BERT 推理；
+    文本前端的分句 BERT 特征由 BertFeatureCache 缓存
+    """
+
+    def __init__(self, configs: TTS_Config):
+        self._shared_model_keys: typing.List[tuple] = []
+        self._prompt_feature_cache: typing.Optional[PromptFeatureCache] = None
+        self._prompt_feature_key: typing.Optional[str] = None
+        self.prompt_features_loaded = False
+        self.bert_feature_cache: typing.Optional[BertFeatureCache] = None
+        super().__init__(configs)
+
+        # 重复的分句直接复用 BERT 特征，跳过 RoBERTa 推理
+        bert_cache_params = get_moyoyo_bert_cache_params()
+        if bert_cache_params['enabled']:
+            cache = get_shared_bert_feature_cache(str(configs.bert_base_path), bert_cache_params['max_bytes'])
+            if cache.attach(self.text_preprocessor):
+                self.bert_feature_cache = cache
+
+    def _acquire_shared(self, name: str, base_path, loader: typing.Callable):
+        key = (str(base_path), name, str(self.configs.device), bool(self.configs.is_half))
+        model = shared_model_registry.acquire(key, loader)
+        self._shared_model_keys.append(key)
+        return model
+
+    def init_t2s_weights(self, weights_path: str):
+        # 存在 safetensors 版本时以内存映射方式加载
+        with prefer_safetensors(weights_path):
+            super().init_t2s_weights(weights_path)
+
+    def init_vits_weights(self, weights_path: str):
+        with prefer_safetensors(weights_path):
+            super().init_vits_weights(weights_path)
+
+    def init_cnhuhbert_weights(self, base_path: str):
+        def load():
+            super(SharedBaseTTSModule, self).init_cnhuhbert_weights(base_path)
+            return self.cnhuhbert_model
+
+        self.cnhuhbert_model = self._acquire_shared('cnhubert', base_path, load)
+
+    def init_bert_weights(self, base_path: str):
+        def load():
+            super(SharedBaseTTSModule, self).init_bert_weights(base_path)
+            return self.bert_tokenizer, self.bert_model
+
+        self.bert_tokenizer, self.bert_model = self._acquire_shared('bert', base_path, load)
+
+    def use_prompt_feature_cache(self, cache: PromptFeatureCache, key: str) -> None:
+        """设置参考音频提示特征缓存，需在 setup_inference_params 之前调用"""
+        self._prompt_feature_cache = cache
+        self._prompt_feature_key = key
+
+    def set_ref_audio(self, ref_audio_path: str):
+        if self._prompt_feature_cache is not None:
+            features = self._prompt_feature_cache.load(self._prompt_feature_key)
+            if features is not None:
+                # 预先填入提示文本特征后，推理时也不再重新计算 BERT 特征
+                self.prompt_cache.update(features)
+                self.prompt_cache['ref_audio_path'] = ref_audio_path
+                self.prompt_features_loaded = True
+                return
+        super().set_ref_audio(ref_audio_path)
+
+    def save_prompt_features(self) -> bool:
+        """保存当前的提示特征，已从缓存加载时不重复保存"""
+        if self._prompt_feature_cache is None or self.prompt_features_loaded:
+            return False
+        return self._prompt_feature_cache.save(self._prompt_feature_key, self.prompt_cache)
+
+    def release_shared_models(self) -> None:
+        """释放对共享基础模型的引用"""
+        for key in self._shared_model_keys:
+            shared_model_registry.release(key)
+        self._shared_model_keys.clear()
+        self.cnhuhbert_model = None
+        self.bert_model = None
+        self.bert_tokenizer = None
+
 
 @tts_tables.register("tts_classes", "moyoyo")
 class MoYoYoTTS(TTSInterface):
@@ -30,16 +153,43 @@ class MoYoYoTTS(TTSInterface):
 
     def __init__(self, config: MoYoYoTTSConfig):
         super().__init__(config)
-        self.tts_module: typing.Optional[TTSModule] = None
+        self.tts_module: typing.Optional[SharedBaseTTSModule] = None
 
     def setup(self, **kwargs) -> None:
         """设置TTS模块"""
-        tts_config = TTS_Config(self.config.get_runtime_config())
-        self.tts_module = TTSModule(tts_config)
+        # 限制 PyTorch 线程数，避免与 LLM 解码抢占 CPU
+        torch.set_num_threads(get_thread_config()['torch_threads'])
+
+        runtime_config = self.config.get_runtime_config()
+        tts_config = TTS_Config(runtime_config)
+        self.tts_module = SharedBaseTTSModule(tts_config)
+        inference_parameters = self.config.inference_parameters.model_dump()
+
+        # 参考音频的语义 token、频谱和提示文本 BERT 特征缓存在模型目录中，之后启动直接加载
+        model_config = runtime_config['default_v2']
+        self.tts_module.use_prompt_feature_cache(
+            PromptFeatureCache(self.config.prompt_feature_cache_path),
+            PromptFeatureCache.make_key(
+                self.config.reference_audio_path,
+                inference_parameters['prompt_text'],
+                inference_parameters['prompt_lang'],
+                [
+                    model_config['t2s_weights_path'], model_config['vits_weights_path'],
+                    model_config['cnhuhbert_base_path'], model_config['bert_base_path'],
+                ],
+                version=model_config['version'],
+                device=model_config['device'],
+                is_half=model_config['is_half'],
+            ),
+        )
+        # 流式合成时使用片段模式，每个分句片段推理完成后立即返回
+        if 'streaming' in kwargs:
+            inference_parameters['return_fragment'] = bool(kwargs['streaming'])
+
         self.tts_module.setup_inference_params(
             ref_audio=self.config.reference_audio_path,
             parallel_infer=False,
-            **self.config.inference_parameters.model_dump()
+            **inference_parameters
         )
         self.is_ready = True
 
@@ -52,6 +202,22 @@ class MoYoYoTTS(TTSInterface):
                 self.tts_module.generate_audio(warmup_text, warmup=True)
         logger.info('[INFO:] Warm up MoYoYo TTS engine finished.')
 
+        # 预热推理后提示文本特征也已计算完成
+        if self.tts_module.save_prompt_features():
+            logger.info(f"已缓存参考音频提示特征: {self.config.character_name}")
+
+    def release(self) -> None:
+        """释放模型，热切换后旧引擎的显存/内存随之回收"""
+        self.is_ready = False
+        if self.tts_module is not None:
+            self.tts_module.release_shared_models()
+        self.tts_module = None
+        gc.collect()
+        if torch.backends.mps.is_available():
+            torch.mps.empty_cache()
+        elif torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
     def synthesize(self, text: str, **kwargs) -> Tuple[np.ndarray, int]:
         """合成语音"""
         if not self.is_ready:
@@ -59,9 +225,29 @@ class MoYoYoTTS(TTSInterface):
 
         text = self._clean_text(text)
 
-        (sample_rate, audio_data), *_ = self.tts_module.generate_audio(text)
+        # 片段模式下 generate_audio 返回多个片段，拼接为整句音频
+        fragments = list(self.tts_module.generate_audio(text))
+        sample_rate = fragments[0][0]
+        audio_data = np.concatenate([audio for _, audio in fragments])
         return audio_data, sample_rate
 
+    def synthesize_stream(self, text: str, **kwargs) -> Iterator[Tuple[np.ndarray, int]]:
+        """
+        按分句片段逐个合成
+
+        标点在合成前会被去掉，模型自身无法按标点切分片段，因此先按分句切分文本，
+        每个分句在片段模式下推理，片段产出后立即返回
+        """
+        if not self.is_ready:
+            raise RuntimeError("TTS module is not ready. Please call setup() first.")
+
+        for clause in split_text_clauses(text):
+            clause = self._clean_text(clause)
+            if not clause.strip():
+                continue
+            for sample_rate, audio_data in self.tts_module.generate_audio(clause):
+                yield audio_data, sample_rate
+
     def _clean_text(self, text: str) -> str:
         """去除文本中的中英文标点符号。"""
         # 去除中英文标点符号，保留字母、数字、下划线、中文和空格
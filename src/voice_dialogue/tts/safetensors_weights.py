@@ -0,0 +1,153 @@
+import contextlib
+import json
+import threading
+import typing
+from pathlib import Path
+
+import torch
+from safetensors import safe_open
+from safetensors.torch import save_file
+
+from voice_dialogue.utils.logger import logger
+
+# transformers 在模型目录中存在 model.safetensors 时优先加载它
+TRANSFORMERS_PICKLE_WEIGHTS = 'pytorch_model.bin'
+TRANSFORMERS_SAFETENSORS_WEIGHTS = 'model.safetensors'
+
+_torch_load_lock = threading.Lock()
+
+
+def get_safetensors_variant(weights_path: Path) -> Path:
+    """
+    权重文件对应的 safetensors 文件路径
+
+    - 目录中的 pytorch_model.bin -> 同目录的 model.safetensors（transformers 自动识别）
+    - xxx.ckpt / xxx.pth -> xxx.ckpt.safetensors / xxx.pth.safetensors
+    """
+    weights_path = Path(weights_path)
+    if weights_path.name == TRANSFORMERS_PICKLE_WEIGHTS:
+        return weights_path.with_name(TRANSFORMERS_SAFETENSORS_WEIGHTS)
+    return weights_path.with_name(f"{weights_path.name}.safetensors")
+
+
+def get_unconvertible_marker(weights_path: Path) -> Path:
+    """记录权重文件无法转换的标记文件，内容为源文件的大小和修改时间"""
+    weights_path = Path(weights_path)
+    return weights_path.with_name(f"{weights_path.name}.safetensors.unconvertible")
+
+
+def _source_fingerprint(weights_path: Path) -> str:
+    stat = Path(weights_path).stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def is_marked_unconvertible(weights_path: Path) -> bool:
+    """权重文件此前已确认无法转换，且之后没有被替换"""
+    marker_path = get_unconvertible_marker(weights_path)
+    try:
+        return marker_path.read_text(encoding='utf-8').strip() == _source_fingerprint(weights_path)
+    except OSError:
+        return False
+
+
+def _mark_unconvertible(weights_path: Path) -> None:
+    try:
+        get_unconvertible_marker(weights_path).write_text(_source_fingerprint(weights_path), encoding='utf-8')
+    except OSError as e:
+        logger.warning(f"写入 safetensors 转换标记失败 {weights_path.name}: {e}")
+
+
+def _unshare_tensors(state_dict: dict) -> typing.Dict[str, torch.Tensor]:
+    """safetensors 不允许张量共享存储（如绑定的词嵌入），逐个复制为连续张量"""
+    return {name: tensor.detach().clone().contiguous() for name, tensor in state_dict.items()}
+
+
+def convert_to_safetensors(weights_path: Path) -> typing.Optional[Path]:
+    """
+    将 pickle 格式的权重转换为可内存映射的 safetensors 文件（已存在时跳过）
+
+    GPT/SoVITS 检查点为 {'weight': state_dict, 'config': ..., 'info': ...}，
+    state_dict 保存为张量，其余字段以 JSON 写入 safetensors 元数据。
+    格式无法转换的文件写入标记（见 get_unconvertible_marker），源文件不变时不再重复读取
+
+    Args:
+        weights_path: .ckpt / .pth / pytorch_model.bin 文件
+
+    Returns:
+        Optional[Path]: safetensors 文件路径，无法转换时返回 None
+    """
+    weights_path = Path(weights_path)
+    variant_path = get_safetensors_variant(weights_path)
+    if variant_path.exists():
+        return variant_path
+    if not weights_path.is_file() or is_marked_unconvertible(weights_path):
+        return None
+
+    checkpoint = torch.load(weights_path.as_posix(), map_location='cpu')
+    if weights_path.name == TRANSFORMERS_PICKLE_WEIGHTS:
+        state_dict = checkpoint
+        metadata = {'format': 'pt'}
+    elif isinstance(checkpoint, dict) and isinstance(checkpoint.get('weight'), dict):
+        state_dict = checkpoint['weight']
+        try:
+            metadata = {
+                name: json.dumps(value, ensure_ascii=False)
+                for name, value in checkpoint.items() if name != 'weight'
+            }
+        except TypeError as e:
+            logger.warning(f"检查点元数据无法序列化，跳过转换 {weights_path.name}: {e}")
+            _mark_unconvertible(weights_path)
+            return None
+    else:
+        logger.warning(f"未知的检查点格式，跳过转换: {weights_path.name}")
+        _mark_unconvertible(weights_path)
+        return None
+
+    tmp_path = variant_path.with_name(f"{variant_path.name}.tmp")
+    save_file(_unshare_tensors(state_dict), tmp_path.as_posix(), metadata=metadata)
+    tmp_path.replace(variant_path)
+    logger.info(f"已转换为 safetensors: {weights_path.name} -> {variant_path.name}")
+    return variant_path
+
+
+def load_safetensors_checkpoint(variant_path: Path) -> dict:
+    """
+    从 safetensors 文件还原 GPT/SoVITS 检查点字典，张量以内存映射方式读取
+
+    Returns:
+        dict: {'weight': state_dict, 其他元数据字段...}
+    """
+    with safe_open(Path(variant_path).as_posix(), framework='pt', device='cpu') as f:
+        metadata = f.metadata() or {}
+        state_dict = {name: f.get_tensor(name) for name in f.keys()}
+    checkpoint = {name: json.loads(value) for name, value in metadata.items()}
+    checkpoint['weight'] = state_dict
+    return checkpoint
+
+
+@contextlib.contextmanager
+def prefer_safetensors(weights_path: Path):
+    """
+    在上下文中，对 weights_path 的 torch.load 调用改为读取其 safetensors 文件（存在时）
+
+    第三方模块内部直接调用 torch.load 加载检查点，无法传入其他加载方式，只能在加载期间临时替换
+    """
+    weights_path = Path(weights_path)
+    variant_path = get_safetensors_variant(weights_path)
+    if not variant_path.exists():
+        yield
+        return
+
+    with _torch_load_lock:
+        original_load = torch.load
+
+        def load(f, *args, **kwargs):
+            if isinstance(f, (str, Path)) and Path(f).resolve() == weights_path.resolve():
+                return load_safetensors_checkpoint(variant_path)
+            return original_load(f, *args, **kwargs)
+
+        torch.load = load
+        try:
+            yield
+        finally:
+            torch.load = original_load
@@ -0,0 +1,64 @@
+import threading
+import typing
+from dataclasses import dataclass
+
+from voice_dialogue.utils.logger import logger
+
+
+@dataclass
+class _SharedModel:
+    model: typing.Any
+    refcount: int = 0
+
+
+class SharedModelRegistry:
+    """
+    进程内共享的基础模型注册表
+
+    多个音色共用的基础模型（如 MoYoYo 的 chinese-hubert-base、chinese-roberta-wwm-ext-large）
+    按 key（模型路径、设备、精度）只加载一次，各TTS实例引用同一份权重，按引用计数卸载。
+    """
+
+    def __init__(self):
+        self._models: typing.Dict[tuple, _SharedModel] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: tuple, loader: typing.Callable[[], typing.Any]) -> typing.Any:
+        """
+        获取共享模型，不存在时调用 loader 加载
+
+        Args:
+            key: 模型 key
+            loader: 加载模型的函数
+
+        Returns:
+            Any: 模型对象
+        """
+        with self._lock:
+            shared = self._models.get(key)
+            if shared is None:
+                logger.info(f"加载共享基础模型: {key[0]}")
+                shared = self._models[key] = _SharedModel(loader())
+            else:
+                logger.info(f"复用共享基础模型: {key[0]}")
+            shared.refcount += 1
+            return shared.model
+
+    def release(self, key: tuple) -> None:
+        """释放引用，引用计数归零时卸载模型"""
+        with self._lock:
+            shared = self._models.get(key)
+            if shared is None:
+                return
+            shared.refcount -= 1
+            if shared.refcount <= 0:
+                del self._models[key]
+                logger.info(f"卸载共享基础模型: {key[0]}")
+
+    def get_statistics(self) -> typing.List[dict]:
+        with self._lock:
+            return [{'model': str(key[0]), 'refcount': shared.refcount} for key, shared in self._models.items()]
+
+
+# 全局共享基础模型注册表
+shared_model_registry = SharedModelRegistry()
@@ -6,7 +6,9 @@ import platform
 from typing import Dict, Optional
 from dataclasses import dataclass
 
-__all__ = ('AppleSiliconInfo', 'get_apple_silicon_info')
+from voice_dialogue.utils.hardware import get_hardware_profile, get_thread_config, load_tuned_thread_config
+
+__all__ = ('AppleSiliconInfo', 'get_apple_silicon_info', 'get_optimal_llama_cpp_config')
 
 
 @dataclass
@@ -113,13 +115,17 @@ def get_apple_silicon_info() -> AppleSiliconInfo:
     is_apple_silicon = machine in ('arm64', 'arm64e') and platform.system() == 'Darwin'
     
     if not is_apple_silicon:
+        # 其他平台（Linux 服务器、容器等）使用通用硬件信息，核心数已考虑 CPU 亲和性和 cgroup 配额
+        profile = get_hardware_profile()
+        usable = profile.usable_cpus
+        performance_cores = max(1, min(profile.performance_cores, usable))
         return AppleSiliconInfo(
-            chip_name="非Apple Silicon",
-            total_cores=1,
-            performance_cores=1,
-            efficiency_cores=0,
+            chip_name=profile.cpu_model,
+            total_cores=usable,
+            performance_cores=performance_cores,
+            efficiency_cores=max(0, min(profile.efficiency_cores, usable - performance_cores)),
             gpu_cores=0,
-            memory_gb=8,
+            memory_gb=max(1, profile.memory_gb),
             is_apple_silicon=False
         )
     
@@ -196,36 +202,48 @@ def get_apple_silicon_info() -> AppleSiliconInfo:
 
 def get_optimal_llama_cpp_config() -> Dict[str, int]:
     """
-    根据Apple Silicon芯片信息获取最优的llama.cpp配置
-    
+    根据芯片信息获取最优的llama.cpp配置
+
+    本机有线程数基准测试结果时（见 voice_dialogue.llm.thread_tuning），使用测试得到的线程数
+
     Returns:
-        Dict[str, int]: 包含n_threads和n_ctx的配置
+        Dict[str, int]: 包含n_threads、n_threads_batch和n_ctx的配置
     """
     chip_info = get_apple_silicon_info()
-    
+
     if not chip_info.is_apple_silicon:
-        # 非Apple Silicon系统的默认配置
-        return {
-            'n_threads': 4,
-            'n_ctx': 2048
+        # 非Apple Silicon系统根据CPU拓扑、cgroup配额和内存限制配置
+        thread_config = get_thread_config()
+        config = {
+            'n_threads': thread_config['n_threads'],
+            'n_threads_batch': thread_config['n_threads_batch'],
+            'n_ctx': thread_config['n_ctx'],
         }
-    
-    # 对于Apple Silicon，只使用性能核心（P-cores）
-    # 避免混合使用效率核心，以获得最佳性能
-    n_threads = chip_info.performance_cores
-    
-    # 根据内存大小调整上下文窗口
-    if chip_info.memory_gb >= 32:
-        n_ctx = 4096
-    elif chip_info.memory_gb >= 16:
-        n_ctx = 2048
     else:
-        n_ctx = 1024
-    
-    return {
-        'n_threads': n_threads,
-        'n_ctx': n_ctx
-    }
+        # 对于Apple Silicon，只使用性能核心（P-cores）
+        # 避免混合使用效率核心，以获得最佳性能
+        n_threads = chip_info.performance_cores
+
+        # 根据内存大小调整上下文窗口
+        if chip_info.memory_gb >= 32:
+            n_ctx = 4096
+        elif chip_info.memory_gb >= 16:
+            n_ctx = 2048
+        else:
+            n_ctx = 1024
+
+        config = {
+            'n_threads': n_threads,
+            'n_threads_batch': n_threads,
+            'n_ctx': n_ctx
+        }
+
+    tuned_config = load_tuned_thread_config()
+    if tuned_config:
+        config['n_threads'] = tuned_config['n_threads']
+        config['n_threads_batch'] = tuned_config['n_threads_batch']
+
+    return config
 
 
 if __name__ == '__main__':
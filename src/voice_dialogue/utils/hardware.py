@@ -0,0 +1,409 @@
+"""跨平台硬件信息获取与线程配置工具
+
+Linux 下读取 /proc/cpuinfo、sysfs CPU 拓扑以及 cgroup 的 CPU 配额和内存限制，
+用于在服务器和容器中为 llama.cpp、ONNX Runtime 和 PyTorch 选择合适的线程数。
+"""
+
+import functools
+import hashlib
+import json
+import math
+import os
+import platform
+import re
+import typing
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from voice_dialogue.config.paths import CACHE_PATH
+
+__all__ = (
+    'HardwareProfile',
+    'get_hardware_profile',
+    'get_thread_config',
+    'get_machine_fingerprint',
+    'load_tuned_thread_config',
+    'save_tuned_thread_config',
+    'THREAD_TUNING_CACHE_FILE',
+)
+
+THREAD_TUNING_CACHE_FILE = CACHE_PATH / 'hardware' / 'thread_tuning.json'
+
+_SYS_CPU_PATH = Path('/sys/devices/system/cpu')
+_CGROUP_ROOT = Path('/sys/fs/cgroup')
+
+
+@dataclass
+class HardwareProfile:
+    """硬件信息"""
+    system: str  # 操作系统，如 "Linux"、"Darwin"
+    machine: str  # 架构，如 "x86_64"、"aarch64"
+    cpu_model: str  # CPU 型号
+    logical_cpus: int  # 当前进程可用的逻辑核心数（CPU 亲和性）
+    physical_cores: int  # 可用逻辑核心对应的物理核心数
+    performance_cores: int  # 性能核心数（非混合架构时等于物理核心数）
+    efficiency_cores: int  # 效率核心数
+    cpu_quota: Optional[float]  # cgroup CPU 配额（核心数），无限制时为 None
+    memory_total_bytes: int  # 物理内存
+    memory_limit_bytes: Optional[int]  # cgroup 内存限制，无限制时为 None
+    numa_nodes: int = 1
+    cpu_flags: List[str] = field(default_factory=list)  # 与推理相关的指令集，如 avx2、avx512f、neon
+
+    @property
+    def usable_cpus(self) -> int:
+        """考虑 CPU 配额后实际可以并行使用的核心数"""
+        if self.cpu_quota is None:
+            return self.logical_cpus
+        return max(1, min(self.logical_cpus, int(math.floor(self.cpu_quota))))
+
+    @property
+    def memory_bytes(self) -> int:
+        """考虑 cgroup 限制后实际可用的内存"""
+        if self.memory_limit_bytes is None:
+            return self.memory_total_bytes
+        return min(self.memory_total_bytes, self.memory_limit_bytes)
+
+    @property
+    def memory_gb(self) -> int:
+        return self.memory_bytes // (1 << 30)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data['usable_cpus'] = self.usable_cpus
+        data['memory_gb'] = self.memory_gb
+        return data
+
+
+def _read_text(path: Path) -> Optional[str]:
+    try:
+        return path.read_text(encoding='utf-8', errors='ignore').strip()
+    except OSError:
+        return None
+
+
+def _parse_cpu_list(text: Optional[str]) -> Set[int]:
+    """解析 sysfs 中的 CPU 列表格式，如 "0-3,8-11" """
+    cpus = set()
+    if not text:
+        return cpus
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-', 1)
+            cpus.update(range(int(start), int(end) + 1))
+        else:
+            cpus.add(int(part))
+    return cpus
+
+
+def _get_affinity_cpus() -> Set[int]:
+    try:
+        return set(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return set(range(os.cpu_count() or 1))
+
+
+def _parse_proc_cpuinfo() -> Dict[int, Dict[str, str]]:
+    """按 processor 编号解析 /proc/cpuinfo"""
+    text = _read_text(Path('/proc/cpuinfo'))
+    processors = {}
+    if not text:
+        return processors
+    for block in re.split(r'\n\s*\n', text):
+        fields = {}
+        for line in block.splitlines():
+            if ':' in line:
+                key, value = line.split(':', 1)
+                fields[key.strip()] = value.strip()
+        if 'processor' in fields and fields['processor'].isdigit():
+            processors[int(fields['processor'])] = fields
+    return processors
+
+
+def _get_linux_core_ids(cpus: Set[int], cpuinfo: Dict[int, Dict[str, str]]) -> Dict[int, tuple]:
+    """每个逻辑核心对应的 (封装ID, 物理核心ID)，优先读取 sysfs 拓扑"""
+    core_ids = {}
+    for cpu in cpus:
+        topology = _SYS_CPU_PATH / f'cpu{cpu}' / 'topology'
+        package_id = _read_text(topology / 'physical_package_id')
+        core_id = _read_text(topology / 'core_id')
+        if package_id is not None and core_id is not None:
+            core_ids[cpu] = (package_id, core_id)
+            continue
+        fields = cpuinfo.get(cpu, {})
+        if 'core id' in fields:
+            core_ids[cpu] = (fields.get('physical id', '0'), fields['core id'])
+        else:
+            # 没有拓扑信息时（部分虚拟机和 ARM 平台）视为每个逻辑核心都是物理核心
+            core_ids[cpu] = ('0', str(cpu))
+    return core_ids
+
+
+def _get_linux_performance_cpus(cpus: Set[int]) -> Set[int]:
+    """
+    混合架构中的性能核心
+
+    - Intel 混合架构：/sys/devices/cpu_core/cpus 为性能核心，/sys/devices/cpu_atom/cpus 为效率核心
+    - ARM big.LITTLE：cpu_capacity 最大的核心为性能核心
+
+    非混合架构返回全部核心
+    """
+    core_cpus = _parse_cpu_list(_read_text(Path('/sys/devices/cpu_core/cpus')))
+    atom_cpus = _parse_cpu_list(_read_text(Path('/sys/devices/cpu_atom/cpus')))
+    if core_cpus and atom_cpus and cpus & core_cpus:
+        return cpus & core_cpus
+
+    capacities = {}
+    for cpu in cpus:
+        capacity = _read_text(_SYS_CPU_PATH / f'cpu{cpu}' / 'cpu_capacity')
+        if capacity and capacity.isdigit():
+            capacities[cpu] = int(capacity)
+    if capacities and len(set(capacities.values())) > 1:
+        max_capacity = max(capacities.values())
+        return {cpu for cpu, capacity in capacities.items() if capacity == max_capacity}
+
+    return set(cpus)
+
+
+def _get_own_cgroup_paths() -> List[Path]:
+    """当前进程所在的 cgroup 目录（v2 统一层级以及 v1 各控制器），最后回退到 cgroup 根目录"""
+    paths = []
+    text = _read_text(Path('/proc/self/cgroup'))
+    if text:
+        for line in text.splitlines():
+            parts = line.split(':', 2)
+            if len(parts) != 3:
+                continue
+            _, controllers, cgroup_path = parts
+            relative = cgroup_path.lstrip('/')
+            if not controllers:
+                paths.append(_CGROUP_ROOT / relative)
+            else:
+                for controller in controllers.split(','):
+                    paths.append(_CGROUP_ROOT / controller / relative)
+                    paths.append(_CGROUP_ROOT / controllers / relative)
+    paths.append(_CGROUP_ROOT)
+    return paths
+
+
+def _get_cgroup_cpu_quota() -> Optional[float]:
+    """cgroup CPU 配额（v2 cpu.max 或 v1 cpu.cfs_quota_us / cpu.cfs_period_us）"""
+    for cgroup_path in _get_own_cgroup_paths():
+        cpu_max = _read_text(cgroup_path / 'cpu.max')
+        if cpu_max:
+            quota, _, period = cpu_max.partition(' ')
+            if quota == 'max':
+                return None
+            try:
+                return int(quota) / int(period or 100000)
+            except ValueError:
+                return None
+
+        quota = _read_text(cgroup_path / 'cpu.cfs_quota_us')
+        period = _read_text(cgroup_path / 'cpu.cfs_period_us')
+        if quota and period:
+            try:
+                quota, period = int(quota), int(period)
+            except ValueError:
+                return None
+            return quota / period if quota > 0 and period > 0 else None
+    return None
+
+
+def _get_cgroup_memory_limit() -> Optional[int]:
+    """cgroup 内存限制（v2 memory.max 或 v1 memory.limit_in_bytes）"""
+    for cgroup_path in _get_own_cgroup_paths():
+        for name in ('memory.max', 'memory.limit_in_bytes'):
+            value = _read_text(cgroup_path / name)
+            if not value:
+                continue
+            if value == 'max':
+                return None
+            try:
+                limit = int(value)
+            except ValueError:
+                return None
+            # v1 无限制时为一个接近 2^63 的值
+            return limit if limit < (1 << 60) else None
+    return None
+
+
+def _get_linux_memory_total() -> int:
+    text = _read_text(Path('/proc/meminfo')) or ''
+    match = re.search(r'^MemTotal:\s+(\d+)\s*kB', text, re.MULTILINE)
+    if match:
+        return int(match.group(1)) * 1024
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (ValueError, OSError, AttributeError):
+        return 8 << 30
+
+
+def _get_linux_numa_nodes() -> int:
+    nodes = _parse_cpu_list(_read_text(Path('/sys/devices/system/node/online')))
+    return max(1, len(nodes))
+
+
+_INFERENCE_CPU_FLAGS = ('avx', 'avx2', 'fma', 'f16c', 'avx512f', 'avx512_vnni', 'avx_vnni', 'amx_int8', 'neon',
+                        'asimd', 'asimddp', 'sve')
+
+
+def _get_linux_profile() -> HardwareProfile:
+    cpuinfo = _parse_proc_cpuinfo()
+    cpus = _get_affinity_cpus()
+    core_ids = _get_linux_core_ids(cpus, cpuinfo)
+    performance_cpus = _get_linux_performance_cpus(cpus)
+
+    physical_cores = len(set(core_ids.values())) or len(cpus)
+    performance_cores = len({core_ids[cpu] for cpu in performance_cpus if cpu in core_ids}) or physical_cores
+
+    first = next(iter(cpuinfo.values()), {})
+    cpu_model = first.get('model name') or first.get('Hardware') or first.get('CPU part') or platform.processor()
+    flags = set((first.get('flags') or first.get('Features') or '').split())
+
+    return HardwareProfile(
+        system='Linux',
+        machine=platform.machine(),
+        cpu_model=cpu_model or 'unknown',
+        logical_cpus=len(cpus),
+        physical_cores=physical_cores,
+        performance_cores=performance_cores,
+        efficiency_cores=max(0, physical_cores - performance_cores),
+        cpu_quota=_get_cgroup_cpu_quota(),
+        memory_total_bytes=_get_linux_memory_total(),
+        memory_limit_bytes=_get_cgroup_memory_limit(),
+        numa_nodes=_get_linux_numa_nodes(),
+        cpu_flags=sorted(flag for flag in _INFERENCE_CPU_FLAGS if flag in flags),
+    )
+
+
+def _get_generic_profile() -> HardwareProfile:
+    """其他平台只能获取逻辑核心数，物理核心数按超线程估算"""
+    logical_cpus = len(_get_affinity_cpus())
+    physical_cores = max(1, logical_cpus // 2) if platform.machine().lower() in ('x86_64', 'amd64') else logical_cpus
+    try:
+        memory_total = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (ValueError, OSError, AttributeError):
+        memory_total = 8 << 30
+
+    return HardwareProfile(
+        system=platform.system(),
+        machine=platform.machine(),
+        cpu_model=platform.processor() or 'unknown',
+        logical_cpus=logical_cpus,
+        physical_cores=physical_cores,
+        performance_cores=physical_cores,
+        efficiency_cores=0,
+        cpu_quota=None,
+        memory_total_bytes=memory_total,
+        memory_limit_bytes=None,
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def get_hardware_profile() -> HardwareProfile:
+    """
+    获取当前进程可用的硬件信息（结果缓存）
+
+    Returns:
+        HardwareProfile: 硬件信息
+    """
+    if platform.system() == 'Linux':
+        return _get_linux_profile()
+    return _get_generic_profile()
+
+
+def get_thread_config(profile: Optional[HardwareProfile] = None) -> Dict[str, int]:
+    """
+    根据硬件信息选择各推理引擎的线程数
+
+    - n_threads: llama.cpp 逐 token 解码受内存带宽限制，超线程和效率核心只会拖慢同步，只使用性能核心的物理核心
+    - n_threads_batch: prompt 计算受算力限制，使用全部可用的物理核心
+    - onnx_intra_op_threads / torch_threads: TTS 与 LLM 解码同时运行，限制在少量核心避免互相抢占
+
+    所有线程数都不超过 cgroup CPU 配额
+
+    Args:
+        profile: 硬件信息，为 None 时自动获取
+
+    Returns:
+        Dict[str, int]: 线程数和上下文窗口配置
+    """
+    profile = profile or get_hardware_profile()
+    usable = profile.usable_cpus
+
+    n_threads = max(1, min(profile.performance_cores, usable))
+    n_threads_batch = max(n_threads, min(profile.physical_cores, usable))
+    aux_threads = max(1, min(4, usable // 2))
+
+    if profile.memory_gb >= 32:
+        n_ctx = 4096
+    elif profile.memory_gb >= 16:
+        n_ctx = 2048
+    else:
+        n_ctx = 1024
+
+    return {
+        'n_threads': n_threads,
+        'n_threads_batch': n_threads_batch,
+        'n_ctx': n_ctx,
+        'onnx_intra_op_threads': aux_threads,
+        'torch_threads': aux_threads,
+    }
+
+
+# ---------------- 微基准测试结果缓存 ----------------
+
+def get_machine_fingerprint(profile: Optional[HardwareProfile] = None) -> str:
+    """
+    机器指纹，CPU 型号、可用核心、配额或内存限制变化时（例如容器规格调整）基准测试结果失效
+    """
+    profile = profile or get_hardware_profile()
+    key = {
+        'node': platform.node(),
+        'cpu_model': profile.cpu_model,
+        'logical_cpus': profile.logical_cpus,
+        'physical_cores': profile.physical_cores,
+        'performance_cores': profile.performance_cores,
+        'cpu_quota': profile.cpu_quota,
+        'memory_bytes': profile.memory_bytes,
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def _load_tuning_cache() -> dict:
+    try:
+        return json.loads(THREAD_TUNING_CACHE_FILE.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def load_tuned_thread_config() -> Optional[Dict[str, typing.Any]]:
+    """
+    读取本机缓存的线程数基准测试结果
+
+    Returns:
+        Optional[Dict[str, Any]]: 包含 n_threads 和 n_threads_batch 的结果，没有缓存时返回 None
+    """
+    return _load_tuning_cache().get(get_machine_fingerprint())
+
+
+def save_tuned_thread_config(config: Dict[str, typing.Any]) -> None:
+    """保存本机的线程数基准测试结果"""
+    cache = _load_tuning_cache()
+    cache[get_machine_fingerprint()] = config
+
+    THREAD_TUNING_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = THREAD_TUNING_CACHE_FILE.with_suffix('.tmp')
+    tmp_file.write_text(json.dumps(cache, indent=2, ensure_ascii=False), encoding='utf-8')
+    os.replace(tmp_file, THREAD_TUNING_CACHE_FILE)
+
+
+if __name__ == '__main__':
+    hardware_profile = get_hardware_profile()
+    print(f"硬件信息: {hardware_profile.to_dict()}")
+    print(f"推荐线程配置: {get_thread_config(hardware_profile)}")
+    print(f"基准测试结果: {load_tuned_thread_config()}")
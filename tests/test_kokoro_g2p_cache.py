@@ -0,0 +1,144 @@
+import importlib.util
+import sys
+import time
+import unittest
+from pathlib import Path
+
+HERE = Path(__file__).parent.parent
+lib_path = HERE / "src"
+if lib_path.exists() and lib_path.as_posix() not in sys.path:
+    sys.path.insert(0, lib_path.as_posix())
+
+from voice_dialogue.config.paths import TTS_MODELS_PATH
+from voice_dialogue.tts.g2p_cache import CachedG2P, split_phrases
+
+HAS_KOKORO = all(importlib.util.find_spec(name) is not None for name in ('misaki', 'kokoro_onnx'))
+
+KOKORO_MODELS_PATH = TTS_MODELS_PATH / 'kokoro'
+CHINESE_MODEL_FILES = ('kokoro-v1.1-zh.onnx', 'voices-v1.1-zh.bin', 'config.json')
+HAS_CHINESE_MODEL = all((KOKORO_MODELS_PATH / name).exists() for name in CHINESE_MODEL_FILES)
+
+# 模拟一段对话中合成的句子：确认语、问候语和回答中的短语反复出现
+DIALOGUE_SENTENCES = [
+    "好的，我明白了。",
+    "你好，很高兴见到你！",
+    "好的，我来帮你查一下。",
+    "今天天气晴朗，适合出去走走。",
+    "好的，我明白了，还有什么问题吗？",
+    "没问题，我来帮你查一下。",
+    "今天天气晴朗，气温二十五度。",
+    "你好，很高兴见到你！",
+]
+
+
+class TestCachedG2P(unittest.TestCase):
+    """短语级音素缓存单元测试"""
+
+    class CountingG2P:
+        """记录调用次数的 G2P，音素用大写文本代替"""
+
+        def __init__(self):
+            self.calls = []
+
+        def __call__(self, text):
+            self.calls.append(text)
+            return text.upper(), None
+
+    def test_split_phrases(self):
+        self.assertEqual(split_phrases("好的，我明白了。"), ["好的，", "我明白了。"])
+        self.assertEqual(split_phrases("Hello, world! OK"), ["Hello,", "world!", "OK"])
+        self.assertEqual(split_phrases("  "), [])
+
+    def test_phrase_reuse(self):
+        g2p = self.CountingG2P()
+        cached = CachedG2P(g2p)
+
+        self.assertEqual(cached("ok, thanks.")[0], "OK, THANKS.")
+        self.assertEqual(cached("ok, see you.")[0], "OK, SEE YOU.")
+        # "ok," 只注音一次
+        self.assertEqual(g2p.calls, ["ok,", "thanks.", "see you."])
+
+        stats = cached.get_statistics()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 3)
+
+    def test_lru_eviction(self):
+        g2p = self.CountingG2P()
+        cached = CachedG2P(g2p, max_entries=2)
+
+        cached("a.")
+        cached("b.")
+        cached("a.")
+        cached("c.")
+        self.assertEqual(cached.get_statistics()['entries'], 2)
+
+        # "b." 最久未使用，已被淘汰
+        cached("b.")
+        self.assertEqual(g2p.calls, ["a.", "b.", "c.", "b."])
+
+    def test_prefetch(self):
+        g2p = self.CountingG2P()
+        cached = CachedG2P(g2p)
+
+        cached.prefetch(["first, second.", "first, third."])
+        self.assertEqual(cached.phonemize_batch(["first, second.", "first, third."]),
+                         ["FIRST, SECOND.", "FIRST, THIRD."])
+        self.assertEqual(sorted(g2p.calls), ["first,", "second.", "third."])
+
+
+@unittest.skipUnless(HAS_KOKORO and HAS_CHINESE_MODEL, "未安装 misaki/kokoro-onnx 或缺少 Kokoro 中文模型")
+class TestKokoroG2PBenchmark(unittest.TestCase):
+    """区分 G2P 耗时与模型推理耗时的基准测试"""
+
+    @classmethod
+    def setUpClass(cls):
+        from kokoro_onnx import Kokoro
+        from misaki import zh
+
+        cls.g2p = zh.ZHG2P(version="1.1")
+        cls.model = Kokoro(
+            (KOKORO_MODELS_PATH / CHINESE_MODEL_FILES[0]).as_posix(),
+            (KOKORO_MODELS_PATH / CHINESE_MODEL_FILES[1]).as_posix(),
+            vocab_config=(KOKORO_MODELS_PATH / CHINESE_MODEL_FILES[2]).as_posix(),
+        )
+        # 预热
+        cls.model.create(cls.g2p("预热。")[0], voice='zf_001', is_phonemes=True)
+
+    def test_g2p_vs_model_time(self):
+        cached = CachedG2P(self.g2p)
+
+        rows = []
+        for sentence in DIALOGUE_SENTENCES:
+            start = time.perf_counter()
+            self.g2p(sentence)
+            raw_g2p = time.perf_counter() - start
+
+            start = time.perf_counter()
+            phonemes, _ = cached(sentence)
+            cached_g2p = time.perf_counter() - start
+
+            start = time.perf_counter()
+            self.model.create(phonemes, voice='zf_001', is_phonemes=True)
+            model_time = time.perf_counter() - start
+
+            rows.append((sentence, raw_g2p, cached_g2p, model_time))
+
+        print(f"\n{'句子':<24} {'G2P(无缓存)':>12} {'G2P(缓存)':>10} {'模型':>8}")
+        for sentence, raw_g2p, cached_g2p, model_time in rows:
+            print(f"{sentence:<24} {raw_g2p * 1000:>10.1f}ms {cached_g2p * 1000:>8.1f}ms {model_time * 1000:>6.1f}ms")
+
+        total_raw = sum(row[1] for row in rows)
+        total_cached = sum(row[2] for row in rows)
+        total_model = sum(row[3] for row in rows)
+        stats = cached.get_statistics()
+        print(f"合计: G2P(无缓存) {total_raw:.3f}s, G2P(缓存) {total_cached:.3f}s, 模型 {total_model:.3f}s")
+        print(f"短语命中率: {stats['hit_rate']:.1%} ({stats['hits']}/{stats['hits'] + stats['misses']})")
+
+        self.assertGreater(stats['hits'], 0)
+        # 缓存后的音素与整句直接注音一致；短语在标点后切分，只允许标点处的空格不同
+        for sentence in DIALOGUE_SENTENCES:
+            self.assertEqual(cached(sentence)[0].replace(' ', ''), self.g2p(sentence)[0].replace(' ', ''))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
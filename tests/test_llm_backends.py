@@ -0,0 +1,82 @@
+import gc
+import statistics
+import sys
+import time
+import unittest
+from pathlib import Path
+
+HERE = Path(__file__).parent.parent
+lib_path = HERE / "src"
+if lib_path.exists() and lib_path.as_posix() not in sys.path:
+    sys.path.insert(0, lib_path.as_posix())
+
+from voice_dialogue.config.llm_config import get_llm_model_params, BUILTIN_LLM_MODEL_PATH
+from voice_dialogue.config.llm_config import CHINESE_SYSTEM_PROMPT, ENGLISH_SYSTEM_PROMPT
+from voice_dialogue.llm.backends import CHAT_BACKENDS, StreamTiming, create_chat_backend
+
+
+@unittest.skipUnless(BUILTIN_LLM_MODEL_PATH.exists(), "内置LLM模型不存在")
+class TestLLMBackends(unittest.TestCase):
+    """
+    LLM后端性能对比测试
+
+    对比 native（直接调用 llama-cpp）与 langchain 后端的：
+    1. 启动耗时（包含依赖导入和模型加载）
+    2. 首token延迟 (TTFT)
+    3. 平均token间隔（每token开销）
+    """
+
+    questions = [
+        ('zh', CHINESE_SYSTEM_PROMPT + "\n/no_think", "最近人工智能技术发展很快，你觉得AI对我们日常生活带来了哪些改变？"),
+        ('zh', CHINESE_SYSTEM_PROMPT + "\n/no_think", "如果让你设计一个推广垃圾分类的社区活动，你会怎么做？"),
+        ('en', ENGLISH_SYSTEM_PROMPT + "\n/no_think", "What are some common stressors people face in modern society?"),
+        ('en', ENGLISH_SYSTEM_PROMPT + "\n/no_think", "What long-term benefits will humanity gain from space exploration?"),
+    ]
+
+    def _benchmark_backend(self, backend_name: str) -> dict:
+        model_params = get_llm_model_params()
+
+        load_start = time.perf_counter()
+        backend = create_chat_backend(backend_name, BUILTIN_LLM_MODEL_PATH, model_params)
+        load_time = time.perf_counter() - load_start
+
+        backend.warmup(self.questions[0][1])
+
+        ttfts, intervals = [], []
+        for _, system_prompt, question in self.questions:
+            timing = StreamTiming()
+            for _ in backend.stream(system_prompt, [], question):
+                timing.tick()
+            ttfts.append(timing.time_to_first_token)
+            intervals.append(timing.mean_token_interval)
+
+        del backend
+        gc.collect()
+
+        return {
+            'load_time': load_time,
+            'ttft': statistics.mean(ttfts),
+            'token_interval': statistics.mean(intervals),
+        }
+
+    def test_backend_latency(self):
+        results = {}
+        for backend_name in CHAT_BACKENDS:
+            results[backend_name] = self._benchmark_backend(backend_name)
+
+        print("\n" + "=" * 80)
+        print(f"  {'backend':<12}{'load(s)':>12}{'TTFT(ms)':>14}{'token interval(ms)':>22}")
+        print("-" * 80)
+        for backend_name, result in results.items():
+            print(
+                f"  {backend_name:<12}{result['load_time']:>12.2f}"
+                f"{result['ttft'] * 1000:>14.1f}{result['token_interval'] * 1000:>22.2f}"
+            )
+        print("=" * 80 + "\n")
+
+        for result in results.values():
+            self.assertGreater(result['ttft'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
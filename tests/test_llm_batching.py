@@ -0,0 +1,139 @@
+import importlib.util
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+HERE = Path(__file__).parent.parent
+lib_path = HERE / "src"
+if lib_path.exists() and lib_path.as_posix() not in sys.path:
+    sys.path.insert(0, lib_path.as_posix())
+
+from voice_dialogue.config.llm_config import (
+    get_llm_model_params, BUILTIN_LLM_MODEL_PATH, CHINESE_SYSTEM_PROMPT, ENGLISH_SYSTEM_PROMPT
+)
+
+HAS_LLAMA_CPP = importlib.util.find_spec('llama_cpp') is not None
+
+if HAS_LLAMA_CPP:
+    import numpy as np
+
+    from voice_dialogue.llm.backends import create_chat_backend
+    from voice_dialogue.llm.batching import BatchedChatBackend, sample_token
+
+QUESTIONS = [
+    (CHINESE_SYSTEM_PROMPT, "最近人工智能技术发展很快，你觉得AI对我们日常生活带来了哪些改变？"),
+    (CHINESE_SYSTEM_PROMPT, "如果让你设计一个推广垃圾分类的社区活动，你会怎么做？"),
+    (ENGLISH_SYSTEM_PROMPT, "What are some common stressors people face in modern society?"),
+    (ENGLISH_SYSTEM_PROMPT, "What long-term benefits will humanity gain from space exploration?"),
+]
+
+
+@unittest.skipUnless(HAS_LLAMA_CPP, "未安装 llama-cpp-python")
+class TestSampleToken(unittest.TestCase):
+    """批处理采样单元测试"""
+
+    def test_greedy(self):
+        logits = np.array([0.1, 3.0, 2.0, -1.0], dtype=np.float32)
+        self.assertEqual(sample_token(logits, set(), temperature=0.0), 1)
+
+    def test_top_k_limits_candidates(self):
+        logits = np.array([5.0, 4.9, 0.0, 0.0], dtype=np.float32)
+        rng = np.random.default_rng(0)
+        tokens = {sample_token(logits, set(), temperature=1.0, top_k=2, top_p=1.0, rng=rng) for _ in range(200)}
+        self.assertEqual(tokens, {0, 1})
+
+    def test_presence_penalty(self):
+        logits = np.array([2.0, 1.0], dtype=np.float32)
+        self.assertEqual(sample_token(logits, {0}, temperature=0.0, presence_penalty=1.5), 1)
+
+
+@unittest.skipUnless(HAS_LLAMA_CPP and BUILTIN_LLM_MODEL_PATH.exists(), "内置LLM模型不存在")
+class TestContinuousBatching(unittest.TestCase):
+    """
+    连续批处理性能测试
+
+    对比逐个处理与并发提交 4 个会话的：
+    1. 总生成速度 (tokens/s)
+    2. 各会话首token延迟
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        model_params = get_llm_model_params()
+        model_params['max_tokens'] = 128
+        cls.backend = create_chat_backend('native', BUILTIN_LLM_MODEL_PATH, model_params, enable_thinking=False)
+        cls.batched = BatchedChatBackend(cls.backend, max_sessions=len(QUESTIONS), n_ctx_per_session=2048)
+        cls.batched.warmup(CHINESE_SYSTEM_PROMPT)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.batched.scheduler.close()
+
+    def _run_question(self, backend, system_prompt, question, results):
+        start = time.perf_counter()
+        ttft = None
+        tokens = 0
+        for _ in backend.stream(system_prompt, [], question):
+            if ttft is None:
+                ttft = time.perf_counter() - start
+            tokens += 1
+        results.append((ttft or 0.0, tokens))
+
+    def test_aggregate_throughput(self):
+        sequential_results = []
+        start = time.perf_counter()
+        for system_prompt, question in QUESTIONS:
+            self._run_question(self.backend, system_prompt, question, sequential_results)
+        sequential_time = time.perf_counter() - start
+
+        batched_results = []
+        threads = [
+            threading.Thread(target=self._run_question, args=(self.batched, system_prompt, question, batched_results))
+            for system_prompt, question in QUESTIONS
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        batched_time = time.perf_counter() - start
+
+        sequential_tps = sum(tokens for _, tokens in sequential_results) / sequential_time
+        batched_tps = sum(tokens for _, tokens in batched_results) / batched_time
+
+        print("\n" + "=" * 60)
+        print(f"  {'mode':<12}{'tokens/s':>12}{'max TTFT(ms)':>16}")
+        print("-" * 60)
+        print(f"  {'sequential':<12}{sequential_tps:>12.1f}{max(t for t, _ in sequential_results) * 1000:>16.1f}")
+        print(f"  {'batched':<12}{batched_tps:>12.1f}{max(t for t, _ in batched_results) * 1000:>16.1f}")
+        print(f"  scheduler: {self.batched.scheduler.get_statistics()}")
+        print("=" * 60 + "\n")
+
+        self.assertEqual(len(batched_results), len(QUESTIONS))
+        self.assertGreater(batched_tps, 0)
+
+    def test_cancel(self):
+        stream = self.batched.stream(ENGLISH_SYSTEM_PROMPT, [], QUESTIONS[2][1])
+        next(iter(stream))
+        stream.close()
+        # 取消后流会结束，不再阻塞
+        remaining = list(stream)
+        self.assertLess(len(remaining), 128)
+
+    def test_backpressure(self):
+        stream = self.batched.stream(CHINESE_SYSTEM_PROMPT, [], QUESTIONS[1][1])
+        next(iter(stream))
+        # 暂停读取期间调度器停止解码该会话，积压的输出不超过上限
+        time.sleep(1.0)
+        self.assertLessEqual(stream.request.output_queue.qsize(), self.batched.scheduler.max_buffered_chunks)
+        generated = len(stream.request.generated_tokens)
+        time.sleep(0.5)
+        self.assertEqual(len(stream.request.generated_tokens), generated)
+        stream.close()
+        list(stream)
+
+
+if __name__ == '__main__':
+    unittest.main()
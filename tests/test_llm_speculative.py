@@ -0,0 +1,139 @@
+import gc
+import importlib.util
+import sys
+import time
+import unittest
+from pathlib import Path
+
+HERE = Path(__file__).parent.parent
+lib_path = HERE / "src"
+if lib_path.exists() and lib_path.as_posix() not in sys.path:
+    sys.path.insert(0, lib_path.as_posix())
+
+import numpy as np
+
+from voice_dialogue.config.llm_config import (
+    get_llm_model_params, BUILTIN_LLM_MODEL_PATH, DRAFT_LLM_MODEL_PATH,
+    CHINESE_SYSTEM_PROMPT, ENGLISH_SYSTEM_PROMPT
+)
+
+HAS_LLAMA_CPP = importlib.util.find_spec('llama_cpp') is not None
+
+if HAS_LLAMA_CPP:
+    from voice_dialogue.llm.backends import create_chat_backend
+    from voice_dialogue.llm.speculative import MeasuredDraftModel
+
+# 录制的多轮对话：后续问题会复述前一轮回答中的内容
+RECORDED_DIALOGUES = [
+    ('zh', [
+        "最近人工智能技术发展很快，你觉得AI对我们日常生活带来了哪些改变？",
+        "你刚才说的智能推荐，具体是怎么工作的？",
+        "那智能推荐会不会泄露我的隐私？",
+    ]),
+    ('en', [
+        "What are some common stressors people face in modern society?",
+        "You mentioned work pressure. How can people deal with work pressure?",
+        "Can you summarize your advice in one sentence?",
+    ]),
+]
+
+
+@unittest.skipUnless(HAS_LLAMA_CPP, "未安装 llama-cpp-python")
+class TestMeasuredDraftModel(unittest.TestCase):
+    """草稿接受率统计单元测试"""
+
+    class FixedDraft:
+        def __init__(self, drafts):
+            self.drafts = list(drafts)
+
+        def __call__(self, input_ids, **kwargs):
+            return np.array(self.drafts.pop(0), dtype=np.intc)
+
+    def test_acceptance_counting(self):
+        draft_model = MeasuredDraftModel(self.FixedDraft([[5, 6, 7], [9, 9], []]))
+
+        draft_model(np.array([1, 2, 3], dtype=np.intc))
+        # 主模型接受了 5、6，第三个 token 为 8
+        draft_model(np.array([1, 2, 3, 5, 6, 8], dtype=np.intc))
+        # 草稿完全未被接受
+        draft_model(np.array([1, 2, 3, 5, 6, 8, 4], dtype=np.intc))
+
+        stats = draft_model.stats.to_dict()
+        self.assertEqual(stats['proposed_tokens'], 5)
+        self.assertEqual(stats['accepted_tokens'], 2)
+        self.assertAlmostEqual(draft_model.stats.acceptance_rate, 0.4)
+
+
+@unittest.skipUnless(HAS_LLAMA_CPP and BUILTIN_LLM_MODEL_PATH.exists(), "内置LLM模型不存在")
+class TestSpeculativeDecoding(unittest.TestCase):
+    """
+    推测解码性能测试
+
+    在录制的多轮对话上对比关闭推测解码、prompt_lookup 与 draft_model 三种模式的：
+    1. 生成速度 (tokens/s)
+    2. 草稿接受率
+    """
+
+    system_prompts = {
+        'zh': CHINESE_SYSTEM_PROMPT + "\n/no_think",
+        'en': ENGLISH_SYSTEM_PROMPT + "\n/no_think",
+    }
+
+    def _benchmark_mode(self, mode):
+        model_params = get_llm_model_params(speculative_mode=mode or 'off')
+        # 贪心解码保证各模式输出一致，便于对比速度
+        model_params['temperature'] = 0.0
+        model_params['top_k'] = 1
+        backend = create_chat_backend('native', BUILTIN_LLM_MODEL_PATH, model_params)
+        llama = backend.llama
+
+        backend.warmup(self.system_prompts['zh'])
+        if backend.speculative_stats is not None:
+            backend.speculative_stats.reset()
+
+        total_tokens = 0
+        total_seconds = 0.0
+        for language, questions in RECORDED_DIALOGUES:
+            history = []
+            for question in questions:
+                start = time.perf_counter()
+                answer = ''.join(backend.stream(self.system_prompts[language], history, question))
+                total_seconds += time.perf_counter() - start
+                total_tokens += len(llama.tokenize(answer.encode('utf-8'), add_bos=False))
+                history.extend([
+                    {'role': 'user', 'content': question},
+                    {'role': 'assistant', 'content': answer},
+                ])
+
+        stats = backend.speculative_stats
+        result = {
+            'tokens_per_second': total_tokens / total_seconds if total_seconds else 0.0,
+            'acceptance_rate': stats.acceptance_rate if stats is not None else None,
+        }
+
+        del backend, llama
+        gc.collect()
+        return result
+
+    def test_tokens_per_second(self):
+        modes = [None, 'prompt_lookup']
+        if DRAFT_LLM_MODEL_PATH.exists():
+            modes.append('draft_model')
+
+        results = {mode or 'off': self._benchmark_mode(mode) for mode in modes}
+
+        print("\n" + "=" * 60)
+        print(f"  {'mode':<16}{'tokens/s':>14}{'acceptance':>16}")
+        print("-" * 60)
+        for mode, result in results.items():
+            acceptance = result['acceptance_rate']
+            acceptance_text = f"{acceptance:.1%}" if acceptance is not None else '-'
+            print(f"  {mode:<16}{result['tokens_per_second']:>14.1f}{acceptance_text:>16}")
+        print("=" * 60 + "\n")
+
+        for result in results.values():
+            self.assertGreater(result['tokens_per_second'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import importlib.util
+import sys
+import unittest
+from pathlib import Path
+
+HERE = Path(__file__).parent.parent
+lib_path = HERE / "src"
+if lib_path.exists() and lib_path.as_posix() not in sys.path:
+    sys.path.insert(0, lib_path.as_posix())
+
+from voice_dialogue.config.llm_config import get_llm_model_params, BUILTIN_LLM_MODEL_PATH, CHINESE_SYSTEM_PROMPT
+
+HAS_LLAMA_CPP = importlib.util.find_spec('llama_cpp') is not None
+
+if HAS_LLAMA_CPP:
+    import numpy as np
+
+    from voice_dialogue.llm.backends import create_chat_backend
+    from voice_dialogue.llm.state_snapshot import compact_state
+
+
+@unittest.skipUnless(HAS_LLAMA_CPP and BUILTIN_LLM_MODEL_PATH.exists(), "内置LLM模型不存在")
+class TestCompactState(unittest.TestCase):
+    """压缩后的状态快照加载后可以继续计算"""
+
+    @classmethod
+    def setUpClass(cls):
+        model_params = get_llm_model_params(speculative_mode='off')
+        cls.backend = create_chat_backend('native', BUILTIN_LLM_MODEL_PATH, model_params)
+        cls.llama = cls.backend.llama
+
+    def tokenize(self, text: str) -> list:
+        return self.llama.tokenize(text.encode('utf-8'), add_bos=False, special=True)
+
+    def test_save_compact_load_eval(self):
+        llama = self.llama
+        prefix = self.tokenize(f"<|im_start|>system\n{CHINESE_SYSTEM_PROMPT}<|im_end|>\n")
+        continuation = self.tokenize("<|im_start|>user\n你好<|im_end|>\n<|im_start|>assistant\n")
+
+        llama.reset()
+        llama.eval(prefix)
+        state = compact_state(llama.save_state())
+        self.assertEqual(len(state.input_ids), llama.n_ctx())
+        self.assertEqual(len(state.scores), 1)
+
+        llama.eval(continuation)
+        # 与 Llama.sample 相同，取最后一个位置的 logits
+        expected_logits = llama._scores[-1, :].copy()
+
+        # 加载快照后续写，结果与不中断地计算一致
+        llama.reset()
+        llama.load_state(state)
+        self.assertEqual(llama.n_tokens, len(prefix))
+        llama.eval(continuation)
+        self.assertEqual(llama.n_tokens, len(prefix) + len(continuation))
+        self.assertEqual(list(llama.input_ids[:llama.n_tokens]), prefix + continuation)
+
+        logits = llama._scores[-1, :]
+        self.assertEqual(int(np.argmax(logits)), int(np.argmax(expected_logits)))
+        print(f"\n  快照: {state.n_tokens} tokens, 续写: {len(continuation)} tokens, "
+              f"logits 最大误差: {float(np.max(np.abs(logits - expected_logits))):.4f}")
+
+
+if __name__ == '__main__':
+    unittest.main()
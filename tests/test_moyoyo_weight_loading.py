@@ -0,0 +1,87 @@
+import importlib.util
+import json
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+HERE = Path(__file__).parent.parent
+lib_path = HERE / "src"
+if lib_path.exists() and lib_path.as_posix() not in sys.path:
+    sys.path.insert(0, lib_path.as_posix())
+
+from voice_dialogue.config.paths import TTS_MODELS_PATH
+
+HAS_SAFETENSORS = all(importlib.util.find_spec(name) is not None for name in ('torch', 'safetensors'))
+
+MOYOYO_MODELS_PATH = TTS_MODELS_PATH / 'moyoyo'
+
+
+def find_weight_files() -> list:
+    """模型目录中的 pickle 格式权重：各取一个 GPT、SoVITS 检查点，以及 HuBERT、BERT 基础模型"""
+    if not MOYOYO_MODELS_PATH.exists():
+        return []
+    weight_files = []
+    for pattern in ('**/*.ckpt', '**/*.pth'):
+        found = sorted(MOYOYO_MODELS_PATH.glob(pattern))
+        if found:
+            weight_files.append(found[0])
+    for base_model in ('chinese-hubert-base', 'chinese-roberta-wwm-ext-large'):
+        path = MOYOYO_MODELS_PATH / base_model / 'pytorch_model.bin'
+        if path.exists():
+            weight_files.append(path)
+    return weight_files
+
+
+# 在独立进程中加载，峰值 RSS 互不影响
+LOAD_SCRIPT = """
+import json, resource, sys, time
+sys.path.insert(0, {lib_path!r})
+import torch
+from voice_dialogue.tts.safetensors_weights import load_safetensors_checkpoint
+from safetensors.torch import load_file
+
+path, mode = sys.argv[1], sys.argv[2]
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+if mode == 'pickle':
+    torch.load(path, map_location='cpu')
+elif path.endswith('model.safetensors'):
+    load_file(path)
+else:
+    load_safetensors_checkpoint(path)
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+# Linux 上 ru_maxrss 单位为 KB，macOS 上为字节
+scale = 1 if sys.platform == 'darwin' else 1024
+print(json.dumps({{'seconds': elapsed, 'peak_rss_delta_mb': (peak - baseline) * scale / (1 << 20)}}))
+"""
+
+
+@unittest.skipUnless(HAS_SAFETENSORS and find_weight_files(), "未安装 torch/safetensors 或缺少 MoYoYo 模型")
+class TestMoYoYoWeightLoading(unittest.TestCase):
+    """比较 pickle 与 safetensors 权重的加载耗时和峰值内存"""
+
+    @staticmethod
+    def measure(path: Path, mode: str) -> dict:
+        result = subprocess.run(
+            [sys.executable, '-c', LOAD_SCRIPT.format(lib_path=lib_path.as_posix()), path.as_posix(), mode],
+            capture_output=True, text=True, check=True,
+        )
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def test_load_time_and_peak_rss(self):
+        from voice_dialogue.tts.safetensors_weights import convert_to_safetensors
+
+        print(f"\n{'权重文件':<40} {'格式':<12} {'耗时':>8} {'峰值RSS增量':>12}")
+        for path in find_weight_files():
+            variant_path = convert_to_safetensors(path)
+            self.assertIsNotNone(variant_path)
+
+            for mode, load_path in (('pickle', path), ('safetensors', variant_path)):
+                stats = self.measure(load_path, mode)
+                print(f"{path.name:<40} {mode:<12} {stats['seconds']:>7.2f}s {stats['peak_rss_delta_mb']:>10.0f}MB")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
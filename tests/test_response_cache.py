@@ -0,0 +1,92 @@
+import sys
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+HERE = Path(__file__).parent.parent
+lib_path = HERE / "src"
+if lib_path.exists() and lib_path.as_posix() not in sys.path:
+    sys.path.insert(0, lib_path.as_posix())
+
+from voice_dialogue.core.response_cache import ResponseCache, normalize_question
+
+
+def make_audio(seconds: float = 0.5, sample_rate: int = 16000):
+    return np.zeros(int(seconds * sample_rate), dtype=np.float32), sample_rate
+
+
+class TestResponseCache(unittest.TestCase):
+    """回答缓存单元测试"""
+
+    def setUp(self):
+        self.cache = ResponseCache(max_entries=2)
+        self.cache.set_voice('kokoro:Heart')
+
+    def _store(self, question, answer_id, sentences, language='en'):
+        key = self.cache.make_key(question, language, 'prompt')
+        for index, sentence in enumerate(sentences):
+            self.cache.record_sentence(key, answer_id, index, sentence, make_audio())
+        self.cache.finish_answer(key, answer_id, len(sentences))
+        return key
+
+    def test_normalize(self):
+        self.assertEqual(normalize_question('你好！'), normalize_question(' 你好。'))
+        self.assertEqual(normalize_question('What can you do?'), normalize_question('what can you do'))
+        self.assertEqual(normalize_question('ＨＥＬＬＯ，'), 'hello')
+
+    def test_near_duplicate_hit(self):
+        self._store('What can you do?', 'a1', ['I can chat.', 'Ask me anything.'])
+        key = self.cache.make_key('what can you do', 'en', 'prompt')
+        entry = self.cache.get(key)
+        self.assertIsNotNone(entry)
+        self.assertEqual([s.sentence for s in entry.sentences], ['I can chat.', 'Ask me anything.'])
+
+    def test_key_includes_prompt_voice_and_language(self):
+        key = self.cache.make_key('hello', 'en', 'prompt')
+        self.assertNotEqual(key, self.cache.make_key('hello', 'en', 'new prompt'))
+        self.assertNotEqual(key, self.cache.make_key('hello', 'zh', 'prompt'))
+        self.cache.set_voice('moyoyo:Xiaoyi')
+        self.assertNotEqual(key, self.cache.make_key('hello', 'en', 'prompt'))
+
+    def test_incomplete_answer_not_cached(self):
+        key = self.cache.make_key('hello', 'en', 'prompt')
+        self.cache.record_sentence(key, 'a1', 0, 'Hi.', make_audio())
+        self.cache.finish_answer(key, 'a1', 2)
+        self.assertIsNone(self.cache.get(key))
+
+    def test_sentence_order_independent_of_arrival(self):
+        key = self.cache.make_key('hello', 'en', 'prompt')
+        self.cache.finish_answer(key, 'a1', 2)
+        self.cache.record_sentence(key, 'a1', 1, 'Second.', make_audio())
+        self.cache.record_sentence(key, 'a1', 0, 'First.', None)
+        entry = self.cache.get(key)
+        self.assertEqual([s.sentence for s in entry.sentences], ['First.', 'Second.'])
+
+    def test_lru_ttl_and_invalidate(self):
+        first = self._store('one', 'a1', ['1.'])
+        self._store('two', 'a2', ['2.'])
+        self._store('three', 'a3', ['3.'])
+        self.assertIsNone(self.cache.get(first))
+
+        self.cache.ttl_seconds = 0.01
+        time.sleep(0.02)
+        self.assertIsNone(self.cache.get(self.cache.make_key('three', 'en', 'prompt')))
+
+        self._store('four', 'a4', ['4.'])
+        self.cache.invalidate()
+        self.assertEqual(self.cache.get_statistics()['entries'], 0)
+
+    def test_long_question_not_cached(self):
+        self.assertIsNone(self.cache.make_key('x' * 100, 'en', 'prompt'))
+
+    def test_hit_rate(self):
+        key = self._store('hello', 'a1', ['Hi.'])
+        self.cache.get(key)
+        self.cache.get(self.cache.make_key('bye', 'en', 'prompt'))
+        self.assertEqual(self.cache.get_statistics()['hit_rate'], 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
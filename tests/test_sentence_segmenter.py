@@ -0,0 +1,184 @@
+import sys
+import time
+import unicodedata
+import unittest
+from pathlib import Path
+
+HERE = Path(__file__).parent.parent
+lib_path = HERE / "src"
+if lib_path.exists() and lib_path.as_posix() not in sys.path:
+    sys.path.insert(0, lib_path.as_posix())
+
+from voice_dialogue.llm.segmenter import SentenceSegmenter, is_punctuation, split_at_last_punctuation
+
+# 录制的 Qwen3 流式输出（按 token 切分）
+RECORDED_TOKEN_STREAMS = {
+    'zh_short': [
+        '好的', '。', '人工', '智能', '让', '生活', '更', '便利', '了', '，', '比如', '手机', '上的', '语音', '助手',
+        '和', '智能', '推荐', '。', '它', '还', '在', '医疗', '、', '交通', '等', '领域', '发挥', '作用', '！',
+    ],
+    'zh_numbers': [
+        '圆', '周', '率', '约', '等于', '3', '.', '14', '，', '这是', '一个', '无', '理', '数', '。',
+        '你', '知道', '吗', '？', '它', '的', '小数', '部分', '永远', '不会', '循环', '。',
+    ],
+    'en_short': [
+        'Sure', '!', ' AI', ' has', ' changed', ' daily', ' life', ' in', ' many', ' ways', '.', ' For', ' example',
+        ',', ' voice', ' assistants', ' help', ' us', ' set', ' reminders', ',', ' and', ' apps', ' recommend',
+        ' music', '.', ' It', "'s", ' everywhere', ' now', '.',
+    ],
+    'en_mixed_punct': [
+        'Well', ',', ' it', ' depends', ':', ' some', ' people', ' love', ' it', ';', ' others', ' don', "'t", '.',
+        ' "', 'Really', '?"', ' you', ' might', ' ask', '.', ' Yes', '.', ' Mars', ' is', ' about', ' 225',
+        ' million', ' km', ' away', '...', ' roughly',
+    ],
+    'multi_punct_chunks': [
+        'Hi', '.', ' Okay', ',', ' so', '.', '..', ' let', "'s", ' go', '!)', ' 好', '吧', '，', '我们', '开始', '吧', '。',
+    ],
+}
+
+
+class LegacySegmenter:
+    """重构前 LLMService 中的分句逻辑，作为行为对照"""
+
+    english_sentence_end_marks = {'!', '?', '.', ',', ':', ';'}
+    chinese_sentence_end_marks = {'，', '。', '！', '？', '：', '；', '、'}
+    sentence_end_marks = english_sentence_end_marks | chinese_sentence_end_marks
+
+    @staticmethod
+    def preprocess_sentence_text(sentences):
+        sentence_text = ''.join(sentences)
+        if sentence_text:
+            sentence_mark = sentence_text[-1]
+            sentence_content = sentence_text[:-1].replace('!', ',').replace('?', ',').replace('.', ',')
+            sentence_text = f'{sentence_content}{sentence_mark}'
+        return sentence_text
+
+    def _should_end_sentence(self, sentence, sentence_end_mark, is_first_sentence):
+        if not sentence or sentence_end_mark not in self.sentence_end_marks:
+            return False
+        is_chinese_sentence = sentence_end_mark in self.chinese_sentence_end_marks
+        if is_first_sentence:
+            if is_chinese_sentence:
+                return len(sentence) > 2
+            return len(sentence.split()) > 1
+        if is_chinese_sentence:
+            return len(sentence) > 4
+        sentence_words = len(sentence.split())
+        return sentence_words > 4 or (sentence_words > 2 and sentence_end_mark in {'.', '?', '!'})
+
+    @staticmethod
+    def _process_chunk_content(chunk_content):
+        for i in range(len(chunk_content) - 1, -1, -1):
+            if unicodedata.category(chunk_content[i]).startswith('P'):
+                return chunk_content[:i], chunk_content[i], chunk_content[i + 1:]
+        return chunk_content, '', ''
+
+    def segment(self, tokens):
+        sentences = []
+        chunks = []
+        is_first_sentence = True
+        for token in tokens:
+            before_punct, sentence_end_mark, remain_content = self._process_chunk_content(token)
+            if before_punct:
+                chunks.append(before_punct)
+            if sentence_end_mark:
+                chunks.append(sentence_end_mark)
+            sentence = self.preprocess_sentence_text(chunks)
+            if not sentence:
+                chunks.append(remain_content)
+                continue
+            if self._should_end_sentence(sentence, sentence_end_mark, is_first_sentence):
+                sentences.append(sentence)
+                chunks = [remain_content] if remain_content else []
+                is_first_sentence = False
+            elif remain_content:
+                chunks.append(remain_content)
+
+        sentence = self.preprocess_sentence_text(chunks)
+        if sentence and sentence.strip() not in self.sentence_end_marks:
+            sentences.append(sentence)
+        return sentences
+
+
+def run_segmenter(segmenter: SentenceSegmenter, tokens):
+    segmenter.reset()
+    sentences = []
+    for token in tokens:
+        sentence = segmenter.feed(token)
+        if sentence:
+            sentences.append(sentence)
+    sentence = segmenter.flush()
+    if sentence:
+        sentences.append(sentence)
+    return sentences
+
+
+class TestSentenceSegmenter(unittest.TestCase):
+    """流式分句器单元测试"""
+
+    def setUp(self):
+        self.segmenter = SentenceSegmenter()
+
+    def test_punctuation_table(self):
+        for char in '.,!?;:，。！？、：；“”"\'()（）《》…-':
+            self.assertTrue(is_punctuation(char), char)
+        for char in 'aZ0 中文\n':
+            self.assertFalse(is_punctuation(char), char)
+        self.assertTrue(is_punctuation('‽'))
+        self.assertFalse(is_punctuation(''))
+
+    def test_split_at_last_punctuation(self):
+        self.assertEqual(split_at_last_punctuation('a,b.c'), ('a,b', '.', 'c'))
+        self.assertEqual(split_at_last_punctuation('abc'), ('abc', '', ''))
+        self.assertEqual(split_at_last_punctuation('。'), ('', '。', ''))
+
+    def test_matches_legacy_segmentation(self):
+        legacy = LegacySegmenter()
+        for name, tokens in RECORDED_TOKEN_STREAMS.items():
+            with self.subTest(stream=name):
+                self.assertEqual(run_segmenter(self.segmenter, tokens), legacy.segment(tokens))
+
+    def test_chinese_rules(self):
+        sentences = run_segmenter(self.segmenter, RECORDED_TOKEN_STREAMS['zh_short'])
+        self.assertEqual(sentences[0], '好的。')
+        self.assertTrue(all(sentence[-1] in '，。！、' for sentence in sentences))
+
+    def test_inner_marks_replaced(self):
+        sentences = run_segmenter(self.segmenter, RECORDED_TOKEN_STREAMS['zh_numbers'])
+        self.assertIn('3,14', ''.join(sentences))
+
+    def test_first_sentence_needs_two_words(self):
+        self.assertIsNone(self.segmenter.feed('Sure!'))
+        self.assertEqual(self.segmenter.feed(' Of course.'), 'Sure, Of course.')
+
+    def test_flush_drops_lone_punctuation(self):
+        self.segmenter.feed('Hello there friend.')
+        self.segmenter.feed(' ok, fine, now.')
+        self.segmenter.feed('.')
+        self.assertIsNone(self.segmenter.flush())
+
+    def test_benchmark_against_legacy(self):
+        """对比重构前后的分句耗时：长回答下旧实现随句子长度平方增长"""
+        long_stream = [' word'] * 1500 + ['.'] + list('这是一段没有标点的很长的中文回答' * 100) + ['。']
+        streams = list(RECORDED_TOKEN_STREAMS.values()) * 200 + [long_stream] * 5
+        legacy = LegacySegmenter()
+
+        start = time.perf_counter()
+        legacy_results = [legacy.segment(tokens) for tokens in streams]
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = [run_segmenter(self.segmenter, tokens) for tokens in streams]
+        segmenter_time = time.perf_counter() - start
+
+        token_count = sum(len(tokens) for tokens in streams)
+        print(f"\n  tokens: {token_count}")
+        print(f"  legacy:    {legacy_time * 1000:.1f}ms ({legacy_time / token_count * 1e6:.2f}us/token)")
+        print(f"  segmenter: {segmenter_time * 1000:.1f}ms ({segmenter_time / token_count * 1e6:.2f}us/token)")
+
+        # 耗时只打印不断言，受机器负载影响
+        self.assertEqual(results, legacy_results)
+
+
+if __name__ == '__main__':
+    unittest.main()